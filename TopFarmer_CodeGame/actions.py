@@ -0,0 +1,36 @@
+# actions.py
+# (dx, dy) offset of the tile next to the farmer in each direction
+DIRECTIONS = {
+    "up": (0, -1),
+    "down": (0, 1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
+
+# crop name -> crop type, the inverse of Farmer.crop_desc
+CROP_TYPES = {"potato": 0, "carrot": 1, "pumpkin": 2}
+
+# number of arguments taken by each action accepted by Farmer.run
+ACTIONS = {"move": 1, "plant": 2, "harvest": 1}
+
+
+def check_action(action):
+    """
+    Checks that an action tuple is one a farmer can perform.
+
+    Args:
+        action: The action to check, one of ("move", direction), ("plant", crop, direction) or ("harvest", direction).
+
+    Raises:
+        ValueError: If the action is not one of the forms above, or names an unknown direction or crop.
+    """
+    if (
+        not isinstance(action, tuple)
+        or not action
+        or ACTIONS.get(action[0]) != len(action) - 1
+    ):
+        raise ValueError(f"Malformed action {action!r}")
+    if action[-1] not in DIRECTIONS:
+        raise ValueError(f"Unknown direction in action {action!r}")
+    if action[0] == "plant" and action[1] not in CROP_TYPES:
+        raise ValueError(f"Unknown crop in action {action!r}")
@@ -0,0 +1,196 @@
+# actiontrace.py
+import heapq
+import struct
+from actions import ACTIONS, CROP_TYPES, DIRECTIONS
+
+ACTION_NAMES = tuple(ACTIONS)  # move, plant, harvest
+DIRECTION_NAMES = tuple(DIRECTIONS)  # up, down, left, right
+CROP_NAMES = tuple(CROP_TYPES)  # potato, carrot, pumpkin
+
+ACTION_CODES = {name: code for code, name in enumerate(ACTION_NAMES)}
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTION_NAMES)}
+
+NONE_CODE = 255  # stored for an unknown direction or crop, or no crop
+
+
+class ActionTrace:
+    """
+    Records every action a farmer attempts in a compact, growable byte buffer.
+    Each action takes one fixed-size record holding the tick of the scheduler's clock it happened in, the action, its direction and crop, and whether it was carried out, so even a run of millions of actions fits in a few megabytes and recording one is a single struct.pack_into call.
+    A trace can be iterated, replayed on another farmer, compared with another trace, and converted to and from bytes to be stored or sent elsewhere.
+    """
+
+    # tick, action, direction, crop, accepted
+    RECORD = struct.Struct("<IBBBB")
+
+    def __init__(self, capacity=1024):
+        """
+        Initializes an empty ActionTrace.
+
+        Args:
+            capacity: The number of records to allocate room for up front; the buffer doubles in size whenever it fills up (default is 1024).
+        """
+        self.buffer = bytearray(self.RECORD.size * max(capacity, 1))
+        self.length = 0
+
+    def __len__(self):
+        """
+        Returns:
+            int: The number of actions recorded.
+        """
+        return self.length
+
+    def __iter__(self):
+        """
+        Iterates over the recorded actions in the order they were attempted.
+
+        Yields:
+            tuple: The (tick, action, accepted) of each recorded action, where action is a tuple as accepted by Farmer.run, for example ("plant", "potato", "down").
+        """
+        records = memoryview(self.buffer)[: self.length * self.RECORD.size]
+        for tick, action, direction, crop, accepted in self.RECORD.iter_unpack(
+            records
+        ):
+            action = self.decode_action(action, direction, crop)
+            yield tick, action, bool(accepted)
+
+    def decode_action(self, action, direction, crop):
+        """
+        Converts the codes stored in a record back into an action tuple.
+
+        Args:
+            action: The stored action code.
+            direction: The stored direction code.
+            crop: The stored crop code.
+
+        Returns:
+            tuple: The action, with None in place of an unknown direction or crop.
+        """
+        if direction == NONE_CODE:
+            direction = None
+        else:
+            direction = DIRECTION_NAMES[direction]
+        name = ACTION_NAMES[action]
+        if name == "plant":
+            crop = None if crop == NONE_CODE else CROP_NAMES[crop]
+            return (name, crop, direction)
+        return (name, direction)
+
+    def record(self, tick, action, direction, crop, accepted):
+        """
+        Appends one action to the trace, growing the buffer if it is full.
+        This is called by the farmer for every action it attempts while its trace is enabled.
+
+        Args:
+            tick: The tick of the scheduler's clock the action happened in.
+            action: The name of the action ('move', 'plant' or 'harvest').
+            direction: The direction the action was made in.
+            crop: The type of crop planted or harvested, or None.
+            accepted: True if the action was carried out, otherwise False.
+        """
+        offset = self.length * self.RECORD.size
+        if offset == len(self.buffer):
+            self.buffer.extend(bytes(len(self.buffer)))
+        self.RECORD.pack_into(
+            self.buffer,
+            offset,
+            tick,
+            ACTION_CODES[action],
+            DIRECTION_CODES.get(direction, NONE_CODE),
+            NONE_CODE if crop is None else crop,
+            accepted,
+        )
+        self.length += 1
+
+    def clear(self):
+        """
+        Removes every recorded action, keeping the buffer allocated for reuse.
+        """
+        self.length = 0
+
+    def replay(self, farmer):
+        """
+        Performs the recorded actions again, in order, with another farmer.
+        This reproduces a run on a fresh copy of the farm without running the code that made it.
+
+        Args:
+            farmer: The Farmer to perform the actions with.
+
+        Returns:
+            int: The index of the first action whose outcome differed from the recorded one, or None if every outcome matched.
+        """
+        first_difference = None
+        for i, (_, action, accepted) in enumerate(self):
+            if farmer.perform(action) != accepted and first_difference is None:
+                first_difference = i
+        return first_difference
+
+    def diff(self, other):
+        """
+        Compares this trace with another one.
+
+        Args:
+            other: The ActionTrace to compare with.
+
+        Returns:
+            int: The index of the first record that differs between the two traces (or the length of the shorter trace if one continues the other), or None if they are identical.
+        """
+        size = self.RECORD.size
+        mine = memoryview(self.buffer)[: self.length * size]
+        theirs = memoryview(other.buffer)[: other.length * size]
+        if mine == theirs:
+            return None
+        for i in range(min(self.length, other.length)):
+            record = slice(i * size, (i + 1) * size)
+            if mine[record] != theirs[record]:
+                return i
+        return min(self.length, other.length)
+
+    def to_bytes(self):
+        """
+        Returns:
+            bytes: The recorded actions, which from_bytes() turns back into an identical trace.
+        """
+        return bytes(self.buffer[: self.length * self.RECORD.size])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Restores a trace converted to bytes with to_bytes().
+
+        Args:
+            data: The recorded actions, as bytes or any other buffer.
+
+        Returns:
+            ActionTrace: The restored trace.
+
+        Raises:
+            ValueError: If the data is not a whole number of records.
+        """
+        if len(data) % cls.RECORD.size:
+            raise ValueError("Trace data is not a whole number of records")
+        trace = cls(len(data) // cls.RECORD.size)
+        trace.buffer[: len(data)] = data
+        trace.length = len(data) // cls.RECORD.size
+        return trace
+
+
+def merge_traces(traces):
+    """
+    Iterates over the recorded actions of several farmers on one farm together, in the order they happened, for example to replay all of them.
+    Actions are ordered by tick, and the actions of one tick in the order of the traces. Within a scheduler tick that order may differ from the one the farmers acted in, but the actions carried out in one tick never plant on or harvest from the same tile (see Scheduler), so they leave the farm the same in any order.
+
+    Args:
+        traces: The ActionTrace of each farmer, in the order of the farm's farmers.
+
+    Returns:
+        iterator: The (tick, index of the farmer's trace, action) of each recorded action.
+    """
+
+    def numbered(index, trace):
+        for tick, action, _ in trace:
+            yield tick, index, action
+
+    return heapq.merge(
+        *[numbered(index, trace) for index, trace in enumerate(traces)]
+    )
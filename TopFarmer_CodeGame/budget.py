@@ -0,0 +1,253 @@
+# budget.py
+import dis
+import sys
+import types
+from codecache import PLAYER_FILENAME
+
+
+def instruction_lines(code):
+    """
+    Args:
+        code: A code object.
+
+    Returns:
+        dict: The source line of each instruction offset in the code.
+    """
+    lines = {}
+    for start, end, line in code.co_lines():
+        for offset in range(start, end, 2):
+            lines[offset] = line
+    return lines
+
+
+def has_single_line_loop(code):
+    """
+    Checks whether a code object has a loop that jumps back to the line it jumps from, such as "while True: pass".
+    Going round such a loop starts no new line, so it has no line event of its own.
+
+    Args:
+        code: A code object.
+
+    Returns:
+        bool: True if the code has a backward jump that stays on one line, otherwise False.
+    """
+    lines = None
+    for instruction in dis.get_instructions(code):
+        if (
+            instruction.opcode in dis.hasjrel or instruction.opcode in dis.hasjabs
+        ) and instruction.argval <= instruction.offset:
+            if lines is None:
+                lines = instruction_lines(code)
+            if lines.get(instruction.offset) == lines.get(instruction.argval):
+                return True
+    return False
+
+
+def nested_code(code):
+    """
+    Args:
+        code: A code object.
+
+    Returns:
+        list: The code object followed by every code object nested in it, such as those of the functions, lambdas and classes it defines, however deeply.
+    """
+    codes = [code]
+    for code in codes:
+        codes.extend(
+            const for const in code.co_consts if isinstance(const, types.CodeType)
+        )
+    return codes
+
+
+class BudgetExceeded(BaseException):
+    """
+    Raised inside the player's code once it has used up its execution budget.
+    It derives from BaseException so that the player's own "except Exception" blocks cannot catch it and keep a runaway loop going.
+    """
+
+
+class ExecutionBudget:
+    """
+    Stops the player's code once it has run more than a set number of lines.
+    Every line the player's code executes counts as one step, however it is reached: loops, comprehensions, recursion and functions the player defined all count, while lines of the game's own code (such as the farmer's methods) do not.
+    On Python 3.12 and newer the lines are counted with sys.monitoring events switched on for the player's code objects only, so the game's code runs at full speed and other tools using sys.monitoring, such as debuggers or coverage, are not affected. Older versions fall back to sys.settrace, which only traces frames of the player's code.
+    """
+
+    def __init__(self, limit, filename=PLAYER_FILENAME):
+        """
+        Initializes an ExecutionBudget.
+
+        Args:
+            limit: The largest number of lines the player's code may execute in one run.
+            filename: The file name the player's code was compiled with, used to tell its lines apart from the game's (default is PLAYER_FILENAME).
+        """
+        self.limit = limit
+        self.filename = filename
+        self.used = 0  # lines executed in the current run
+
+    def count(self):
+        """
+        Counts one executed line of the player's code.
+
+        Raises:
+            BudgetExceeded: If the budget has now been used up.
+        """
+        self.used += 1
+        if self.used > self.limit:
+            raise BudgetExceeded(
+                f"Your code ran for more than {self.limit} steps! Check your code for a possible infinite loop."
+            )
+
+    def run(self, function, *args, **kwargs):
+        """
+        Calls a function, such as exec() on the player's compiled code, counting the lines of the player's code it executes.
+        sys.monitoring is only used when the player's compiled code is one of the positional arguments, as it is for exec(), since its events are switched on per code object; otherwise the lines are counted with sys.settrace.
+
+        Args:
+            function: The function to call.
+            *args: The positional arguments to call it with.
+            **kwargs: The keyword arguments to call it with.
+
+        Returns:
+            object: Whatever the function returns.
+
+        Raises:
+            BudgetExceeded: If the player's code executes more lines than the limit.
+        """
+        self.used = 0
+        monitoring = getattr(sys, "monitoring", None)
+        codes = [
+            code
+            for arg in args
+            if isinstance(arg, types.CodeType) and arg.co_filename == self.filename
+            for code in nested_code(arg)
+        ]
+        if monitoring is not None and codes:
+            tool = self.free_tool_id(monitoring)
+            if tool is not None:
+                return self.run_monitored(
+                    monitoring, tool, codes, function, args, kwargs
+                )
+        return self.run_traced(function, args, kwargs)
+
+    def free_tool_id(self, monitoring):
+        """
+        Args:
+            monitoring: The sys.monitoring namespace.
+
+        Returns:
+            int: A sys.monitoring tool id not in use by a debugger, profiler or other tool, preferring the profiler's, or None if every id is taken.
+        """
+        tools = [monitoring.PROFILER_ID] + list(range(6))
+        for tool in tools:
+            if monitoring.get_tool(tool) is None:
+                return tool
+        return None
+
+    def run_monitored(self, monitoring, tool, codes, function, args, kwargs):
+        """
+        Calls a function while counting the line events of the player's code with sys.monitoring, along with jumps back to the start of a loop that stays on one line, which have no line event of their own.
+        The events are switched on with set_local_events() for the player's code objects only, and jump events only for those with such a loop, so no other code reports anything and no event has to be disabled along the way. Everything is switched off again afterwards, leaving other tools exactly as they were.
+
+        Args:
+            monitoring: The sys.monitoring namespace.
+            tool: The tool id to register the callbacks under.
+            codes: The player's code objects, including nested ones (see nested_code()).
+            function: The function to call.
+            args: The positional arguments to call it with.
+            kwargs: The keyword arguments to call it with.
+
+        Returns:
+            object: Whatever the function returns.
+        """
+        count = self.count
+        lines = {}  # code object -> instruction_lines() of the code
+
+        def on_line(code, line_number):
+            count()
+
+        def on_jump(code, source, destination):
+            # a loop that goes back to a new line was counted by on_line
+            offsets = lines[code]
+            if destination <= source and offsets.get(source) == offsets.get(
+                destination
+            ):
+                count()
+
+        events = monitoring.events
+        monitoring.use_tool_id(tool, "TopFarmer execution budget")
+        try:
+            monitoring.register_callback(tool, events.LINE, on_line)
+            monitoring.register_callback(tool, events.JUMP, on_jump)
+            for code in codes:
+                if has_single_line_loop(code):
+                    lines[code] = instruction_lines(code)
+                    monitoring.set_local_events(
+                        tool, code, events.LINE | events.JUMP
+                    )
+                else:
+                    monitoring.set_local_events(tool, code, events.LINE)
+            return function(*args, **kwargs)
+        finally:
+            for code in codes:
+                monitoring.set_local_events(tool, code, events.NO_EVENTS)
+            monitoring.register_callback(tool, events.LINE, None)
+            monitoring.register_callback(tool, events.JUMP, None)
+            monitoring.free_tool_id(tool)
+
+    def run_traced(self, function, args, kwargs):
+        """
+        Calls a function while counting line events with sys.settrace.
+        Only frames running the player's code are traced, line by line; other calls are not traced any further. A frame whose code has a loop that goes back within one line, such as "while True: pass", is traced opcode by opcode instead so that loop is counted too, which is much slower, so only those frames pay for it.
+
+        Args:
+            function: The function to call.
+            args: The positional arguments to call it with.
+            kwargs: The keyword arguments to call it with.
+
+        Returns:
+            object: Whatever the function returns.
+        """
+        filename = self.filename
+        count = self.count
+        loops = {}  # code object -> has_single_line_loop() of the code
+
+        def trace_lines(frame, event, arg):
+            if event == "line":
+                count()
+            return trace_lines
+
+        def trace_calls(frame, event, arg):
+            code = frame.f_code
+            if code.co_filename != filename:
+                return None
+            looping = loops.get(code)
+            if looping is None:
+                looping = loops[code] = has_single_line_loop(code)
+            if not looping:
+                return trace_lines
+            frame.f_trace_opcodes = True
+            last = -1  # offset of the previous instruction in this frame
+            counted = False  # True if a line event came before the opcode
+
+            def trace_steps(frame, event, arg):
+                nonlocal last, counted
+                if event == "line":
+                    count()
+                    counted = True
+                elif event == "opcode":
+                    # a loop going back within one line has no line event
+                    if frame.f_lasti <= last and not counted:
+                        count()
+                    last = frame.f_lasti
+                    counted = False
+                return trace_steps
+
+            return trace_steps
+
+        previous = sys.gettrace()
+        sys.settrace(trace_calls)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            sys.settrace(previous)
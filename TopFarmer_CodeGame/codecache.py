@@ -0,0 +1,78 @@
+# codecache.py
+import hashlib
+from collections import OrderedDict
+
+# the file name player code is compiled with, which also tells its lines
+# apart from the game's own
+PLAYER_FILENAME = "<player code>"
+
+
+class CodeCache:
+    """
+    Keeps the compiled versions of recently run player code.
+    Entries are keyed by a hash of the source, so running the same submission again, for example on every test case of a level, skips parsing and compiling entirely. The least recently used entry is dropped once the cache is full.
+    """
+
+    def __init__(self, capacity=32):
+        """
+        Initializes an empty CodeCache.
+
+        Args:
+            capacity: The largest number of compiled submissions to keep (default is 32).
+        """
+        self.capacity = capacity
+        self.entries = OrderedDict()  # source hash -> code object
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """
+        Returns:
+            int: The number of compiled submissions in the cache.
+        """
+        return len(self.entries)
+
+    def key(self, source):
+        """
+        Args:
+            source: The player's code.
+
+        Returns:
+            bytes: The key the compiled code is stored under.
+        """
+        return hashlib.sha256(source.encode("utf-8")).digest()
+
+    def get(self, source):
+        """
+        Retrieves the compiled code for a submission, compiling it if it is not cached.
+
+        Args:
+            source: The player's code.
+
+        Returns:
+            code: The compiled code.
+
+        Raises:
+            SyntaxError: If the code is not valid Python; failed compilations are not cached.
+        """
+        key = self.key(source)
+        code = self.entries.get(key)
+        if code is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return code
+        self.misses += 1
+        code = self.entries[key] = compile(source, PLAYER_FILENAME, "exec")
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return code
+
+    def clear(self):
+        """
+        Removes every compiled submission from the cache.
+        """
+        self.entries.clear()
+
+
+# the cache shared by the whole game
+code_cache = CodeCache()
@@ -1,10 +1,15 @@
 # embed_pygame.py
-import ast
+import itertools
 from tkinter import *
 import pygame
-import time
+from actiontrace import merge_traces
 from farmgrid import FarmGrid
 from tilegraphics import TileGraphics
+from timeseries import TimeSeries
+from codecache import code_cache
+from budget import BudgetExceeded, ExecutionBudget
+from executor import player_namespace
+from stepper import Stepper
 
 
 class EmbedPygame:
@@ -44,7 +49,8 @@ class EmbedPygame:
     SCREEN_WIDTH = FARM_WIDTH * SCALE_FACTOR
     SCREEN_HEIGHT = FARM_HEIGHT * SCALE_FACTOR
 
-    MAX_ITERATIONS = 350
+    # lines of user code a run may execute, unless the level sets its own
+    INSTRUCTION_BUDGET = 20000
 
     def __init__(self, config="plain"):
         """
@@ -66,13 +72,28 @@ class EmbedPygame:
             (self.SCREEN_WIDTH, self.SCREEN_HEIGHT)
         )
 
-        # Should the code execute step by step
+        # Should the code execute step by step, and how fast
         self.slow_mode = True
+        self.stepper = Stepper()
+
+        # How many lines of user code a run may execute before it is stopped
+        self.instruction_budget = self.INSTRUCTION_BUDGET
+
+        # Runs user code in separate worker processes, if set
+        self.executor = None
 
         # Initialize TileGraphics to handle loading images
         self.graphics = TileGraphics(self.SCALE_FACTOR)
         self.clock = pygame.time.Clock()
 
+        # What is currently on screen, used to only redraw what changed
+        self.rendered_farm = None
+        self.rendered_version = None
+        self.rendered_farmer_positions = []
+
+        # When the player's actions happen, kept across farms and runs
+        self.timeseries = TimeSeries()
+
     def exit(self):
         """
         Exits the Pygame environment and closes the application.
@@ -97,65 +118,113 @@ class EmbedPygame:
         for y in range(0, height, cell_size):
             pygame.draw.line(self.surface, self.GRAY, (0, y), (width, y))
 
+    def render_tile(self, x, y):
+        """
+        Draws a single tile of the farm at the given grid position.
+        Crops are drawn over dirt and trees over grass, so a tile can be repainted on its own without leaving traces of what was there before.
+
+        Args:
+            x: The x-coordinate of the tile to draw.
+            y: The y-coordinate of the tile to draw.
+        """
+
+        tile = self.farm.grid[x][y]
+        color = None
+        if tile.tile_type == 0:  # dirt tile
+            color = self.DIRT
+        elif tile.tile_type == 1:  # grass tile
+            color = self.GRASS
+        elif tile.tile_type == 2:  # water tile
+            color = self.WATER
+        elif tile.tile_type == 3:  # crop tile
+            color = self.DIRT
+        elif tile.tile_type == 4:  # tree tile
+            color = self.GRASS
+
+        if color:
+            pygame.draw.rect(
+                self.surface,
+                color,
+                pygame.Rect(
+                    x * self.SCALE_FACTOR,
+                    y * self.SCALE_FACTOR,
+                    self.SCALE_FACTOR,
+                    self.SCALE_FACTOR,
+                ),
+            )
+
+        if tile.tile_type == 3:
+            self.graphics.render_crop(self.surface, tile.crop_type, x, y)
+        elif tile.tile_type == 4:
+            self.graphics.render_tree(self.surface, x, y)
+
     def render_farm(self):
         """
-        Renders the farm grid on the Pygame surface, displaying various tile types and the farmer.
-        This function iterates through the farm's grid, drawing each tile according to its type, and updates the display with the current state of the farm, including crops and the farmer's position.
+        Renders the parts of the farm grid that have changed since the last frame, along with the farmers.
+        This function collects the changed cells from the farm, repaints only those tiles (plus the area under each farmer sprite, which is larger than a tile), and skips the frame entirely when neither the farm nor the farmer's animation has changed.
+
+        Returns:
+            bool: True if anything was drawn, otherwise False.
         """
 
         dt = self.clock.tick(60)  # delta time for animation
-        for y in range(self.FARM_HEIGHT):
-            for x in range(self.FARM_WIDTH):
-                tile = self.farm.grid[x][y]
-                color = None
-                if tile.tile_type == 0:  # dirt tile
-                    color = self.DIRT
-                elif tile.tile_type == 1:  # grass tile
-                    color = self.GRASS
-                elif tile.tile_type == 2:  # water tile
-                    color = self.WATER
-                elif tile.tile_type == 3:  # crop tile
-                    self.graphics.render_crop(
-                        self.surface, tile.crop_type, x, y
-                    )
-                elif tile.tile_type == 4:  # tree tile
-                    self.graphics.render_tree(self.surface, x, y)
-
-                # Draw the tile with color if not crop,tree or farmer
-                if color:
-                    pygame.draw.rect(
-                        self.surface,
-                        color,
-                        pygame.Rect(
-                            x * self.SCALE_FACTOR,
-                            y * self.SCALE_FACTOR,
-                            self.SCALE_FACTOR,
-                            self.SCALE_FACTOR,
-                        ),
-                    )
-
-                if self.farm.farmer is not None:
-                    farmer_x, farmer_y = self.farm.farmer.get_pos()
-                    self.graphics.render_farmer(
-                        self.surface, farmer_x, farmer_y
-                    )
-
-                #  re-render grid lines
-                self.render_grid(
-                    self.SCREEN_WIDTH, self.SCREEN_HEIGHT, self.SCALE_FACTOR
+        new_farm = self.farm is not self.rendered_farm
+        animate = self.graphics.farmer_frame_due()
+        if (
+            not new_farm
+            and not animate
+            and self.farm.version == self.rendered_version
+        ):
+            return False  # idle frame, nothing to redraw
+
+        cells = self.farm.drain_dirty()
+        if new_farm:
+            cells = set(
+                itertools.product(
+                    range(self.FARM_WIDTH), range(self.FARM_HEIGHT)
                 )
+            )
+
+        farmer_positions = [farmer.get_pos() for farmer in self.farm.farmers]
+
+        # the farmer sprite overlaps the neighbouring tiles, so repaint
+        # around both the previous and the current position of every farmer
+        if not new_farm:
+            for pos in self.rendered_farmer_positions + farmer_positions:
+                cells.update(self.neighbourhood(*pos))
+
+        for x, y in cells:
+            if x < self.FARM_WIDTH and y < self.FARM_HEIGHT:
+                self.render_tile(x, y)
+
+        for pos in farmer_positions:
+            self.graphics.render_farmer(self.surface, *pos)
+
+        #  re-render grid lines
+        self.render_grid(
+            self.SCREEN_WIDTH, self.SCREEN_HEIGHT, self.SCALE_FACTOR
+        )
 
-    def check_infinite_loop(self):
+        self.rendered_farm = self.farm
+        self.rendered_version = self.farm.version
+        self.rendered_farmer_positions = farmer_positions
+        return True
+
+    def neighbourhood(self, x, y):
         """
-        Checks if iteration count exceeds maximum allowed iterations and raises an exception if
-        if iteration count exceeds MAX_ITERATIONS
-        This function is used to prevent possible infinite loops.
+        Args:
+            x: The x-coordinate of the centre tile.
+            y: The y-coordinate of the centre tile.
+
+        Returns:
+            set: The positions of the centre tile and its eight neighbours that lie on the screen.
         """
-        self.iteration_count += 1
-        if self.iteration_count > self.MAX_ITERATIONS:
-            raise Exception(
-                "Loop exceeded maximum iterations! Check your code for a possible infinite loop."
-            )
+
+        return {
+            (nx, ny)
+            for nx in range(max(x - 1, 0), min(x + 2, self.FARM_WIDTH))
+            for ny in range(max(y - 1, 0), min(y + 2, self.FARM_HEIGHT))
+        }
 
     def direction_helper(self, code):
         """
@@ -240,120 +309,113 @@ class EmbedPygame:
 
         return missing_directions
 
-    def execute_python_code(self, code):
+    def execute_python_code(self, code, done=None):
+        """
+        Executes user-provided Python code on the displayed farm: the code is first run at full speed on a copy of the farm, then the recorded actions are played back on the displayed farm.
+        See record_python_code() and play_trace().
+
+        Args:
+            code: A string containing the Python code to be executed.
+            done: A function to call once the playback has finished, on the render thread (default is None).
+
+        Returns:
+            FarmGrid: The copy of the farm the code ran on, in the state the code left it in.
+        """
+        recording, traces = self.record_python_code(code)
+        self.play_trace(self.farm, traces, done)
+        return recording
+
+    def record_python_code(self, code, farm=None):
         """
-        Injects user-provided Python code into the program and executes it, either line by line in slow mode or all at once in normal mode.
-        This function modifies the input code to ensure proper context, manages indentation for execution, and handles any errors that may arise during execution.
+        Runs user-provided Python code at full speed on a fork of a farm, recording every action of every farmer on it.
+        Nothing is drawn while the code runs, so its result can be checked straight away however long it would take to watch; play_trace() animates the recorded actions afterwards.
+        If an Executor is set, as the game does, the code runs in one of its worker processes, so a crash, hang or memory blow-up in the code cannot take the game down with it; otherwise it runs in the game's own process.
 
         Args:
             code: A string containing the Python code to be executed.
+            farm: The farm to run the code against, which is left unchanged, or None for the displayed farm (default is None).
 
-        Raises:
-            Exception: If there is an error during the execution of the provided code.
+        Returns:
+            tuple: The fork of the farm the code ran on, in the state the code left it in, and the ActionTrace of each farmer's actions, in the order of the farm's farmers.
         """
 
-        # Initialize iteration count for loop checking
-        self.iteration_count = 0
+        farm = self.farm if farm is None else farm
 
         for i, missing_direction in enumerate(self.direction_helper(code)):
             print(
                 f"function {self.direction_helper(code)[i][0]} on line {self.direction_helper(code)[i][1]} has a missing or incorrect direction."
             )
 
-        # Inject check for infinite loops
-        code = code.replace("farmer.", "farm.farmer.")
-
-        code_lines = code.split("\n")
-        final_code = ""
-        indentation_stack = []
-
-        if self.slow_mode:  # slow mode on, execute line by line
-            for line in code_lines:
-                stripped_line = line.strip()
-                indentation_level = len(line) - len(stripped_line)
-                # Detect loops: `for` and `while` statements
-                if stripped_line.startswith("for") or stripped_line.startswith(
-                    "while"
-                ):
-                    # Inject loop check to prevent infinite loops
-                    final_code += line + "\n"
-                    final_code += (
-                        "\t" * (indentation_level + 1)
-                        + "check_infinite_loop()\n"
-                    )
-                    indentation_stack.append(indentation_level)
-                elif stripped_line.endswith(":") or stripped_line.startswith(
-                    "else"
-                ):
-                    # colon-ending statements eg: `if`, `else`, `def`, etc.
-                    final_code += line + "\n"
-                    indentation_stack.append(indentation_level)
-                else:
-                    # Normal code lines, add update and time.sleep for slow mode
-                    final_code += line + "\n"
-                    final_code += "\t" * indentation_level + "update()\n"
-                    final_code += "\t" * indentation_level + "time.sleep(0.4)\n"
-                    if (
-                        indentation_stack
-                        and indentation_level < indentation_stack[-1]
-                    ):
-                        indentation_stack.pop()
-        else:
-            # In normal mode, inject the infinite loop check in a similar way
-            for line in code_lines:
-                stripped_line = line.strip()
-                indentation_level = len(line) - len(stripped_line)
-                if stripped_line.startswith("for") or stripped_line.startswith(
-                    "while"
-                ):
-                    # Inject loop check to prevent infinite loops
-                    final_code += line + "\n"
-                    final_code += (
-                        "\t" * (indentation_level + 1)
-                        + "check_infinite_loop()\n"
-                    )
-                else:
-                    final_code += line + "\n"
-
-            # Add a global check for loop iterations at the end of the code block
-            final_code += "\ncheck_infinite_loop()\ntime.sleep(1)\nupdate()\n"
-
-        # Inject infinite loop check function at the start of the code
-        infinite_loop_checker = (
-            f"def check_infinite_loop():\n"
-            f"\tglobal iteration_count\n"
-            f"\titeration_count += 1\n"
-            f"\tif iteration_count > MAX_ITERATIONS:\n"
-            f"\t\traise Exception('Loop exceeded maximum iterations! Check your code for a possible infinite loop')\n"
-        )
-        final_code = infinite_loop_checker + final_code
+        if self.executor is not None:
+            recording, traces, error = self.executor.run(
+                code, farm, self.instruction_budget, self.timeseries
+            )
+            if error is not None:
+                print(f"Error: {error}")
+            return recording, traces
+
+        recording = farm.fork()
+        traces = [farmer.enable_trace() for farmer in recording.farmers]
+        self.run_python_code(code, recording)
+        for farmer in recording.farmers:
+            farmer.disable_trace()
+        return recording, traces
+
+    def play_trace(self, farm, traces, done=None):
+        """
+        Displays a farm and animates recorded actions on it, played by the render loop between frames (see Stepper).
+        In slow mode the actions are played one at a time at the stepper's speed, and can be paused or skipped to the end; otherwise they are played at full speed.
+
+        Args:
+            farm: The farm to display and play the actions on, in the state they were recorded from.
+            traces: The ActionTrace of each farmer on the farm, in the order of its farmers, played together in the order the actions happened (see merge_traces()).
+            done: A function to call once the playback has finished, on the render thread; it is not called if the playback is cancelled (default is None).
+        """
+
+        def replay():
+            for _, index, action in merge_traces(traces):
+                farm.farmers[index].perform(action)
+                yield
+
+        self.farm = farm
+        # the render loop plays the actions, one per step, between frames
+        self.stepper.start(replay(), done)
+        if not self.slow_mode:
+            self.stepper.skip()
+
+    def run_python_code(self, code, farm):
+        """
+        Runs user-provided Python code against a farm, reporting any errors that arise.
+        The compiled code is cached, so running the same code again, such as on each test case, does not parse or compile it again. The run is stopped once it executes more lines than the instruction budget allows (see ExecutionBudget), and its pacing is recorded in the time series.
 
-        # execute final user Python code
+        Args:
+            code: A string containing the Python code to be executed.
+            farm: The farm the code controls.
+        """
+        farm.stats.enable_timeseries(self.timeseries)
+        self.timeseries.start_run()
         try:
-            exec(
-                final_code,
-                {
-                    "time": time,
-                    "farm": self.farm,
-                    "update": self.update,
-                    "pygame": pygame,
-                    "check_infinite_loop": self.check_infinite_loop,
-                    "iteration_count": self.iteration_count,
-                    "MAX_ITERATIONS": self.MAX_ITERATIONS,
-                },
+            ExecutionBudget(self.instruction_budget).run(
+                exec, code_cache.get(code), player_namespace(farm)
             )
-        except Exception as e:
+        except (Exception, BudgetExceeded) as e:
             print(f"Error: {e}")
+        finally:
+            self.timeseries.end_run()
+            # the farm may be displayed and replayed on later, which must not
+            # be recorded as another run
+            farm.stats.disable_timeseries()
 
     def update(self):
         """
         Updates the Pygame display by rendering the current state of the farm and the grid.
-        This function calls the rendering methods to draw the farm and grid, refreshes the display to show the updated visuals, and processes any pending events to ensure smooth interaction.
+        This function redraws whatever changed on the farm, refreshes the display only if something was drawn, and processes any pending events to ensure smooth interaction.
         """
 
-        self.render_farm()
-        self.render_grid(
-            self.SCREEN_WIDTH, self.SCREEN_HEIGHT, self.SCALE_FACTOR
-        )
-        pygame.display.flip()
+        if pygame.event.peek(pygame.VIDEOEXPOSE):
+            # the window was uncovered, so everything has to be redrawn
+            pygame.event.clear(pygame.VIDEOEXPOSE)
+            self.rendered_farm = None
+        if self.render_farm():
+            pygame.display.flip()
         pygame.event.pump()  # internally process pygame event handlers
@@ -0,0 +1,168 @@
+# eventlog.py
+import json
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+
+class EventLog:
+    """
+    Collects diagnostic events from the game in memory instead of printing them.
+    Each event has a level, a short name and any number of named fields. Events below the log's level are dropped straight away, and the rest are kept in a ring buffer holding only the most recent events, so logging never slows the game down or grows without bound.
+    Events can also be written to a file as JSON lines, one event per line.
+    """
+
+    def __init__(self, level=INFO, capacity=1000, sink=None):
+        """
+        Initializes an EventLog.
+
+        Args:
+            level: The lowest level of event to keep (default is INFO).
+            capacity: The number of most recent events to keep in memory (default is 1000).
+            sink: A text file to also write every kept event to, or None (default is None).
+        """
+        self.level = level
+        self.events = deque(maxlen=capacity)
+        self.sink = sink
+        self.owns_sink = False  # True if the log opened the sink itself
+
+    def __len__(self):
+        """
+        Returns:
+            int: The number of events held in memory.
+        """
+        return len(self.events)
+
+    def __iter__(self):
+        """
+        Iterates over the events held in memory, oldest first.
+
+        Returns:
+            iterator: An iterator over (time, level, name, fields) tuples.
+        """
+        return iter(self.events)
+
+    def enabled(self, level):
+        """
+        Checks whether events of a level are kept.
+        Callers on hot paths can check this before gathering the fields of an event.
+
+        Args:
+            level: The level to check.
+
+        Returns:
+            bool: True if events of the level are kept, otherwise False.
+        """
+        return level >= self.level
+
+    def log(self, level, name, **fields):
+        """
+        Records an event if its level is enabled.
+
+        Args:
+            level: The level of the event (DEBUG, INFO, WARNING or ERROR).
+            name: A short name describing what happened, such as "harvest".
+            **fields: Any details of the event.
+        """
+        if level < self.level:
+            return
+        event = (time.time(), level, name, fields)
+        self.events.append(event)
+        if self.sink is not None:
+            self.sink.write(self.format(event) + "\n")
+
+    def debug(self, name, **fields):
+        """
+        Records a DEBUG event; see log().
+        """
+        self.log(DEBUG, name, **fields)
+
+    def info(self, name, **fields):
+        """
+        Records an INFO event; see log().
+        """
+        self.log(INFO, name, **fields)
+
+    def warning(self, name, **fields):
+        """
+        Records a WARNING event; see log().
+        """
+        self.log(WARNING, name, **fields)
+
+    def error(self, name, **fields):
+        """
+        Records an ERROR event; see log().
+        """
+        self.log(ERROR, name, **fields)
+
+    def format(self, event):
+        """
+        Formats an event as a line of JSON.
+
+        Args:
+            event: A (time, level, name, fields) tuple.
+
+        Returns:
+            str: The event as a JSON object, with any field that JSON cannot represent written as a string.
+        """
+        timestamp, level, name, fields = event
+        record = {
+            "time": timestamp,
+            "level": LEVEL_NAMES.get(level, level),
+            "event": name,
+        }
+        record.update(fields)
+        return json.dumps(record, default=str)
+
+    def configure(self, level=None, path=None):
+        """
+        Sets the log up from the game's settings, such as its command line options.
+
+        Args:
+            level: The lowest level of event to keep, as a number or a level name such as "debug", or None to leave it unchanged (default is None).
+            path: The path of a file to also write the kept events to, or None to leave the file unchanged (default is None).
+
+        Raises:
+            ValueError: If the level is a name that is not one of the levels.
+        """
+        if isinstance(level, str):
+            try:
+                level = LEVELS[level.upper()]
+            except KeyError:
+                raise ValueError(f"Unknown log level {level!r}") from None
+        if level is not None:
+            self.level = level
+        if path is not None:
+            self.open_file(path)
+
+    def open_file(self, path):
+        """
+        Starts writing every kept event to a file, appending to it if it already exists.
+        Any file the log was already writing to is closed first.
+
+        Args:
+            path: The path of the file to write to.
+        """
+        self.close_file()
+        self.sink = open(path, "a", encoding="utf-8")
+        self.owns_sink = True
+
+    def close_file(self):
+        """
+        Stops writing events to a file, closing it if the log opened it with open_file().
+        """
+        if self.sink is not None and self.owns_sink:
+            self.sink.close()
+        self.sink = None
+        self.owns_sink = False
+
+
+# the log shared by the whole game
+log = EventLog()
@@ -0,0 +1,391 @@
+# executor.py
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from actiontrace import ActionTrace
+from budget import BudgetExceeded, ExecutionBudget
+from codecache import code_cache
+from farmer import Farmer
+from farmgrid import FarmGrid
+from inventory import Inventory
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+# modules the workers import once, before any submission is run; none of
+# them import pygame or tkinter
+PRELOAD = [
+    "actiontrace",
+    "budget",
+    "codecache",
+    "farmgrid",
+    "timeseries",
+    "executor",
+]
+
+
+def skip_update():
+    """
+    Stands in for the update() player code could call when runs were drawn as they went.
+    Runs are now recorded and played back afterwards, so there is nothing to draw while the code runs.
+    """
+
+
+def player_namespace(farm):
+    """
+    Builds the globals player code runs with, which are the same whether it runs in the game's process or in a worker.
+
+    Args:
+        farm: The farm the code controls.
+
+    Returns:
+        dict: The globals to exec() the player's compiled code in.
+    """
+    return {
+        "time": time,
+        "farm": farm,
+        "farmer": farm.farmer,
+        "update": skip_update,
+    }
+
+
+def farmer_states(farm):
+    """
+    Describes every farmer on a farm, to be sent along with the encoded farm, which only holds the main farmer (see FarmCodec).
+
+    Args:
+        farm: The farm whose farmers to describe.
+
+    Returns:
+        tuple: The (x, y, inventory counts) of each farmer, in the order of farm.farmers, and the index of the main farmer among them, or None if the farm has no main farmer.
+    """
+    states = [
+        (farmer.x, farmer.y, tuple(farmer.inventory.counts))
+        for farmer in farm.farmers
+    ]
+    main = None if farm.farmer is None else farm.farmers.index(farm.farmer)
+    return states, main
+
+
+def restore_farmers(farm, farmers):
+    """
+    Puts the farmers described by farmer_states() back on a decoded farm, keeping the main farmer the farm was decoded with.
+
+    Args:
+        farm: The decoded farm.
+        farmers: The states and main farmer index returned by farmer_states().
+    """
+    states, main = farmers
+    restored = []
+    for i, (x, y, counts) in enumerate(states):
+        farmer = farm.farmer if i == main else Farmer(farm, x, y)
+        farmer.inventory = Inventory(counts)
+        restored.append(farmer)
+    farm.farmers = restored
+
+
+def decode_farm(farm_data, farmers):
+    """
+    Args:
+        farm_data: A farm encoded with FarmGrid.to_bytes().
+        farmers: The states of the farm's farmers, from farmer_states().
+
+    Returns:
+        FarmGrid: The decoded farm, with all of its farmers.
+    """
+    farm = FarmGrid.from_bytes(farm_data)
+    restore_farmers(farm, farmers)
+    return farm
+
+
+def run_submission(code, farm_data, farmers, instruction_budget, record_pacing):
+    """
+    Runs a player's code against an encoded farm, recording every action of every farmer on it.
+    Called in a worker process for every submission it is given.
+
+    Args:
+        code: A string containing the Python code to be executed.
+        farm_data: The farm to run the code against, encoded with FarmGrid.to_bytes().
+        farmers: The states of the farm's farmers, from farmer_states().
+        instruction_budget: The largest number of lines the code may execute.
+        record_pacing: True to also record when each action happens in a TimeSeries.
+
+    Returns:
+        tuple: The encoded farm in the state the code left it in, the states of its farmers, the encoded ActionTrace of each farmer that was on the farm when the code started, the message of the error that stopped the code, or None if it finished, and the TimeSeries of the run, or None if record_pacing was False.
+    """
+    farm = decode_farm(farm_data, farmers)
+    traces = [farmer.enable_trace() for farmer in farm.farmers]
+    series = farm.stats.enable_timeseries() if record_pacing else None
+    if series is not None:
+        series.start_run()
+    error = None
+    try:
+        ExecutionBudget(instruction_budget).run(
+            exec, code_cache.get(code), player_namespace(farm)
+        )
+    except (Exception, BudgetExceeded) as e:
+        error = str(e) or type(e).__name__
+    for farmer in farm.farmers:
+        farmer.disable_trace()
+    if series is not None:
+        series.end_run()
+        farm.stats.disable_timeseries()
+    return (
+        farm.to_bytes(),
+        farmer_states(farm),
+        [trace.to_bytes() for trace in traces],
+        error,
+        series,
+    )
+
+
+def limit_cpu_time(seconds):
+    """
+    Lets the calling process use the given number of seconds of CPU time from now on, after which the operating system stops it with SIGXCPU.
+    The limit counts CPU time over the whole life of the process, so a worker moves it forward before every submission; only the soft limit is set, because an unprivileged process cannot raise its hard limit again.
+
+    Args:
+        seconds: The number of seconds of CPU time the next submission may use.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+    soft = used + seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def serve(connection, cpu_seconds, memory_bytes):
+    """
+    The main loop of a worker process: runs each submission received on the connection and sends back its result, until the connection is closed or None is received.
+
+    Args:
+        connection: The worker's end of the pipe to the Executor.
+        cpu_seconds: The number of seconds of CPU time each submission may use, or None for no limit.
+        memory_bytes: The largest address space the worker may use, in bytes, or None for no limit.
+    """
+    if resource is not None and memory_bytes is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        if resource is not None and cpu_seconds is not None:
+            limit_cpu_time(cpu_seconds)
+        connection.send(run_submission(*job))
+
+
+class Executor:
+    """
+    Runs player code in a pool of separate worker processes, so code that crashes, hangs or uses up memory cannot take the game or a grader down with it.
+    The workers are started ahead of time and already have the game's pygame-free core imported, so running a submission only costs sending the farm over a pipe, not starting a new interpreter. Each submission runs on a copy of the farm, with all of its farmers, with every farmer's actions recorded, and the finished farm and the ActionTraces come back as bytes.
+    Besides the ExecutionBudget every run has, a worker is limited in CPU time and address space by the operating system where the resource module is available, and a submission that takes too long in wall-clock time, for example because it sleeps, has its worker killed. A worker that is killed or dies is replaced straight away.
+    Workers are started with the forkserver method where the platform has it, so they never inherit the threads or the pygame and Tk state of the process using the Executor. As with any use of multiprocessing, workers import the program's main module again, so a script creating an Executor must keep its own work under an 'if __name__ == "__main__":' guard.
+    """
+
+    def __init__(
+        self,
+        workers=2,
+        cpu_seconds=5,
+        wall_seconds=10,
+        memory_bytes=512 * 1024 * 1024,
+    ):
+        """
+        Initializes an Executor and starts its worker processes.
+
+        Args:
+            workers: The number of worker processes, which is also how many submissions can run at the same time (default is 2).
+            cpu_seconds: The number of seconds of CPU time a submission may use, or None for no limit (default is 5).
+            wall_seconds: The number of seconds a submission may take from start to finish, or None for no limit (default is 10).
+            memory_bytes: The largest address space a worker may use, in bytes, or None for no limit (default is 512 MiB).
+        """
+        self.cpu_seconds = cpu_seconds
+        self.wall_seconds = wall_seconds
+        self.memory_bytes = memory_bytes
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self.context = multiprocessing.get_context("forkserver")
+            self.context.set_forkserver_preload(PRELOAD)
+        else:
+            self.context = multiprocessing.get_context("spawn")
+        # (process, connection) of free workers; None once the Executor is
+        # closed, to wake every run() waiting for a worker
+        self.idle = queue.Queue()
+        self.busy = set()  # workers running a submission
+        self.lock = threading.Lock()  # guards busy, closed and putting idle workers
+        self.closed = False
+        for _ in range(workers):
+            self.idle.put(self.start_worker())
+
+    def start_worker(self):
+        """
+        Starts a new worker process.
+
+        Returns:
+            tuple: The worker's process and the Executor's end of the pipe to it.
+        """
+        connection, worker_connection = self.context.Pipe()
+        process = self.context.Process(
+            target=serve,
+            args=(worker_connection, self.cpu_seconds, self.memory_bytes),
+            daemon=True,
+        )
+        process.start()
+        worker_connection.close()  # only the worker uses its end
+        return process, connection
+
+    def stop_worker(self, worker):
+        """
+        Kills a worker process and waits for it to exit.
+
+        Args:
+            worker: The worker's process and the Executor's end of the pipe to it.
+        """
+        process, connection = worker
+        process.kill()
+        process.join()
+        connection.close()
+
+    def run(self, code, farm, instruction_budget=20000, timeseries=None):
+        """
+        Runs a player's code against a copy of a farm in one of the worker processes, waiting for a free worker if they are all busy.
+        Nothing is drawn while the code runs; the code gets the same globals as in the game's own process (see player_namespace()). It is safe to call this from several threads at once.
+
+        Args:
+            code: A string containing the Python code to be executed.
+            farm: The farm to run the code against, which is left unchanged.
+            instruction_budget: The largest number of lines the code may execute (default is 20000).
+            timeseries: A TimeSeries to add the pacing of the run to, as recorded in the worker, or None not to record it (default is None).
+
+        Returns:
+            tuple: The copy of the farm, in the state the code left it in, the ActionTrace of each farmer on the farm, in the order of its farmers, and the message of the error that stopped the code, or None if it finished. If the worker had to be stopped, the farm is as it was before the code ran and the traces are empty.
+
+        Raises:
+            ValueError: If the Executor is closed, including while the code is waiting for a worker or running.
+        """
+        farm_data = farm.to_bytes()
+        farmers = farmer_states(farm)
+        worker = self.take_worker()
+        process, connection = worker
+        try:
+            connection.send(
+                (code, farm_data, farmers, instruction_budget, timeseries is not None)
+            )
+            if connection.poll(self.wall_seconds):
+                result = connection.recv()
+                self.release_worker(worker)
+                farm_data, farmers, traces, error, series = result
+                if series is not None:
+                    timeseries.merge(series)
+                return (
+                    decode_farm(farm_data, farmers),
+                    [ActionTrace.from_bytes(trace) for trace in traces],
+                    error,
+                )
+            error = f"Your code ran for more than {self.wall_seconds} seconds!"
+        except (EOFError, OSError):
+            process.join()  # the worker died while running the code
+            error = self.describe_exit(process.exitcode)
+        # the worker is killed and replaced, rather than trusted again
+        self.release_worker(worker, replace=True)
+        if self.closed:
+            raise ValueError("The Executor was closed while the code ran")
+        return (
+            decode_farm(farm_data, farmers),
+            [ActionTrace() for _ in farm.farmers],
+            error,
+        )
+
+    def take_worker(self):
+        """
+        Waits for a free worker and marks it as busy.
+
+        Returns:
+            tuple: The worker's process and the Executor's end of the pipe to it.
+
+        Raises:
+            ValueError: If the Executor is closed before a worker is free.
+        """
+        worker = self.idle.get()
+        with self.lock:
+            if worker is not None and not self.closed:
+                self.busy.add(worker)
+                return worker
+        if worker is None:
+            self.idle.put(None)  # wake the next run() waiting too
+        else:
+            self.stop_worker(worker)  # taken just as the Executor closed
+        raise ValueError("Cannot run code on a closed Executor")
+
+    def release_worker(self, worker, replace=False):
+        """
+        Hands a worker back once it has finished a submission, or stops it if the Executor has been closed in the meantime.
+
+        Args:
+            worker: The worker's process and the Executor's end of the pipe to it.
+            replace: True to kill the worker and start a new one in its place, for a worker that cannot be trusted again (default is False).
+        """
+        if replace:
+            self.stop_worker(worker)
+            with self.lock:
+                self.busy.discard(worker)
+                if self.closed:
+                    return
+            worker = self.start_worker()
+        with self.lock:
+            self.busy.discard(worker)
+            if not self.closed:
+                self.idle.put(worker)
+                return
+        self.stop_worker(worker)
+
+    def describe_exit(self, exitcode):
+        """
+        Args:
+            exitcode: The exit code of a worker process that died while running a submission.
+
+        Returns:
+            str: An explanation of why the worker died, for display to the player.
+        """
+        sigxcpu = getattr(signal, "SIGXCPU", None)  # not on Windows
+        if sigxcpu is not None and exitcode == -sigxcpu:
+            return f"Your code used more than {self.cpu_seconds} seconds of CPU time!"
+        if exitcode is not None and exitcode < 0:
+            return f"Your code was stopped by the system (signal {-exitcode})."
+        return f"Your code stopped the worker running it (exit code {exitcode})."
+
+    def close(self):
+        """
+        Stops every worker process, killing any still running a submission; their run() calls, and any waiting for a worker, raise ValueError.
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            busy = list(self.busy)
+            idle = []
+            while True:
+                try:
+                    idle.append(self.idle.get_nowait())
+                except queue.Empty:
+                    break
+            self.idle.put(None)
+        for process, _ in busy:
+            process.kill()  # run() sees the worker die and cleans it up
+        for process, connection in idle:
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+            process.join(1)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            connection.close()
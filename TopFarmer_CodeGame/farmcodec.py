@@ -0,0 +1,197 @@
+# farmcodec.py
+import struct
+from array import array
+from farmer import Farmer
+from inventory import Inventory
+
+
+class FarmCodec:
+    """
+    Encodes a whole farm, including its farmer and statistics, as compact bytes and decodes it again.
+    The encoding is a fixed-size header followed by the farm's configuration name and its packed tile and crop arrays, so a 10x10 farm takes under 300 bytes and encoding or decoding it is little more than a few struct calls and array copies.
+    Only the farm's main farmer is stored; farmers added with spawn_farmer() are not.
+    Decoding never runs a layout generator, which makes restoring a saved farm much cheaper than generating it again.
+    Because the tile and crop arrays are stored as-is at a known offset, an encoded farm written to a file can also be memory-mapped and played on directly (see FarmGrid.open_mapped).
+    """
+
+    MAGIC = b"TFFM"
+    FORMAT_VERSION = 1
+
+    # magic, format version, width, height, seed, config length,
+    # has farmer, farmer x, farmer y, potatoes, carrots, pumpkins held
+    HEADER = struct.Struct("<4sBIIQB?IIIII")
+
+    # stored in place of the seed of a farm that has none, such as one
+    # created with generate=False and no seed
+    NO_SEED = 2**64 - 1
+
+    # FarmStats counters in the order they are stored
+    STATS_FIELDS = (
+        "left_moves",
+        "right_moves",
+        "up_moves",
+        "down_moves",
+        "potatoes_planted",
+        "carrots_planted",
+        "pumpkins_planted",
+        "potatoes_harvested",
+        "carrots_harvested",
+        "pumpkins_harvested",
+    )
+    STATS = struct.Struct("<" + "I" * len(STATS_FIELDS))
+
+    @classmethod
+    def encode(cls, farm):
+        """
+        Encodes a farm as bytes.
+
+        Args:
+            farm: The FarmGrid to encode.
+
+        Returns:
+            bytes: The encoded farm.
+        """
+        return b"".join(
+            (
+                cls.encode_header(farm),
+                farm.tile_types.tobytes(),
+                farm.crop_types.tobytes(),
+            )
+        )
+
+    @classmethod
+    def encode_header(cls, farm):
+        """
+        Encodes everything about a farm that is stored in front of its tile and crop arrays: the header, the statistics and the configuration name.
+
+        Args:
+            farm: The FarmGrid to encode.
+
+        Returns:
+            bytes: The encoded header.
+        """
+        name = farm.config.encode("utf-8")
+        farmer = farm.farmer
+        if farmer is None:
+            farmer_fields = (False, 0, 0, 0, 0, 0)
+        else:
+            farmer_fields = (
+                True,
+                farmer.x,
+                farmer.y,
+                *farmer.inventory.counts,
+            )
+        stats = farm.stats
+        return b"".join(
+            (
+                cls.HEADER.pack(
+                    cls.MAGIC,
+                    cls.FORMAT_VERSION,
+                    farm.width,
+                    farm.height,
+                    cls.NO_SEED if farm.seed is None else farm.seed,
+                    len(name),
+                    *farmer_fields,
+                ),
+                cls.STATS.pack(
+                    *[getattr(stats, field) for field in cls.STATS_FIELDS]
+                ),
+                name,
+            )
+        )
+
+    @classmethod
+    def read_header(cls, data):
+        """
+        Reads and checks the header of an encoded farm.
+
+        Args:
+            data: The encoded farm, as bytes or any other buffer.
+
+        Returns:
+            tuple: The header fields (magic, version, width, height, seed, config length, has farmer, farmer x, farmer y, potatoes, carrots, pumpkins).
+
+        Raises:
+            ValueError: If the data is not an encoded farm, was written by an unsupported version or has the wrong size.
+        """
+        if len(data) < cls.HEADER.size:
+            raise ValueError("Encoded farm is truncated")
+        header = cls.HEADER.unpack_from(data, 0)
+        magic, version, width, height, seed, name_size = header[:6]
+        if magic != cls.MAGIC:
+            raise ValueError("Not an encoded farm")
+        if version != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported farm encoding version {version}")
+        if len(data) != cls.layout_offset(name_size) + 2 * width * height:
+            raise ValueError("Encoded farm has the wrong size")
+        return header
+
+    @classmethod
+    def layout_offset(cls, name_size):
+        """
+        Args:
+            name_size: The length of the encoded configuration name.
+
+        Returns:
+            int: The offset of the packed tile array within an encoded farm.
+        """
+        return cls.HEADER.size + cls.STATS.size + name_size
+
+    @classmethod
+    def decode(cls, data, farm_class, copy=True):
+        """
+        Decodes a farm previously encoded with encode().
+
+        Args:
+            data: The encoded farm, as bytes or any other buffer.
+            farm_class: The class of the farm to create, normally FarmGrid.
+            copy: False to have the farm keep its tiles in data itself instead of in copies of the arrays, so every change to the farm is written straight into data; data must then be writable, such as an mmap (default is True).
+
+        Returns:
+            FarmGrid: The decoded farm.
+
+        Raises:
+            ValueError: If the data is not an encoded farm, was written by an unsupported version or has the wrong size.
+        """
+        (
+            _,
+            _,
+            width,
+            height,
+            seed,
+            name_size,
+            has_farmer,
+            x,
+            y,
+            potatoes,
+            carrots,
+            pumpkins,
+        ) = cls.read_header(data)
+
+        offset = cls.HEADER.size
+        counters = cls.STATS.unpack_from(data, offset)
+        offset += cls.STATS.size
+        config = bytes(data[offset : offset + name_size]).decode("utf-8")
+        offset += name_size
+        size = width * height
+
+        layout = memoryview(data).cast("b")
+        tile_types = layout[offset : offset + size]
+        crop_types = layout[offset + size : offset + 2 * size]
+        if copy:
+            # copied straight out of the buffer, without a bytes copy first
+            tile_types, crop_types = array("b"), array("b")
+            tile_types.frombytes(layout[offset : offset + size])
+            crop_types.frombytes(layout[offset + size : offset + 2 * size])
+
+        if seed == cls.NO_SEED:
+            seed = None
+        farm = farm_class(width, height, config, seed=seed, generate=False)
+        farm.use_storage(tile_types, crop_types)
+        if has_farmer:
+            farm.farmer = Farmer(farm, x, y)
+            farm.farmers.append(farm.farmer)
+            farm.farmer.inventory = Inventory((potatoes, carrots, pumpkins))
+        for field, value in zip(cls.STATS_FIELDS, counters):
+            setattr(farm.stats, field, value)
+        return farm
@@ -1,6 +1,14 @@
 # farmer.py
+import copy
+from actions import CROP_TYPES, DIRECTIONS, check_action
+from actiontrace import ActionTrace
+from eventlog import DEBUG, log
+from inventory import Inventory
 
-from farmtile import *
+# opcodes Farmer.run() turns actions into before performing them
+MOVE, PLANT, HARVEST = range(3)
+OPCODES = {"move": MOVE, "plant": PLANT, "harvest": HARVEST}
+ACTION_NAMES = ("move", "plant", "harvest")
 
 
 class Farmer:
@@ -28,7 +36,9 @@ class Farmer:
         self.y = y
 
         # Give the farmer 10 of each crop
-        self.inventory = [0, 1, 2] * 10
+        self.inventory = Inventory((10, 10, 10))
+
+        self.trace = None  # ActionTrace recording every action, if enabled
 
     def __str__(self):
         """
@@ -41,6 +51,68 @@ class Farmer:
 
         return self.symbol
 
+    def copy(self, farm):
+        """
+        Creates a copy of the farmer, with its own inventory, standing on another farm.
+        This is used when a farm is forked so each fork has a farmer it can move independently.
+
+        Args:
+            farm: The farm the copied farmer belongs to.
+
+        Returns:
+            Farmer: The copied farmer.
+        """
+        farmer = copy.copy(self)
+        farmer.farm = farm
+        farmer.inventory = self.inventory.copy()
+        farmer.trace = None
+        return farmer
+
+    def enable_trace(self, capacity=1024):
+        """
+        Starts recording every action the farmer attempts in an ActionTrace.
+        Recording is off by default; while it is off the only cost to each action is checking whether a trace is set.
+
+        Args:
+            capacity: The number of actions to allocate room for up front (default is 1024).
+
+        Returns:
+            ActionTrace: The trace the actions are recorded in.
+        """
+        self.trace = ActionTrace(capacity)
+        return self.trace
+
+    def disable_trace(self):
+        """
+        Stops recording the farmer's actions.
+
+        Returns:
+            ActionTrace: The trace that was being recorded, or None if recording was not enabled.
+        """
+        trace, self.trace = self.trace, None
+        return trace
+
+    def record_action(self, action, direction, crop, accepted):
+        """
+        Records an attempted action in the farmer's trace and the farm's time series, whichever of them are enabled.
+        The action is recorded at the tick of the scheduler's clock, which an action taken outside a scheduler tick also advances.
+
+        Args:
+            action: The name of the action ('move', 'plant' or 'harvest').
+            direction: The direction the action was made in.
+            crop: The type of crop planted or harvested, or None.
+            accepted: True if the action was carried out, otherwise False.
+        """
+        scheduler = self.farm.scheduler
+        tick = scheduler.clock
+        if not scheduler.ticking:
+            scheduler.clock += 1  # an action outside a tick is a tick of its own
+        if self.trace is not None:
+            self.trace.record(tick, action, direction, crop, accepted)
+        series = self.farm.stats.timeseries
+        if series is not None:
+            series.record(tick)
+
     def get_pos(self):
         """
         Retrieves the current position of the farmer on the farm grid.
@@ -55,10 +127,13 @@ class Farmer:
     def add_inventory(self, crop):
         """
         Adds a specified crop to the farmer's inventory.
-        This function appends the given crop to the inventory list, allowing the farmer to collect and manage their crops throughout the game.
+        This function adds the given crop to the inventory, allowing the farmer to collect and manage their crops throughout the game.
 
         Args:
             crop: The type of crop to be added to the inventory.
+
+        Raises:
+            ValueError: If the specified crop is not a crop type.
         """
 
         self.inventory.append(crop)
@@ -66,7 +141,7 @@ class Farmer:
     def remove_inventory(self, crop):
         """
         Removes a specified crop from the farmer's inventory.
-        This function deletes the given crop from the inventory list, allowing the farmer to manage their collection of crops throughout the game.
+        This function takes the given crop out of the inventory, allowing the farmer to manage their collection of crops throughout the game.
 
         Args:
             crop: The type of crop to be removed from the inventory.
@@ -87,8 +162,9 @@ class Farmer:
         """
 
         return {
-            self.crop_desc[crop]: self.inventory.count(crop)
-            for crop in set(self.inventory)
+            self.crop_desc[crop]: count
+            for crop, count in enumerate(self.inventory.counts)
+            if count
         }
 
     def move(self, direction):
@@ -98,18 +174,24 @@ class Farmer:
 
         Args:
             direction: A string indicating the direction to move ('up', 'down', 'left', or 'right').
+
+        Returns:
+            bool: True if the farmer moved, otherwise False.
         """
 
-        dest = {
-            "up": (self.x, self.y - 1),
-            "down": (self.x, self.y + 1),
-            "left": (self.x - 1, self.y),
-            "right": (self.x + 1, self.y),
-        }.get(direction, self.get_pos())
+        dx, dy = DIRECTIONS.get(direction, (0, 0))
+        dest = (self.x + dx, self.y + dy)
 
+        moved = False
         if self.farm.walkable(dest) and not self.farm.out_of_bounds(dest):
+            self.farm.mark_dirty(self.x, self.y)
             self.x, self.y = dest
+            self.farm.mark_dirty(self.x, self.y)
             self.farm.stats.add_moves(direction)
+            moved = True
+
+        self.record_action("move", direction, None, moved)
+        return moved
 
     def plant(self, crop, direction):
         """
@@ -120,27 +202,27 @@ class Farmer:
             crop: The type of crop to be planted (e.g., 'potato', 'carrot', 'pumpkin').
             direction: A string indicating the direction to plant the crop ('up', 'down', 'left', or 'right').
 
-        Raises:
-            ValueError: If the specified crop is not found in the inventory or if the destination tile is not a dirt tile.
+        Returns:
+            bool: True if the crop was planted, otherwise False.
         """
 
-        crop = {v: k for k, v in self.crop_desc.items()}.get(
-            crop
-        )  # invert dictionary
-        dest = {
-            "up": (self.x, self.y - 1),
-            "down": (self.x, self.y + 1),
-            "left": (self.x - 1, self.y),
-            "right": (self.x + 1, self.y),
-        }.get(direction, self.get_pos())
+        crop = CROP_TYPES.get(crop)
+        dx, dy = DIRECTIONS.get(direction, (0, 0))
+        dest = (self.x + dx, self.y + dy)
 
+        planted = False
         if (
-            self.farm.grid[dest[0]][dest[1]].tile_type == 0
+            not self.farm.out_of_bounds(dest)
+            and self.farm.get_tile_type(*dest) == 0
             and crop in self.inventory
         ):
             self.inventory.remove(crop)
-            self.farm.grid[dest[0]][dest[1]] = CropTile(dest[0], dest[1], crop)
+            self.farm.set_tile(dest[0], dest[1], 3, crop)
             self.farm.stats.add_crops_planted(self.crop_desc[crop])
+            planted = True
+
+        self.record_action("plant", direction, crop, planted)
+        return planted
 
     def harvest(self, direction):
         """
@@ -150,27 +232,143 @@ class Farmer:
         Args:
             direction: A string indicating the direction to harvest the crop ('up', 'down', 'left', or 'right').
 
-        Raises:
-            ValueError: If the destination tile does not contain a crop or is out of bounds.
+        Returns:
+            bool: True if a crop was harvested, otherwise False.
         """
 
-        dest = {
-            "up": (self.x, self.y - 1),
-            "down": (self.x, self.y + 1),
-            "left": (self.x - 1, self.y),
-            "right": (self.x + 1, self.y),
-        }.get(direction, self.get_pos())
+        dx, dy = DIRECTIONS.get(direction, (0, 0))
+        dest = (self.x + dx, self.y + dy)
 
-        if self.farm.grid[dest[0]][dest[1]].tile_type == 3:
-            crop = self.farm.grid[dest[0]][dest[1]].crop_type
+        crop = None
+        if (
+            not self.farm.out_of_bounds(dest)
+            and self.farm.get_tile_type(*dest) == 3
+        ):
+            crop = self.farm.get_crop_type(*dest)
             self.inventory.append(crop)
-            self.farm.grid[dest[0]][dest[1]] = FarmTile(
-                dest[0], dest[1], 0
-            )  # Reset to dirt
+            self.farm.set_tile(dest[0], dest[1], 0)  # Reset to dirt
             self.farm.stats.add_crops_harvested(self.crop_desc[crop])
             # Update harvested crops count
             self.farm.stats.increment_harvested(crop)
-            print("HARVEST POTATO:  ", self.farm.stats.get_potatoes_harvested())
-            print("HARVEST CARROT:  ", self.farm.stats.get_carrots_harvested())
-            print("HARVEST PUMPKIN: ", self.farm.stats.get_pumpkins_harvested())
-            print("HARVEST TOTAL:   ", self.farm.stats.get_total_harvested())
+            if log.enabled(DEBUG):  # skip gathering the totals otherwise
+                self.log_harvest(crop)
+
+        self.record_action("harvest", direction, crop, crop is not None)
+        return crop is not None
+
+    def log_harvest(self, crop):
+        """
+        Logs a harvest at debug level, along with the harvest totals so far.
+
+        Args:
+            crop: The type of crop harvested.
+        """
+        log.debug(
+            "harvest",
+            crop=self.crop_desc[crop],
+            potatoes=self.farm.stats.get_potatoes_harvested(),
+            carrots=self.farm.stats.get_carrots_harvested(),
+            pumpkins=self.farm.stats.get_pumpkins_harvested(),
+            total=self.farm.stats.get_total_harvested(),
+        )
+
+    def goto(self, x, y):
+        """
+        Walks the farmer to the given position along a shortest route, going around water and trees.
+        Each step is an ordinary move, so it is recorded in the farm's statistics like any other move.
+
+        Args:
+            x: The x-coordinate to walk to.
+            y: The y-coordinate to walk to.
+
+        Returns:
+            bool: True if the farmer reached the position, otherwise False (in which case the farmer has not moved).
+        """
+
+        route = self.farm.paths.route(self.get_pos(), (x, y))
+        if route is None:
+            return False
+        for direction in route:
+            self.move(direction)
+        return True
+
+    def run(self, actions):
+        """
+        Performs a whole sequence of actions in one call.
+        Every action is checked and turned into an opcode and a tile offset before any of them is performed, so a malformed program is rejected without touching the farm; the actions are then applied in one loop through the same farm and statistics methods as move, plant and harvest, with exactly the same results as calling them one by one. Each action is only handed to record_action() while a trace or time series is set.
+        An action that cannot be carried out (for example a move into water) is skipped like the single calls skip it, and the rest of the sequence still runs.
+
+        Args:
+            actions: An iterable of action tuples, each one of ("move", direction), ("plant", crop, direction) or ("harvest", direction).
+
+        Returns:
+            int: The index of the first action that could not be carried out, or None if every action succeeded.
+
+        Raises:
+            ValueError: If an action is not one of the forms above, or names an unknown direction or crop.
+        """
+
+        steps = []  # (opcode, dx, dy, crop, direction) per action
+        for i, action in enumerate(actions):
+            try:
+                check_action(action)
+            except ValueError as e:
+                raise ValueError(f"Action {i}: {e}") from None
+            dx, dy = DIRECTIONS[action[-1]]
+            crop = CROP_TYPES[action[1]] if action[0] == "plant" else None
+            steps.append((OPCODES[action[0]], dx, dy, crop, action[-1]))
+
+        farm = self.farm
+        stats = farm.stats
+        width, height = farm.width, farm.height
+        observed = self.trace is not None or stats.timeseries is not None
+        first_rejected = None
+        for i, (opcode, dx, dy, crop, direction) in enumerate(steps):
+            tx, ty = self.x + dx, self.y + dy
+            inside = 0 <= tx < width and 0 <= ty < height
+            tile = farm.get_tile_type(tx, ty) if inside else None
+            accepted = False
+            if opcode == MOVE:
+                if inside and (tile < 2 or tile == 3):
+                    farm.mark_dirty(self.x, self.y)
+                    self.x, self.y = tx, ty
+                    farm.mark_dirty(tx, ty)
+                    stats.add_moves(direction)
+                    accepted = True
+            elif opcode == PLANT:
+                if tile == 0 and crop in self.inventory:
+                    self.inventory.remove(crop)
+                    farm.set_tile(tx, ty, 3, crop)
+                    stats.add_crops_planted(self.crop_desc[crop])
+                    accepted = True
+            elif tile == 3:
+                crop = farm.get_crop_type(tx, ty)
+                self.inventory.append(crop)
+                farm.set_tile(tx, ty, 0)
+                stats.add_crops_harvested(self.crop_desc[crop])
+                stats.increment_harvested(crop)
+                accepted = True
+                if log.enabled(DEBUG):
+                    self.log_harvest(crop)
+            if not accepted and first_rejected is None:
+                first_rejected = i
+            if observed:
+                self.record_action(ACTION_NAMES[opcode], direction, crop, accepted)
+        if not observed and not farm.scheduler.ticking:
+            farm.scheduler.clock += len(steps)  # as record_action() would
+        return first_rejected
+
+    def perform(self, action):
+        """
+        Performs a single action given as a tuple, as accepted by run().
+        The action is assumed to have been checked with check_action().
+
+        Args:
+            action: The action to perform, one of ("move", direction), ("plant", crop, direction) or ("harvest", direction).
+
+        Returns:
+            bool: True if the action was carried out, otherwise False.
+        """
+
+        name, *args = action
+        return getattr(self, name)(*args)
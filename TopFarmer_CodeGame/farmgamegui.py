@@ -5,12 +5,15 @@ import tkinter.font as tkfont
 from tkinter import messagebox
 import os
 import threading
+import queue
 import embed_pygame
 from saveandload import SaveAndLoad
 from level import Levels
 from farmgrid import FarmGrid
+from layoutpipeline import LayoutPipeline
 import time
 from musicplayer import MusicPlayer
+from eventlog import log
 import sys
 
 
@@ -20,13 +23,14 @@ class FarmGameGUI(tk.Tk):
     """
 
     # __init__ function for class FarmGame
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, executor=None, **kwargs):
         """
         Initializes the FarmGame GUI application, setting up the main window and its components.
         This includes configuring the window size, creating frames for different game pages, and initializing the music player.
 
         Args:
             *args: Variable length argument list.
+            executor: The Executor to run the player's code in, or None to run it in this process (default is None).
             **kwargs: Arbitrary keyword arguments.
         """
 
@@ -67,6 +71,10 @@ class FarmGameGUI(tk.Tk):
 
         self.show_frame(HomePage)
 
+        # run the player's code in worker processes, if the game was given any
+        self.executor = executor
+        self.frames[GamePage].embed_pygame_o.executor = executor
+
         # audio files paths
         bg_music = "assets/music/Lively Meadow (Song Loop) B 118.wav"
         completion_sound = "assets/music/Lively Meadow Victory Fanfare.wav"
@@ -90,7 +98,7 @@ class FarmGameGUI(tk.Tk):
     def on_closing(self):
         """
         Handles the actions to be taken when the application window is closing.
-        This includes stopping the background music, saving the current code, exiting the embedded Pygame instance, and closing the application.
+        This includes stopping the background music, saving the current code and the generated farm layouts, exiting the embedded Pygame instance, stopping the workers running the player's code, and closing the application.
         """
 
         self.music_player.stop_background_music()
@@ -98,6 +106,9 @@ class FarmGameGUI(tk.Tk):
             self.frames[GamePage].txt_code.get(1.0, "end-1c")
         )
         self.frames[GamePage].embed_pygame_o.exit()
+        self.levels.save_layout_cache()
+        if self.executor is not None:
+            self.executor.close()
         self.destroy()  # destroy tkinter window
         sys.exit(0)  # exit python program
 
@@ -198,7 +209,7 @@ class HomePage(tk.Frame):
         If the user agrees, it resets the game state, deletes any existing save files, clears the input text box, and initializes the game environment.
         """
 
-        print("new game")
+        log.debug("button", name="new game")
 
         """Ask user if user wants to start new game. If yes, start new game. If no, do nothing."""
         answer = messagebox.askquestion(
@@ -208,9 +219,9 @@ class HomePage(tk.Frame):
         if answer == "yes":
             if os.path.exists("level_progress.json"):
                 os.remove("level_progress.json")
-                print(f"Save file deleted.")
+                log.info("save_deleted")
             else:
-                print(f"No save file yet.")
+                log.info("no_save_file")
             self.controller.frames[GamePage].txt_code.delete(
                 "1.0", "end-1c"
             )  # clear input text box
@@ -233,7 +244,7 @@ class HomePage(tk.Frame):
         This function resets the game state and displays the GamePage, allowing the player to resume their progress.
         """
 
-        print("continue")
+        log.debug("button", name="continue")
         self.controller.frames[GamePage].handle_restart()
         self.controller.show_frame(GamePage)
         # self.controller.frames[GamePage].display_level_task()
@@ -244,7 +255,7 @@ class HomePage(tk.Frame):
         This function updates the displayed frame to show the LevelsPage, allowing the user to select different game levels.
         """
 
-        print("levels")
+        log.debug("button", name="levels")
         self.controller.show_frame(LevelsPage)
 
     def handle_statistics(self):
@@ -253,7 +264,7 @@ class HomePage(tk.Frame):
         This function updates the displayed frame to show the StatisticsPage and refreshes the statistics displayed to the user.
         """
 
-        print("statistics")
+        log.debug("button", name="statistics")
         self.controller.show_frame(StatisticsPage)
         self.controller.frames[StatisticsPage].refresh()
         # TODO: show statistics
@@ -264,7 +275,7 @@ class HomePage(tk.Frame):
         This function updates the displayed frame to show the SettingsPage, allowing the user to adjust game settings.
         """
 
-        print("settings")
+        log.debug("button", name="settings")
         self.controller.show_frame(SettingsPage)
         # TODO: show settings
 
@@ -275,6 +286,9 @@ class GamePage(tk.Frame):
     It initializes the layout for user input, manages the embedded Pygame display, and handles game logic such as running code, updating inventory, and managing levels.
     """
 
+    NUM_TEST_CASES = 3  # farms a multi-case level is checked against
+    UI_POLL_MS = 20  # how often calls queued for the Tk thread are made
+
     def __init__(self, parent, controller):
         """
         Initializes the GamePage frame of the Farm Game, setting up the layout for user input and game interaction.
@@ -290,6 +304,11 @@ class GamePage(tk.Frame):
         self.config(bg="sky blue")
         self.lock = threading.Lock()
         self.pygame_thread_running = True  # flag for pygame thread
+        self.layout_pipeline = None  # prefetches farms for test cases
+        # calls other threads hand over to the Tk thread, which is the only
+        # thread allowed to use Tk; see call_on_ui_thread()
+        self.ui_calls = queue.Queue()
+        self.poll_ui_calls()
 
         # Frame for user input
         frm_input = tk.Frame(self, bg="sky blue", width=400, height=300)
@@ -353,6 +372,25 @@ class GamePage(tk.Frame):
         btn_home = tk.Button(
             frm_buttons, text="Home", width=5, command=self.handle_home
         )
+        self.btn_pause = tk.Button(
+            frm_buttons, text="Pause", width=5, command=self.handle_pause
+        )
+        btn_skip = tk.Button(
+            frm_buttons, text="Skip", width=5, command=self.handle_skip
+        )
+
+        # Slider for the slow mode speed, in farmer actions per second
+        self.scl_speed = tk.Scale(
+            frm_buttons,
+            from_=0.5,
+            to=20,
+            resolution=0.5,
+            orient="horizontal",
+            label="Steps/s",
+            bg="sky blue",
+            highlightthickness=0,
+            command=self.handle_speed,
+        )
 
         # Pack buttons under input text box
         btn_run.pack(side="left", padx=5)
@@ -361,6 +399,9 @@ class GamePage(tk.Frame):
         btn_task.pack(side="left", padx=5)
         btn_help.pack(side="left", padx=5)
         btn_home.pack(side="left", padx=5)
+        self.btn_pause.pack(side="left", padx=5)
+        btn_skip.pack(side="left", padx=5)
+        self.scl_speed.pack(side="left", padx=5)
 
         # Pack input frame
         frm_input.pack(
@@ -369,6 +410,7 @@ class GamePage(tk.Frame):
 
         # Label with farmer inventory
         self.lbl_inventory = tk.Label(self)
+        self.shown_inventory = None  # counts currently shown in the label
         self.lbl_inventory.pack(side="top", padx=5, pady=5)
 
         # Frame for embedded Pygame display
@@ -380,12 +422,43 @@ class GamePage(tk.Frame):
 
         # Create an instance of embed_pygame
         self.embed_pygame_o = embed_pygame.EmbedPygame()
+        self.scl_speed.set(self.embed_pygame_o.stepper.steps_per_second)
+
+        # The run of the user's code in progress; bumped to ignore runs that
+        # finish after the level was restarted
+        self.run_number = 0
+        self.recording_run = None  # the run whose code is being recorded
+        self.test_cases = []
 
         # Start pygame loop in separate thread
         self.thread = threading.Thread(target=self.pygame_loop)
         self.thread.daemon = True
         self.thread.start()
 
+    def call_on_ui_thread(self, function, *args):
+        """
+        Queues a function to be called on the Tk thread, from any thread.
+        Tk must only be used from the thread running its main loop, so the pygame thread and the threads recording test cases hand their results over this way instead of calling Tk themselves.
+
+        Args:
+            function: The function to call.
+            *args: The arguments to call it with.
+        """
+        self.ui_calls.put((function, args))
+
+    def poll_ui_calls(self):
+        """
+        Makes the calls queued by call_on_ui_thread(), on the Tk thread, and checks for more every UI_POLL_MS milliseconds.
+        """
+
+        while True:
+            try:
+                function, args = self.ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            function(*args)
+        self.after(self.UI_POLL_MS, self.poll_ui_calls)
+
     # a cheap/lazy way of preventing deadlock
     def pygame_loop(self):
         """
@@ -395,6 +468,10 @@ class GamePage(tk.Frame):
 
         while self.pygame_thread_running:
             with self.lock:
+                # play the steps of a run that are due, then draw the farm;
+                # runs only change the farm here, so it never changes while
+                # it is drawn
+                self.embed_pygame_o.stepper.pump()
                 self.embed_pygame_o.update()
                 self.update_inventory()
             time.sleep(0.03)
@@ -408,23 +485,53 @@ class GamePage(tk.Frame):
             level_number: The number of the level to start.
         """
 
+        self.embed_pygame_o.stepper.cancel()  # stop any run still playing
+        self.run_number += 1
         self.controller.levels.current_level = level_number
-        if level_number == 8:
-            self.controller.frames[GamePage].embed_pygame_o.slow_mode = False
-            print("FORCED SLOWMODE OFF")
-        elif self.controller.frames[SettingsPage].slow_mode.get() == 1:
+        if self.controller.frames[SettingsPage].slow_mode.get() == 1:
             self.controller.frames[GamePage].embed_pygame_o.slow_mode = True
-            print("SLOWMODE ON")
+            log.info("slow_mode", enabled=True)
         else:
             self.controller.frames[GamePage].embed_pygame_o.slow_mode = False
-            print("SLOWMODE OFF")
+            log.info("slow_mode", enabled=False)
 
+        self.embed_pygame_o.instruction_budget = (
+            self.controller.levels.get_instruction_budget()
+        )
         self.current_farm_config = self.controller.levels.get_current_config()
         self.embed_pygame_o.farm = FarmGrid(
-            config=self.current_farm_config
+            config=self.current_farm_config,
+            layout_cache=self.controller.levels.layout_cache,
         )  # Reinitialize farm with new config
+        self.prepare_test_cases()
         self.display_level_task()
 
+    def prepare_test_cases(self):
+        """
+        Starts generating the test case farms for the current level in the background, so they are ready by the time the user runs their code.
+        Levels with a single test case do not need a pipeline, so any pipeline left over from a previous level is closed.
+        """
+
+        config = self.controller.levels.get_current_config()
+        if (
+            self.layout_pipeline is not None
+            and self.layout_pipeline.config == config
+            and self.controller.levels.get_test_cases()
+        ):
+            return  # already prefetching farms for this config
+
+        if self.layout_pipeline is not None:
+            self.layout_pipeline.close()
+            self.layout_pipeline = None
+        if self.controller.levels.get_test_cases():
+            self.layout_pipeline = LayoutPipeline(
+                self.embed_pygame_o.FARM_WIDTH,
+                self.embed_pygame_o.FARM_HEIGHT,
+                config,
+                depth=self.NUM_TEST_CASES,
+                layout_cache=self.controller.levels.layout_cache,
+            )
+
     def display_level_task(self):
         """
         Displays the current task for the active level in a message box.
@@ -440,12 +547,15 @@ class GamePage(tk.Frame):
         """
         Updates the inventory display for the farmer in the game.
         This function checks the current state of the farm and retrieves the counts of potatoes, carrots, and pumpkins, then updates the inventory label accordingly.
+        The label is only rescheduled when the counts have changed since it was last updated.
         """
 
         if self.embed_pygame_o.farm and self.embed_pygame_o.farm.farmer:
-            potatoes = self.embed_pygame_o.farm.farmer.inventory.count(0)
-            carrots = self.embed_pygame_o.farm.farmer.inventory.count(1)
-            pumpkins = self.embed_pygame_o.farm.farmer.inventory.count(2)
+            counts = tuple(self.embed_pygame_o.farm.farmer.inventory.counts)
+            if counts == self.shown_inventory:
+                return
+            self.shown_inventory = counts
+            potatoes, carrots, pumpkins = counts
 
             def update_label():
                 self.lbl_inventory.config(
@@ -454,73 +564,198 @@ class GamePage(tk.Frame):
                     )
                 )
 
-            self.lbl_inventory.after(0, update_label)  # scheduling
+            self.call_on_ui_thread(update_label)
 
     def handle_run(self):
         """
         Handles the execution of user-provided code in the game environment.
-        This function retrieves the code from the input text box, checks for its validity, and executes it, managing both single and multiple test cases while updating the game state based on the execution results.
+        This function retrieves the code from the input text box, checks for its validity, and runs it at full speed on every test case in a background thread, checking the results; once that is done the runs are played back, and the result is reported once the playback is done or skipped. The interface stays responsive throughout.
 
         Raises:
-            messagebox.showerror: If no code is entered by the user.
+            messagebox.showerror: If no code is entered by the user, or the previous run is still playing.
         """
 
-        print("run")
+        log.debug("button", name="run")
         code = self.txt_code.get(1.0, "end-1c")  # Get user code from text box
         if code == "":  # Check if user has entered code
             messagebox.showerror(
                 title="ERROR!", message="There is no code to run."
             )
+        elif (
+            self.embed_pygame_o.stepper.running
+            or self.recording_run == self.run_number
+        ):
+            messagebox.showerror(
+                title="ERROR!", message="Your code is still playing."
+            )
         else:
-            if (
-                self.controller.levels.get_test_cases() == False
-            ):  # Handle single test case
-                self.embed_pygame_o.execute_python_code(
-                    code
-                )  # Execute user code
-
-                # Check if the level is completed
-                if self.controller.levels.check_current_level_completion(
-                    self.embed_pygame_o.farm.stats
-                ):
-                    self.level_completed()
-                    self.controller.frames[LevelsPage].update_level_buttons()
-                else:
-                    self.level_failed()
-            else:  # Handle multiple test cases
-                num_test_cases = 3  # Run 3 test cases
-                all_passed = True
-
-                for i in range(num_test_cases):
-                    # Reset the farm for the current test case
-                    self.embed_pygame_o.farm = FarmGrid(
-                        self.embed_pygame_o.FARM_WIDTH,
-                        self.embed_pygame_o.FARM_HEIGHT,
-                        config=self.controller.levels.get_current_config(),
-                    )
+            self.run_number += 1
+            self.recording_run = self.run_number
+            self.prepare_test_cases()
+            recorder = threading.Thread(
+                target=self.record_test_cases,
+                args=(
+                    self.run_number,
+                    code,
+                    self.embed_pygame_o.farm,
+                    self.layout_pipeline,
+                ),
+            )
+            recorder.daemon = True
+            recorder.start()
 
-                    # Ensure farm grid and display are updated before code execution
-                    self.embed_pygame_o.update()
-                    time.sleep(1)  # Wait for farm display to update
-
-                    # Execute the user code
-                    self.embed_pygame_o.execute_python_code(code)
-
-                    # Check if the level is completed for the current test case
-                    if not self.controller.levels.check_current_level_completion(
-                        self.embed_pygame_o.farm.stats
-                    ):
-                        all_passed = False
-                        break  # Exit loop if any test case fails
-                    else:
-                        print(f"Test case {i+1} passed!")
-
-                # Check if all test cases passed
-                if all_passed:
-                    self.level_completed()
-                    self.controller.frames[LevelsPage].update_level_buttons()
-                else:
-                    self.level_failed()
+    def record_test_cases(self, run_number, code, farm, pipeline):
+        """
+        Runs the user's code at full speed on every test case of the level, recording the farmer's actions, and checks each result straight away.
+        This runs in a background thread, so however long the code takes the interface does not freeze; once every case is recorded, start_test_cases() is queued for the Tk thread to play them back.
+        Levels with several test cases take their farms from the layout pipeline and stop at the first failing one. A run replaced by a restart or a new level stops early and its results are dropped.
+
+        Args:
+            run_number: The run the test cases belong to.
+            code: The user's code.
+            farm: The displayed farm, which is the only test case of levels without a pipeline.
+            pipeline: The LayoutPipeline generating the level's test case farms, or None for levels with a single test case.
+        """
+
+        test_cases = []  # (farm, traces, finished farm, passed) per case
+        try:
+            if pipeline is None:  # single test case
+                recording, traces = self.embed_pygame_o.record_python_code(
+                    code, farm
+                )
+                passed = self.controller.levels.check_current_level_completion(
+                    recording.stats
+                )
+                test_cases.append((farm, traces, recording, passed))
+                return
+
+            for i in range(self.NUM_TEST_CASES):
+                # a farm generated in the background while the last case ran
+                farm = None
+                while farm is None and run_number == self.run_number:
+                    try:
+                        farm = pipeline.next(timeout=0.5)
+                    except queue.Empty:
+                        continue
+                    except ValueError:
+                        break  # the pipeline was closed for a new level
+                if farm is None:
+                    return
+                recording, traces = self.embed_pygame_o.record_python_code(
+                    code, farm
+                )
+                passed = self.controller.levels.check_current_level_completion(
+                    recording.stats
+                )
+                # the seed reproduces the farm exactly, e.g. a failing one
+                log.info(
+                    "test_case", case=i + 1, passed=passed, seed=farm.seed
+                )
+                test_cases.append((farm, traces, recording, passed))
+                if not passed:
+                    break  # stop at the first failing test case
+        finally:
+            # hand over whatever was recorded, even if recording failed
+            self.call_on_ui_thread(self.start_test_cases, run_number, test_cases)
+
+    def start_test_cases(self, run_number, test_cases):
+        """
+        Starts playing back the test cases recorded by record_test_cases(), on the Tk thread.
+
+        Args:
+            run_number: The run the test cases belong to; runs replaced by a restart or a new level are ignored.
+            test_cases: The (farm, traces, finished farm, passed) of every recorded test case.
+        """
+
+        if run_number != self.run_number:
+            return
+        self.recording_run = None
+        self.test_cases = test_cases
+        if test_cases:
+            self.play_test_case(run_number, 0)
+
+    def play_test_case(self, run_number, case):
+        """
+        Shows a recorded test case being played back on its farm.
+        In slow mode the farmer's actions are played at the chosen speed in the background, and finish_test_case() is queued for the Tk thread once they are done, so the interface stays responsive while the run plays.
+
+        Args:
+            run_number: The run the test case belongs to; runs replaced by a restart or a new level are ignored.
+            case: The index of the test case to play.
+        """
+
+        if run_number != self.run_number:
+            return
+
+        farm, traces, _, _ = self.test_cases[case]
+        self.embed_pygame_o.play_trace(
+            farm,
+            traces,
+            done=lambda: self.call_on_ui_thread(
+                self.finish_test_case, run_number, case
+            ),
+        )
+
+    def finish_test_case(self, run_number, case):
+        """
+        Moves on to the next test case once a test case has been played back, or reports the result of the run.
+
+        Args:
+            run_number: The run the test case belongs to; runs replaced by a restart or a new level are ignored.
+            case: The index of the test case that was played.
+        """
+
+        if run_number != self.run_number:
+            return
+
+        # show exactly the farm that was checked, even if the code changed it
+        # in ways the recorded actions do not capture
+        _, _, recording, passed = self.test_cases[case]
+        self.embed_pygame_o.farm = recording
+
+        if passed and case + 1 < len(self.test_cases):
+            if self.embed_pygame_o.slow_mode:
+                # Give the player time to see the result before the next farm
+                self.after(1000, self.play_test_case, run_number, case + 1)
+            else:
+                self.play_test_case(run_number, case + 1)
+        elif passed:
+            self.level_completed()
+            self.controller.frames[LevelsPage].update_level_buttons()
+        else:
+            self.level_failed()
+
+    def handle_skip(self):
+        """
+        Skips the playback of the user's code to the end.
+        """
+
+        log.debug("button", name="skip")
+        self.embed_pygame_o.stepper.skip()
+
+    def handle_pause(self):
+        """
+        Pauses or resumes the playback of the user's code in slow mode.
+        """
+
+        log.debug("button", name="pause")
+        stepper = self.embed_pygame_o.stepper
+        if stepper.paused:
+            stepper.resume()
+            self.btn_pause.config(text="Pause")
+        else:
+            stepper.pause()
+            self.btn_pause.config(text="Resume")
+
+    def handle_speed(self, value):
+        """
+        Changes how fast the user's code is played back in slow mode, including a run that is already playing.
+
+        Args:
+            value: The new number of farmer actions per second, as set on the slider.
+        """
+
+        self.embed_pygame_o.stepper.set_speed(float(value))
 
     def level_completed(self):
         """
@@ -529,7 +764,9 @@ class GamePage(tk.Frame):
         """
 
         self.controller.music_player.play_level_completion_sound()
-        print("LEVEL COMPLETED!")
+        log.info(
+            "level_completed", level=self.controller.levels.current_level
+        )
         response = messagebox.askyesno(
             "Level Complete", "Woohoo! Great job. Proceed to the next level?"
         )
@@ -557,7 +794,9 @@ class GamePage(tk.Frame):
         Handles the actions to be taken when a level fails in the game.
         This function plays a failure sound, prompts the user to retry the level or return to the levels page, and manages the transition based on the user's response.
         """
-        print("LEVEL FAILED!")
+        log.info(
+            "level_failed", level=self.controller.levels.current_level
+        )
         self.controller.music_player.play_level_fail_sound()
         response = messagebox.askretrycancel(
             "Level Failed", "Oops! You didn't quite complete the task. Retry?"
@@ -575,16 +814,19 @@ class GamePage(tk.Frame):
         This function removes all text from the code input area, allowing the user to start fresh without any previous code.
         """
 
-        print("clear")
+        log.debug("button", name="clear")
         self.txt_code.delete("1.0", "end-1c")  # clear user code input text box
 
     def handle_restart(self):
         """
         Handles the restart of the game by resetting the farm and updating the game state.
-        This function checks if the farm exists, restarts it if so, starts the current level, and refreshes the game display.
+        This function stops any run still playing, checks if the farm exists, restarts it if so, starts the current level, and refreshes the game display.
         """
 
-        print("restart (farmgamegui)")
+        log.debug("button", name="restart")
+        # the replay must stop before the farm it plays on is regenerated
+        self.embed_pygame_o.stepper.cancel()
+        self.run_number += 1
         # self.embed_pygame_o.farm = FarmGrid(self.embed_pygame_o.FARM_WIDTH, self.embed_pygame_o.FARM_HEIGHT, config=self.controller.levels.get_current_config())
         if self.embed_pygame_o.farm:
             self.embed_pygame_o.farm.restart()  # restart farm
@@ -601,7 +843,7 @@ class GamePage(tk.Frame):
             IOError: If the tutorial file cannot be opened or read.
         """
 
-        print("help")
+        log.debug("button", name="help")
         try:
             file = open("tutorial.txt", "r")
             win_tut = tk.Tk()
@@ -621,11 +863,13 @@ class GamePage(tk.Frame):
         This function triggers the method responsible for showing the task associated with the active level, providing guidance on the objectives to be completed.
         """
 
-        print("task")
+        log.debug("button", name="task")
         self.display_level_task()
 
     def handle_home(self):
-        print("home")
+        log.debug("button", name="home")
+        self.embed_pygame_o.stepper.cancel()  # stop any run still playing
+        self.run_number += 1
         self.controller.show_frame(HomePage)  # switch to home page
 
 
@@ -671,7 +915,7 @@ class LevelsPage(tk.Frame):
         This function updates the displayed frame to show the HomePage, allowing users to return to the main menu and access other game features.
         """
 
-        print("home")
+        log.debug("button", name="home")
         self.controller.show_frame(HomePage)
 
     def update_level_buttons(self):
@@ -696,7 +940,7 @@ class LevelsPage(tk.Frame):
             level_number: The number of the level to start.
         """
 
-        print("start level:", level_number)
+        log.debug("button", name="start level", level=level_number)
         self.controller.frames[GamePage].start_level(level_number)
         self.controller.show_frame(GamePage)
 
@@ -1028,13 +1272,27 @@ class StatisticsPage(tk.Frame):
             row=3, column=4, padx=PADX, pady=PADY
         )
 
+        """Label: Pacing"""
+        self.pacing_value = self.controller.frames[
+            GamePage
+        ].embed_pygame_o.timeseries.summary()
+        self.lbl_pacing_value = tk.Label(
+            self.frm_stats,
+            text=self.pacing_value,
+            borderwidth=BORDERWIDTH,
+            relief=RELIEF,
+        )
+        self.lbl_pacing_value.grid(
+            row=5, column=0, columnspan=5, padx=PADX, pady=PADY, sticky="ew"
+        )
+
         """Pack Statistics Frame"""
         self.frm_stats.pack(anchor="center", padx=20, pady=20)
 
     def refresh(self):
         """
         Refreshes the displayed statistics for player movements and crops in the game.
-        This function updates the labels for left, right, up, and down moves, as well as the number of potatoes, carrots, and pumpkins planted and harvested, ensuring that the user sees the most current data.
+        This function updates the labels for left, right, up, and down moves, the number of potatoes, carrots, and pumpkins planted and harvested, and the pacing of the player's code, ensuring that the user sees the most current data.
         """
 
         """Refresh Left Moves"""
@@ -1123,8 +1381,14 @@ class StatisticsPage(tk.Frame):
             text=self.pumpkins_harvested_value
         )
 
+        """Refresh Pacing"""
+        self.pacing_value = self.controller.frames[
+            GamePage
+        ].embed_pygame_o.timeseries.summary()
+        self.lbl_pacing_value.config(text=self.pacing_value)
+
     def handle_home(self):
-        print("home")
+        log.debug("button", name="home")
         self.controller.show_frame(HomePage)
 
 
@@ -1199,31 +1463,31 @@ class SettingsPage(tk.Frame):
         This function updates the displayed frame to show the HomePage, allowing users to return to the main menu and access other game features.
         """
 
-        print("home")
+        log.debug("button", name="home")
         self.controller.show_frame(HomePage)
 
     def handle_mute(self):
         """
         Toggles the background music on or off based on the user's preference.
-        This function checks the mute status and either stops or plays the background music accordingly, providing feedback to the user through printed messages.
+        This function checks the mute status and either stops or plays the background music accordingly, recording the change in the event log.
         """
 
         if self.mute.get() == 1:
             self.controller.music_player.stop_background_music()
-            print("MUTED")
+            log.info("music", enabled=False)
         else:
             self.controller.music_player.play_background_music()
-            print("MUSIC ON")
+            log.info("music", enabled=True)
 
     def handle_slow_mode(self):
         """
         Toggles the slow mode feature in the game based on the user's selection.
-        This function updates the game state to enable or disable slow mode, providing feedback to the user through printed messages.
+        This function updates the game state to enable or disable slow mode, recording the change in the event log.
         """
 
         if self.slow_mode.get() == 1:
             self.controller.frames[GamePage].embed_pygame_o.slow_mode = True
-            print("SLOWMODE ON")
+            log.info("slow_mode", enabled=True)
         else:
             self.controller.frames[GamePage].embed_pygame_o.slow_mode = False
-            print("SLOWMODE OFF")
+            log.info("slow_mode", enabled=False)
@@ -1,17 +1,49 @@
+import copy
 import itertools
+import mmap
+import os
 import random
+from array import array
+from eventlog import log
+from farmcodec import FarmCodec
 from farmer import Farmer
-from farmtile import FarmTile, CropTile
+from gridview import GridView
+from pathfinder import PathFinder
+from scheduler import Scheduler
 from stats import FarmStats
+from tileindex import CHUNK_SIZE, TileIndex
+
+# crop_types value stored for tiles that do not hold a crop
+NO_CROP = -1
 
 
 class FarmGrid:
     """
     The FarmGrid class represents the grid layout of the farm, managing the placement of tiles, crops, and the farmer.
     This class provides methods for generating various farm configurations, handling the farmer's position, and checking the walkability of tiles, allowing for dynamic interactions within the farm environment.
+
+    Tiles are stored compactly in two signed byte arrays, tile_types and crop_types, indexed column by column (x * height + y).
+    The grid attribute is a GridView over those arrays, so farm.grid[x][y] still returns a tile object without the farm having to keep one alive per cell.
+    Farms created with fork() or snapshot() share those arrays copy-on-write, so the arrays may be replaced by private copies on the first write after a fork.
+
+    Every change to a tile or to the farmer's position bumps the version counter and records the affected cells, which consumers such as the renderer collect with drain_dirty().
+
+    Layouts are generated from a per-farm random number generator seeded with the farm's seed, so the same (config, width, height, seed) always produces the same farm.
+    Every configuration has a tile-by-tile generator and a vectorized one that writes whole columns at once; both produce identical layouts for the same seed.
     """
 
-    def __init__(self, width=10, height=10, config="plain"):
+    def __init__(
+        self,
+        width=10,
+        height=10,
+        config="plain",
+        seed=None,
+        layout_cache=None,
+        vectorized=False,
+        tree_count=None,
+        tree_density=None,
+        generate=True,
+    ):
         """
         Initializes a FarmGrid object with specified dimensions and configuration.
         This constructor sets up the farm grid, initializes the farmer, and generates the farm layout based on the provided configuration, allowing for a structured environment for gameplay.
@@ -20,21 +52,178 @@ class FarmGrid:
             width: The width of the farm grid (default is 10).
             height: The height of the farm grid (default is 10).
             config: A string that specifies the configuration of the farm (default is "plain").
+            seed: A non-negative integer seeding the layout generator; a random seed is picked if None (default is None).
+            layout_cache: A LayoutCache to reuse previously generated layouts from, and to store new ones in (default is None).
+            vectorized: True to use the vectorized generators, which are much faster on large farms (default is False).
+            tree_count: The number of trees to place in configurations with trees, instead of the configuration's usual number (default is None).
+            tree_density: The fraction of eligible tiles to turn into trees, used if tree_count is not given (default is None).
+            generate: False to create the farm without any tiles or a farmer, for farms whose tiles are about to be attached with use_storage() (default is True).
         """
 
         self.width = width
         self.height = height
-        self.farmer = None
-        self.grid = []
-        self.stats = FarmStats(self)
+        self.farmer = None  # the first farmer, which user code controls
+        self.farmers = []  # every farmer on the farm, in the order added
+        self.scheduler = Scheduler(self)
+        self.tile_types = None
+        self.crop_types = None
+        self.mapped = None  # the mmap holding the tiles of a mapped farm
+        self.grid = GridView(self)
+        self.shared = False  # True while tile arrays may be used by a fork
+        self.read_only = False
+        self.version = 0  # increases with every change to the farm
+        self.dirty = set()  # cells changed since the last drain_dirty()
+        self.dirty_all = True  # whole farm changed since the last drain
+        self.listeners = []  # notified of tile changes, see subscribe()
+        self.index = TileIndex(self)
+        self.subscribe(self.index)
+        self.paths = PathFinder(self)
+        self.subscribe(self.paths)
+        self.stats = FarmStats(self)  # subscribes its own aggregates
         self.config = config
-        self.generate_farm()
-        self.add_farmer(0, 0)
+        self.layout_cache = layout_cache
+        self.vectorized = vectorized
+        self.tree_count = tree_count
+        self.tree_density = tree_density
+        self.seed = None
+        self.rng = None
+        if generate:
+            self.use_storage(
+                array("b", bytes(width * height)),  # all dirt
+                array("b", [NO_CROP]) * (width * height),
+            )
+            self.generate_farm(seed)
+            self.add_farmer(0, 0)
+        else:
+            self.seed = seed
+            self.rng = random.Random(seed)
+
+    def to_bytes(self):
+        """
+        Encodes the whole farm, including the farmer's position and inventory and the farm's statistics, as compact bytes.
+
+        Returns:
+            bytes: The encoded farm, which from_bytes() turns back into an identical farm.
+        """
+        return FarmCodec.encode(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Restores a farm encoded with to_bytes() without generating its layout again.
+
+        Args:
+            data: The encoded farm, as bytes or any other buffer.
+
+        Returns:
+            FarmGrid: The restored farm.
+
+        Raises:
+            ValueError: If the data is not an encoded farm, was written by an unsupported version or has the wrong size.
+        """
+        return FarmCodec.decode(data, cls)
+
+    @classmethod
+    def open_mapped(
+        cls, path, width=10, height=10, config="plain", seed=None, **options
+    ):
+        """
+        Opens a farm whose tiles live in a memory-mapped file instead of in memory.
+        The file holds the farm in the same encoding as to_bytes(), and the farm reads and writes its tile and crop bytes directly in the mapping, so only the parts of the farm that are actually touched are ever loaded and a farm can be far larger than would fit comfortably in memory.
+        If the file does not exist yet, a new farm is generated straight into it; otherwise the farm stored in the file is reopened as-is, without loading or generating anything, and the remaining arguments are ignored.
+        Call flush() to save the farmer and statistics to the file, and close() when done with the farm.
+
+        Args:
+            path: The path of the file holding the farm.
+            width: The width of a new farm (default is 10).
+            height: The height of a new farm (default is 10).
+            config: The configuration of a new farm (default is "plain").
+            seed: The seed of a new farm; a random seed is picked if None (default is None).
+            **options: Any further keyword arguments for a new farm, such as vectorized or tree_count.
+
+        Returns:
+            FarmGrid: The farm stored in the file.
+
+        Raises:
+            ValueError: If the file exists but does not hold an encoded farm.
+        """
+        created = not os.path.exists(path)
+        if created:
+            if seed is None:
+                seed = random.randrange(2**32)
+            farm = cls(width, height, config, seed, generate=False, **options)
+            header = FarmCodec.encode_header(farm)
+            with open(path, "wb") as file:
+                file.write(header)
+                # extending the file leaves the tile bytes as a sparse hole
+                # that generation then fills in
+                file.truncate(len(header) + 2 * width * height)
+
+        with open(path, "r+b") as file:
+            mapping = mmap.mmap(file.fileno(), 0)
+        try:
+            farm = FarmCodec.decode(mapping, cls, copy=False)
+        except ValueError:
+            mapping.close()
+            raise
+        farm.mapped = mapping
+
+        if created:
+            for name, value in options.items():
+                setattr(farm, name, value)
+            farm.generate_farm(farm.seed)
+            farm.add_farmer(0, 0)
+            farm.flush()
+        return farm
+
+    def flush(self):
+        """
+        Writes the farmer and statistics of a memory-mapped farm back to its file and flushes the file.
+        Tile changes are written to the mapping as they happen, so they only need flushing to guarantee they have reached the disk.
+        This function does nothing for farms that are not memory-mapped.
+        """
+        if self.mapped is None:
+            return
+        header = FarmCodec.encode_header(self)
+        self.mapped[: len(header)] = header
+        self.mapped.flush()
+
+    def close(self):
+        """
+        Flushes a memory-mapped farm and closes its file.
+        The farm cannot be used after it has been closed. This function does nothing for farms that are not memory-mapped.
+        """
+        if self.mapped is None:
+            return
+        self.flush()
+        self.tile_types.release()
+        self.crop_types.release()
+        self.tile_types = self.crop_types = None
+        self.mapped.close()
+        self.mapped = None
+
+    def use_storage(self, tile_types, crop_types):
+        """
+        Makes the farm keep its tiles in the given packed arrays, replacing whatever it held before.
+        The arrays are used as they are, not copied; anything that supports indexing, slicing and tobytes() with signed byte items works, such as an array("b") or a memoryview cast to "b".
+
+        Args:
+            tile_types: The packed tile types, one item per tile in column-major order.
+            crop_types: The packed crop types, one item per tile in column-major order.
+        """
+        self.tile_types = tile_types
+        self.crop_types = crop_types
+        self.shared = False
+        self.layout_replaced()
 
-    def generate_farm(self):
+    def generate_farm(self, seed=None):
         """
         Generates the farm layout based on the specified configuration type.
         This function checks the configuration and calls the appropriate method to create the farm grid, ensuring that the farm is set up according to the desired design.
+        If the farm has a layout cache that already holds this layout, the cached tiles are copied in instead of generating them again.
+
+        Args:
+            seed: A non-negative integer seeding the layout generator; a random seed is picked if None (default is None).
 
         Raises:
             ValueError: If the specified configuration type is unknown.
@@ -51,35 +240,299 @@ class FarmGrid:
             # "tree_grass": self.generate_tree_grass,
             "crop_row": self.generate_crop_row,
         }
+        vectorized_methods = {
+            "plain": self.generate_plain,
+            "river": self.generate_river_vectorized,
+            "river_horizontal": self.generate_river_horizontal_vectorized,
+            "tree_river": self.generate_tree_river_vectorized,
+            "grass": self.generate_grass_vectorized,
+            "crops": self.generate_crops_vectorized,
+            "tree_dirt": self.generate_tree_dirt,
+            "crop_row": self.generate_crop_row_vectorized,
+        }
+        if self.vectorized:
+            config_methods = vectorized_methods
 
         try:
-            config_methods[self.config]()
+            generate = config_methods[self.config]
         except KeyError as e:
             raise ValueError("Unknown farm configuration") from e
 
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        key = self.layout_key()
+        cached = None
+        if self.layout_cache is not None:
+            cached = self.layout_cache.get(key)
+
+        if cached is not None:
+            self.load_layout(*cached)
+        else:
+            self.fill(0)  # start every layout from plain dirt
+            generate()
+            if self.layout_cache is not None:
+                self.layout_cache.put(
+                    key, self.tile_types.tobytes(), self.crop_types.tobytes()
+                )
+
+    def layout_key(self):
+        """
+        The config part of the key also records any tree_count or tree_density override, since those change the layout a seed produces.
+
+        Returns:
+            tuple: The (config, width, height, seed) key identifying this farm's layout.
+        """
+        config = self.config
+        if self.tree_count is not None:
+            config += f"?tree_count={self.tree_count}"
+        elif self.tree_density is not None:
+            config += f"?tree_density={self.tree_density}"
+        return (config, self.width, self.height, self.seed)
+
+    def load_layout(self, tile_bytes, crop_bytes):
+        """
+        Replaces the whole farm with previously packed tile and crop bytes, such as a layout taken from a LayoutCache.
+
+        Args:
+            tile_bytes: The packed tile types, one byte per tile.
+            crop_bytes: The packed crop types, one byte per tile.
+        """
+        if self.shared:
+            self.unshare()
+        # copied through byte views, so neither side is copied first
+        for storage, data in (
+            (self.tile_types, tile_bytes),
+            (self.crop_types, crop_bytes),
+        ):
+            with memoryview(storage).cast("B") as target:
+                with memoryview(data).cast("B") as source:
+                    target[:] = source
+        self.layout_replaced()
+
+    def fill(self, tile_type):
+        """
+        Sets every tile of the farm to the given tile type and clears all crops.
+        This function overwrites the packed arrays in place, a chunk at a time, so it is the cheapest way to reset the farm before generating a new layout and never needs a copy of the whole farm, even for a memory-mapped one.
+
+        Args:
+            tile_type: An integer representing the tile type to fill the farm with.
+        """
+        if self.shared:
+            self.unshare()
+        size = self.width * self.height
+        tile_chunk = bytes([tile_type]) * min(size, CHUNK_SIZE)
+        crop_chunk = bytes([NO_CROP & 0xFF]) * len(tile_chunk)
+        with memoryview(self.tile_types).cast("B") as tiles:
+            with memoryview(self.crop_types).cast("B") as crops:
+                for start in range(0, size, CHUNK_SIZE):
+                    length = min(CHUNK_SIZE, size - start)
+                    tiles[start : start + length] = tile_chunk[:length]
+                    crops[start : start + length] = crop_chunk[:length]
+        self.layout_replaced()
+
+    def get_tile_type(self, x, y):
+        """
+        Args:
+            x: The x-coordinate of the tile.
+            y: The y-coordinate of the tile.
+
+        Returns:
+            int: The tile type stored at the given position.
+        """
+        return self.tile_types[x * self.height + y]
+
+    def get_crop_type(self, x, y):
+        """
+        Args:
+            x: The x-coordinate of the tile.
+            y: The y-coordinate of the tile.
+
+        Returns:
+            int: The crop type stored at the given position, or None if the tile holds no crop.
+        """
+        crop_type = self.crop_types[x * self.height + y]
+        return None if crop_type == NO_CROP else crop_type
+
+    def set_tile(self, x, y, tile_type, crop_type=None):
+        """
+        Stores a tile type, and optionally a crop type, at the given position.
+        The crop type is only kept for crop tiles; any other tile type clears the crop stored at that position.
+
+        Args:
+            x: The x-coordinate of the tile.
+            y: The y-coordinate of the tile.
+            tile_type: An integer representing the new tile type.
+            crop_type: An integer representing the crop type for crop tiles (default is None).
+
+        Raises:
+            ValueError: If a crop tile is stored without a crop type.
+        """
+        if tile_type != 3:
+            crop_type = NO_CROP
+        elif crop_type is None:
+            raise ValueError("a crop tile needs a crop type")
+        if self.shared:
+            self.unshare()
+        index = x * self.height + y
+        old_tile = self.tile_types[index]
+        old_crop = self.crop_types[index]
+        self.tile_types[index] = tile_type
+        self.crop_types[index] = crop_type
+        for listener in self.listeners:
+            listener.on_tile_changed(
+                x, y, old_tile, old_crop, tile_type, crop_type
+            )
+        self.mark_dirty(x, y)
+
+    def mark_dirty(self, x, y):
+        """
+        Records that the cell at the given position has changed and bumps the farm's version.
+        Tile writes call this automatically; the farmer calls it for the cells it leaves and enters.
+
+        Args:
+            x: The x-coordinate of the changed cell.
+            y: The y-coordinate of the changed cell.
+        """
+        if not self.dirty_all:
+            self.dirty.add((x, y))
+        self.version += 1
+
+    def subscribe(self, listener):
+        """
+        Registers an object to be told about every change to the farm's tiles, so it can keep information derived from the tiles up to date without scanning the farm.
+        The listener's on_tile_changed(x, y, old_tile, old_crop, new_tile, new_crop) method is called after each tile write, with negative crop types for tiles without a crop, and its on_grid_reset() method is called whenever the whole layout is replaced.
+
+        Args:
+            listener: The object to notify.
+        """
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """
+        Stops notifying an object registered with subscribe().
+
+        Args:
+            listener: The object to stop notifying.
+
+        Raises:
+            ValueError: If the object is not registered.
+        """
+        self.listeners.remove(listener)
+
+    def layout_replaced(self):
+        """
+        Records that the whole layout has been replaced, for example by a generator writing the packed arrays directly.
+        Every listener is told to reset whatever it derived from the tiles, and the whole farm is marked dirty.
+        """
+        for listener in self.listeners:
+            listener.on_grid_reset()
+        self.mark_all_dirty()
+
+    def mark_all_dirty(self):
+        """
+        Records that the whole farm has changed, for example after a new layout has been generated, and bumps the farm's version.
+        """
+        self.dirty.clear()
+        self.dirty_all = True
+        self.version += 1
+
+    def drain_dirty(self):
+        """
+        Collects the cells that have changed since the previous call and resets the dirty set.
+        Consumers can compare the farm's version with the one they last saw to skip the call entirely when nothing has changed.
+
+        Returns:
+            set: The (x, y) positions of the changed cells, or every position on the farm if the whole farm changed.
+        """
+        if self.dirty_all:
+            self.dirty_all = False
+            self.dirty.clear()
+            return set(itertools.product(range(self.width), range(self.height)))
+        dirty = self.dirty
+        self.dirty = set()
+        return dirty
+
+    def unshare(self):
+        """
+        Gives this farm private copies of the tile arrays it shares with its forks.
+        This function is called automatically before the first write after fork() or snapshot(), so the other farms keep seeing the layout as it was.
+
+        Raises:
+            ValueError: If the farm is a read-only snapshot.
+        """
+        if self.read_only:
+            raise ValueError("Cannot modify a farm snapshot; fork() it first")
+        self.tile_types = array("b", self.tile_types)
+        self.crop_types = array("b", self.crop_types)
+        self.shared = False
+
+    def fork(self):
+        """
+        Creates an independent copy of the farm that shares its tile arrays copy-on-write.
+        The copy keeps the current layout, farmer position, inventory and statistics, but none of its later changes affect this farm (or the other way around), so one generated layout can be branched into many runs without regenerating it.
+
+        Returns:
+            FarmGrid: The forked farm.
+        """
+        fork = copy.copy(self)
+        fork.grid = GridView(fork)
+        if self.mapped is not None:
+            # a mapped farm keeps writing to its file, so the fork gets its
+            # own copies of the tiles straight away
+            fork.mapped = None
+            fork.tile_types = array("b", self.tile_types.tobytes())
+            fork.crop_types = array("b", self.crop_types.tobytes())
+        fork.read_only = False
+        fork.dirty = set()
+        fork.dirty_all = True
+        fork.listeners = []
+        fork.index = TileIndex(fork)
+        fork.subscribe(fork.index)
+        fork.paths = self.paths.copy(fork)
+        fork.subscribe(fork.paths)
+        fork.rng = random.Random()
+        fork.rng.setstate(self.rng.getstate())
+        fork.stats = self.stats.copy(fork)
+        fork.farmers = [farmer.copy(fork) for farmer in self.farmers]
+        if self.farmer is not None:
+            fork.farmer = fork.farmers[self.farmers.index(self.farmer)]
+        fork.scheduler = Scheduler(fork)
+        if self.mapped is None:
+            self.shared = fork.shared = True
+        return fork
+
+    def snapshot(self):
+        """
+        Creates a read-only copy of the farm's current state that shares its tile arrays copy-on-write.
+        Snapshots are cheap to keep around as a starting point; call fork() on a snapshot to get a farm that can be played on.
+
+        Returns:
+            FarmGrid: The read-only snapshot.
+        """
+        snapshot = self.fork()
+        snapshot.read_only = True
+        return snapshot
+
     def generate_plain(self):
         """
         Generates a uniform farm grid consisting entirely of dirt tiles.
-        This function initializes the grid by creating a specified number of FarmTile objects, each representing a dirt tile, based on the defined width and height of the farm.
+        This function resets every tile in the packed grid to dirt, based on the defined width and height of the farm.
         """
-        self.grid = [
-            [FarmTile(x, y, 0) for y in range(self.height)]
-            for x in range(self.width)
-        ]
+        self.fill(0)
 
     def generate_river(self):
         """
         Generates a farm layout that includes a river and adjacent dirt tiles, with the remainder of the farm being grass.
         This function randomly determines the orientation of the river and populates the farm grid accordingly, ensuring that the river is represented by water tiles and the area next to it is dirt, while the rest of the farm consists of grass tiles.
         """
-        self.grid = [
-            [None for _ in range(self.height)] for _ in range(self.width)
-        ]
-        river_orientation = random.randrange(2)
+        river_orientation = self.rng.randrange(2)
         river_range = self.height if river_orientation == 0 else self.width
 
-        river_start = random.randrange(3, river_range - 3)
-        river_end = random.randrange(3, river_range - 3)
+        river_start = self.rng.randrange(3, river_range - 3)
+        river_end = self.rng.randrange(3, river_range - 3)
 
         def is_river_tile(x, y):
             if river_orientation == 0:
@@ -94,89 +547,125 @@ class FarmGrid:
         for y in range(self.height):
             for x in range(self.width):
                 if is_river_tile(x, y):
-                    self.grid[x][y] = FarmTile(x, y, 2)  # water
+                    self.set_tile(x, y, 2)  # water
                     if river_orientation == 0:
-                        self.grid[x][y - 1] = FarmTile(x, y, 0)  # dirt
+                        self.set_tile(x, y - 1, 0)  # dirt
                     else:
-                        self.grid[x][y] = FarmTile(x, y, 1)  # grass
+                        self.set_tile(x, y, 1)  # grass
                 else:
-                    self.grid[x][y] = FarmTile(x, y, 1)  # grass
+                    self.set_tile(x, y, 1)  # grass
 
     def generate_river_horizontal(self):
         """
         Generates a farm layout featuring a horizontal river, with dirt tiles above the river and grass tiles below.
         This function initializes the farm grid, randomly selects a row for the river, and populates the grid with water, dirt, and grass tiles based on their respective positions relative to the river.
         """
-        self.grid = [
-            [None for _ in range(self.height)] for _ in range(self.width)
-        ]
-
-        river_y = random.randrange(
+        river_y = self.rng.randrange(
             2, self.height - 1
         )  # Pick a single row for the river
 
         for x in range(self.width):
             for y in range(self.height):
                 if y == river_y:
-                    self.grid[x][y] = FarmTile(
-                        x, y, 2
-                    )  # water (single row for the river)
+                    self.set_tile(x, y, 2)  # water (single row for the river)
                 elif y < river_y:
-                    self.grid[x][y] = FarmTile(
-                        x, y, 0
-                    )  # dirt (entire side above the river)
+                    self.set_tile(x, y, 0)  # dirt (entire side above the river)
                 else:
-                    self.grid[x][y] = FarmTile(
-                        x, y, 1
-                    )  # grass (below the river)
-
-        num_trees = random.randint(4, 10)  # random number of trees
-        for _ in range(num_trees):
-            tree_x = random.randint(0, self.width - 1)
-            tree_y = random.randint(
-                river_y + 1, self.height - 1
-            )  # place trees below the river
-            self.grid[tree_x][tree_y] = FarmTile(tree_x, tree_y, 4)
+                    self.set_tile(x, y, 1)  # grass (below the river)
+
+        # between 4 and 10 trees on the grass below the river
+        self.place_trees(
+            1, self.rng.randint(4, 10), rows=range(river_y + 1, self.height)
+        )
 
     def generate_tree_river(self):
         """
         Generates a farm layout that includes a river, dirt tiles along one side, and a randomly placed tree, with the remainder of the farm being grass.
         This function initializes the farm grid, creates a river, and places a tree on a grass tile, ensuring that the tree is not placed on an existing tile.
         """
-        self.grid = [
-            [None for _ in range(self.height)] for _ in range(self.width)
-        ]
         self.generate_river()
-        while True:
-            tree_x = random.randrange(1, self.width - 1)
-            tree_y = random.randrange(1, self.height - 1)
-            if self.grid[tree_x][tree_y].tile_type == 1:
-                break
-        self.grid[tree_x][tree_y] = FarmTile(tree_x, tree_y, 4)  # tree
+        self.place_trees(1, 1, *self.interior())  # one tree on grass
 
     def generate_tree_dirt(self):
         """
         Generates a farm layout consisting entirely of dirt tiles with three randomly placed trees.
         This function initializes the farm grid with dirt tiles and places three trees at random positions within the grid, ensuring a varied layout.
         """
-        self.grid = [
-            [None for _ in range(self.height)] for _ in range(self.width)
-        ]
         # Initialize the grid with plain dirt
-        self.grid = [
-            [FarmTile(x, y, 0) for y in range(self.height)]
-            for x in range(self.width)
-        ]
+        self.generate_plain()
+        self.place_trees(0, 3, *self.interior())  # three trees on dirt
+
+    def interior(self):
+        """
+        Returns:
+            tuple: The ranges of x- and y-coordinates of the tiles that are not on the edge of the farm.
+        """
+        return range(1, self.width - 1), range(1, self.height - 1)
+
+    def place_trees(self, tile_type, count, columns=None, rows=None):
+        """
+        Places trees on randomly chosen tiles of the given type inside a rectangular area of the farm.
+        This function first indexes every eligible tile in the area and then draws the tree positions from that index without replacement, so its cost depends only on the size of the area and never on how many of its tiles happen to be eligible.
+        The farm's tree_count or tree_density, when set, takes the place of the given count.
+
+        Args:
+            tile_type: An integer representing the type of tile the trees may replace.
+            count: The number of trees to place; fewer are placed if the area does not have enough eligible tiles.
+            columns: A range of x-coordinates the trees may be placed in (default is every column).
+            rows: A range of y-coordinates the trees may be placed in (default is every row).
+
+        Returns:
+            int: The number of trees placed.
+        """
+        eligible = self.eligible_positions(tile_type, columns, rows)
+        if self.tree_count is not None:
+            count = self.tree_count
+        elif self.tree_density is not None:
+            count = round(self.tree_density * len(eligible))
+        count = min(count, len(eligible))
+
+        if self.shared:
+            self.unshare()
+        # trees only replace tiles without crops, so the tile types can be
+        # written straight into the packed array
+        tile_types = self.tile_types
+        for index in self.rng.sample(eligible, count):
+            tile_types[index] = 4
+        self.layout_replaced()
+        return count
 
-        tree_count = 0
-        while tree_count < 3:
-            tree_x = random.randrange(1, self.width - 1)
-            tree_y = random.randrange(1, self.height - 1)
+    def eligible_positions(self, tile_type, columns=None, rows=None):
+        """
+        Indexes the tiles of the given type inside a rectangular area of the farm.
+        Each column of the area is matched against the tile type as a single slice of the packed tile bytes.
+
+        Args:
+            tile_type: An integer representing the type of tile to look for.
+            columns: A range of x-coordinates to search (default is every column).
+            rows: A range of y-coordinates to search (default is every row).
 
-            # CHECK IF tile is not already a tree
-            if self.grid[tree_x][tree_y].tile_type == 0:
-                self.grid[tree_x][tree_y] = FarmTile(tree_x, tree_y, 4)
-                tree_count += 1
+        Returns:
+            list: The flat indices (x * height + y) of the matching tiles, column by column.
+        """
+        if columns is None:
+            columns = range(self.width)
+        if rows is None:
+            rows = range(self.height)
+        if not rows:
+            return []
+
+        tiles = self.tile_types  # sliced per column, never copied whole
+        is_match = tile_type.__eq__
+        eligible = []
+        for x in columns:
+            start = x * self.height + rows.start
+            stop = x * self.height + rows.stop
+            eligible.extend(
+                itertools.compress(
+                    range(start, stop), map(is_match, tiles[start:stop])
+                )
+            )
+        return eligible
 
     def generate_grass(self, grass_percentage=0.4):
         """
@@ -186,20 +675,14 @@ class FarmGrid:
         Args:
             grass_percentage: A float value between 0 and 1 representing the probability that a tile will be grass (default is 0.4).
         """
-        self.grid = [
-            [None for _ in range(self.height)] for _ in range(self.width)
-        ]
-        self.grid = [
-            [FarmTile(x, y, 0) for y in range(self.height)]
-            for x in range(self.width)
-        ]  # Initialize grid with dirt
+        self.generate_plain()  # Initialize grid with dirt
         for x in range(self.width):
             for y in range(1):
-                self.grid[x][y] = FarmTile(x, y, 1)  # Grass tile
+                self.set_tile(x, y, 1)  # Grass tile
         for x in range(self.width):
             for y in range(self.height):
-                if random.random() < grass_percentage:  # Randomly assign grass
-                    self.grid[x][y] = FarmTile(x, y, 1)  # Grass tile
+                if self.rng.random() < grass_percentage:  # Randomly assign grass
+                    self.set_tile(x, y, 1)  # Grass tile
 
     def generate_crops(self):
         """
@@ -210,14 +693,12 @@ class FarmGrid:
 
         # Reset any existing crops to dirt
         for x, y in itertools.product(range(self.width), range(self.height)):
-            if self.grid[x][y].tile_type == 3:  # If the tile is a crop
-                self.grid[x][y].tile_type = 0  # Reset it to dirt
+            if self.get_tile_type(x, y) == 3:  # If the tile is a crop
+                self.set_tile(x, y, 0)  # Reset it to dirt
 
         # Make the first row grass (assuming tile_type 1 represents grass)
         for x in range(self.width):
-            self.grid[x][
-                0
-            ].tile_type = 1  # Set tile_type to grass for the first row
+            self.set_tile(x, 0, 1)  # Set tile_type to grass for the first row
 
         # Generate a list of available positions excluding the first row and farmer's initial position
         avail_positions = [
@@ -230,46 +711,179 @@ class FarmGrid:
         crop_count = int(
             self.width * self.height * 0.2
         )  # 20% of the grid will have crops
-        random.shuffle(
+        self.rng.shuffle(
             avail_positions
         )  # Shuffle the available positions to randomize crop placement
 
         for _ in range(crop_count):
             if avail_positions:
                 x, y = avail_positions.pop()  # Get a random available position
-                if self.grid[x][y].tile_type == 0:  # Ensure the tile is dirt
-                    self.grid[x][y] = CropTile(
-                        x, y, random.randrange(100) % 3
-                    )  # Randomly select a crop (0-2)
+                if self.get_tile_type(x, y) == 0:  # Ensure the tile is dirt
+                    # Randomly select a crop (0-2)
+                    self.set_tile(x, y, 3, self.rng.randrange(100) % 3)
 
     def generate_crop_row(self):
         """
         Generates a farm layout with a single row of randomly placed crops.
         This function initializes the farm grid with dirt tiles, randomly selects a row for the crops, and assigns random crop types to the tiles in that row, creating a varied crop layout.
         """
-        self.grid = [
-            [FarmTile(x, y, 0) for y in range(self.height)]
-            for x in range(self.width)
-        ]  # Initialize grid with dirt
+        self.generate_plain()  # Initialize grid with dirt
 
         # Randomly select a row position for the crops
-        crop_row = random.randrange(1, self.height - 1)
+        crop_row = self.rng.randrange(1, self.height - 1)
 
         # Randomly assign crop types to tiles in the selected row
         for x in range(self.width):
-            crop_type = random.randrange(
+            crop_type = self.rng.randrange(
                 3
             )  # Randomly choose a crop type (0 = potato, 1 = carrot, 2 = pumpkin)
-            self.grid[x][crop_row] = CropTile(x, crop_row, crop_type)
+            self.set_tile(x, crop_row, 3, crop_type)
+
+    # Vectorized generators.
+    # These write the packed arrays directly, a whole column at a time where
+    # they can, instead of tile by tile through set_tile(), and never build a
+    # copy of the whole farm. They draw random numbers in exactly the
+    # same order as the generators above so that a seed produces the same
+    # layout with either set.
+
+    def generate_river_vectorized(self):
+        """
+        Vectorized version of generate_river.
+        The river position is computed once per column, and only the two tiles of each column that are not grass are written after the farm is filled with grass.
+        """
+        river_orientation = self.rng.randrange(2)
+        river_range = self.height if river_orientation == 0 else self.width
+
+        river_start = self.rng.randrange(3, river_range - 3)
+        river_end = self.rng.randrange(3, river_range - 3)
+
+        # the river tiles of a vertical river are overwritten with grass by
+        # generate_river, so then the whole farm ends up as grass
+        self.fill(1)
+        if river_orientation == 1:
+            return
+
+        height = self.height
+        tile_types = self.tile_types
+        for x in range(self.width):
+            river_y = int(
+                x * (river_start - river_end) / self.width + river_start
+            )
+            if 0 <= river_y < height:
+                tile_types[x * height + river_y] = 2  # water
+            if 1 <= river_y < height:
+                # generate_river later overwrites the dirt it wraps round
+                # to for a river on the top row, so only keep it below that
+                tile_types[x * height + river_y - 1] = 0  # dirt
+        self.layout_replaced()
+
+    def generate_river_horizontal_vectorized(self):
+        """
+        Vectorized version of generate_river_horizontal.
+        Every column has the same dirt, water and grass pattern, so one column is built and written into each column of the farm before the trees are added.
+        """
+        river_y = self.rng.randrange(2, self.height - 1)
+
+        column = array(
+            "b",
+            bytes(river_y)  # dirt above the river
+            + b"\x02"  # water (single row for the river)
+            + b"\x01" * (self.height - river_y - 1),  # grass below the river
+        )
+        self.fill(0)
+        tile_types = self.tile_types
+        for start in range(0, self.width * self.height, self.height):
+            tile_types[start : start + self.height] = column
+        # between 4 and 10 trees on the grass below the river; this also
+        # reports the new layout
+        self.place_trees(
+            1, self.rng.randint(4, 10), rows=range(river_y + 1, self.height)
+        )
+
+    def generate_tree_river_vectorized(self):
+        """
+        Vectorized version of generate_tree_river.
+        """
+        self.generate_river_vectorized()
+        self.place_trees(1, 1, *self.interior())  # one tree on grass
+
+    def generate_grass_vectorized(self, grass_percentage=0.4):
+        """
+        Vectorized version of generate_grass.
+        The random numbers of each column are drawn in one batch, in the same order as the packed arrays, and turned into a column of grass or dirt bytes in a single pass.
+
+        Args:
+            grass_percentage: A float value between 0 and 1 representing the probability that a tile will be grass (default is 0.4).
+        """
+        rand = self.rng.random
+        height = self.height
+        self.fill(0)
+        tile_types = self.tile_types
+        for start in range(0, self.width * height, height):
+            column = array(
+                "b", map(grass_percentage.__gt__, [rand() for _ in range(height)])
+            )
+            column[0] = 1  # grass first row
+            tile_types[start : start + height] = column
+        self.layout_replaced()
+
+    def generate_crops_vectorized(self):
+        """
+        Vectorized version of generate_crops.
+        Positions are shuffled as flat indices into the packed arrays, and the chosen tiles and their crops are written straight into the arrays.
+        """
+        height = self.height
+        size = self.width * height
+        self.fill(0)
+        tile_types, crop_types = self.tile_types, self.crop_types
+        for start in range(0, size, height):
+            tile_types[start] = 1  # grass first row
+
+        # same positions, in the same order, as generate_crops
+        avail_positions = [
+            x * height + y for x in range(self.width) for y in range(1, height)
+        ]
+        crop_count = min(int(size * 0.2), len(avail_positions))
+        self.rng.shuffle(avail_positions)
+
+        # generate_crops pops its positions from the end of the list
+        chosen = avail_positions[len(avail_positions) - crop_count :]
+        randrange = self.rng.randrange
+        for index in reversed(chosen):
+            tile_types[index] = 3
+            crop_types[index] = randrange(100) % 3
+        self.layout_replaced()
+
+    def generate_crop_row_vectorized(self):
+        """
+        Vectorized version of generate_crop_row.
+        Only the tiles of the crop row are written after the farm is filled with dirt.
+        """
+        crop_row = self.rng.randrange(1, self.height - 1)
+        randrange = self.rng.randrange
+        row_crops = [randrange(3) for _ in range(self.width)]
 
-    def restart(self):
+        self.fill(0)
+        tile_types, crop_types = self.tile_types, self.crop_types
+        for x, crop_type in enumerate(row_crops):
+            index = x * self.height + crop_row
+            tile_types[index] = 3
+            crop_types[index] = crop_type
+        self.layout_replaced()
+
+    def restart(self, seed=None):
         """
         Restarts the farm grid by regenerating it and resetting the farmer's position.
         This function clears the existing grid, creates a new farm layout, and repositions the farmer to the starting location, ensuring a fresh state for gameplay.
+        Any farmers added with spawn_farmer() are removed, along with their queued actions.
+
+        Args:
+            seed: The seed for the new layout; pass the farm's current seed to get the same layout back, or None for a new random one (default is None).
         """
-        print("RESTART(farmgrid)")
-        self.grid = []
-        self.generate_farm()  # Regenerate the farm grid
+        log.debug("restart", config=self.config, seed=seed)
+        self.generate_farm(seed)  # Regenerate the farm grid
+        self.farmers = [] if self.farmer is None else [self.farmer]
+        self.scheduler = Scheduler(self)
         if self.farmer is None:
             self.add_farmer(0, 0)  # Add farmer back at the starting position
         else:
@@ -284,6 +898,7 @@ class FarmGrid:
             str: A formatted string representing the farm's attributes and layout.
         """
         farmer_x, farmer_y = self.farmer.get_pos()
+        positions = {farmer.get_pos(): farmer.symbol for farmer in self.farmers}
         string = "width={}, height={}\n".format(self.width, self.height)
         string += "farmer_position={} ({})\n".format(
             (farmer_x, farmer_y), self.grid[farmer_x][farmer_y]
@@ -293,8 +908,10 @@ class FarmGrid:
             for x in range(self.width):
                 if (farmer_x, farmer_y) == (x, y):
                     symbol = self.farmer.symbol
+                elif (x, y) in positions:
+                    symbol = positions[(x, y)]
                 else:
-                    symbol = str(self.grid[x][y].tile_type)
+                    symbol = str(self.get_tile_type(x, y))
 
                 string += symbol + " "
             string += "\n"
@@ -333,9 +950,24 @@ class FarmGrid:
             bool: True if the position is walkable, otherwise False.
         """
         x, y = pos
-        return not self.out_of_bounds((x, y)) and (
-            self.grid[x][y].tile_type < 2 or self.grid[x][y].tile_type == 3
-        )
+        if self.out_of_bounds((x, y)):
+            return False
+        tile_type = self.get_tile_type(x, y)
+        return tile_type < 2 or tile_type == 3
+
+    def distance(self, a, b):
+        """
+        Finds how many moves it takes to walk between two positions on the farm, going around water and trees.
+        The answer comes from a distance field that is cached until a tile changes between walkable and not walkable, so repeated queries are cheap.
+
+        Args:
+            a: A tuple containing the x and y coordinates to start from.
+            b: A tuple containing the x and y coordinates to reach.
+
+        Returns:
+            int: The smallest number of moves from a to b, or None if b cannot be reached from a.
+        """
+        return self.paths.distance(a, b)
 
     def add_farmer(self, x=0, y=0):
         """
@@ -347,15 +979,56 @@ class FarmGrid:
             y: The y-coordinate where the farmer should be placed (default is 0).
         """
         if self.farmer is None:
-            if self.grid[x][y].tile_type < 2 and not self.out_of_bounds((x, y)):
+            if not self.out_of_bounds((x, y)) and self.get_tile_type(x, y) < 2:
                 self.farmer = Farmer(self, x, y)
-                print(f"farmer added at ({x}, {y})")
+                self.farmers.insert(0, self.farmer)
+                self.mark_dirty(x, y)
+                log.debug("farmer_added", x=x, y=y)
         else:  # farmer already exists
+            self.mark_dirty(self.farmer.x, self.farmer.y)
             self.farmer.x, self.farmer.y = x, y
+            self.mark_dirty(x, y)
 
     def remove_farmer(self):
         """
         Removes the farmer from the farm grid.
         This function sets the farmer attribute to None, effectively removing the farmer from the game if one exists.
         """
+        if self.farmer is not None:
+            self.farmers.remove(self.farmer)
+            self.mark_dirty(self.farmer.x, self.farmer.y)
         self.farmer = None
+
+    def spawn_farmer(self, x, y):
+        """
+        Adds another farmer to the farm, for levels and simulations where several farmers work the same farm.
+        Extra farmers act through the farm's scheduler (see tick()); if the farm has no farmer yet, the new farmer also becomes the farm's main farmer.
+
+        Args:
+            x: The x-coordinate where the farmer should be placed.
+            y: The y-coordinate where the farmer should be placed.
+
+        Returns:
+            Farmer: The new farmer.
+
+        Raises:
+            ValueError: If the position is outside the farm or not walkable.
+        """
+        if not self.walkable((x, y)):
+            raise ValueError(f"Cannot place a farmer at ({x}, {y})")
+        farmer = Farmer(self, x, y)
+        self.farmers.append(farmer)
+        if self.farmer is None:
+            self.farmer = farmer
+        self.mark_dirty(x, y)
+        return farmer
+
+    def tick(self):
+        """
+        Runs one tick of the farm's scheduler, letting every farmer with queued actions perform its next one.
+        Actions are queued with farm.scheduler.submit(farmer, actions).
+
+        Returns:
+            list: The (farmer, action, accepted) outcome of every action attempted during the tick.
+        """
+        return self.scheduler.tick()
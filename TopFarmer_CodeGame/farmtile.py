@@ -5,6 +5,8 @@ class FarmTile:
     This class provides methods to retrieve the tile's position, check if it is a crop tile, and get the crop type if applicable, facilitating interactions within the farm environment.
     """
 
+    __slots__ = ("tile_type", "x", "y")
+
     tile_desc = {0: "dirt", 1: "grass", 2: "water", 3: "crop", 4: "tree"}
 
     def __init__(self, x, y, tile_type=0):
@@ -68,6 +70,8 @@ class CropTile(FarmTile):
     This class initializes a crop tile with a specified crop type and provides a method to retrieve the crop type, allowing for detailed management of crops within the farm environment.
     """
 
+    __slots__ = ("crop_type",)
+
     def __init__(self, x, y, crop_type=0):
         """
         Initializes a CropTile object with specified coordinates and crop type.
@@ -90,3 +94,84 @@ class CropTile(FarmTile):
             The type of crop associated with the tile.
         """
         return self.crop_type
+
+
+class SharedTile(FarmTile):
+    """
+    A read-only FarmTile shared by every cell of the same terrain type.
+    Shared tiles carry no coordinates of their own (x and y are None); farm.grid.cell() wraps them in a TileView holding the position they were looked up at.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, tile_type):
+        """
+        Initializes a SharedTile for the given terrain type.
+
+        Args:
+            tile_type: An integer representing the type of tile.
+        """
+        object.__setattr__(self, "tile_type", tile_type)
+        object.__setattr__(self, "x", None)
+        object.__setattr__(self, "y", None)
+
+    def __setattr__(self, name, value):
+        """
+        Prevents shared tiles from being modified, since every cell of the same type refers to the same instance.
+
+        Raises:
+            AttributeError: Always; assign a new tile through farm.grid[x][y] instead.
+        """
+        raise AttributeError(
+            "shared tiles are read-only; assign farm.grid[x][y] instead"
+        )
+
+
+class SharedCropTile(CropTile):
+    """
+    A read-only CropTile shared by every cell holding the same type of crop.
+    Like SharedTile, it carries no coordinates of its own.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, crop_type):
+        """
+        Initializes a SharedCropTile for the given crop type.
+
+        Args:
+            crop_type: An integer representing the type of crop.
+        """
+        object.__setattr__(self, "tile_type", 3)
+        object.__setattr__(self, "crop_type", crop_type)
+        object.__setattr__(self, "x", None)
+        object.__setattr__(self, "y", None)
+
+    __setattr__ = SharedTile.__setattr__
+
+
+# one interned instance per terrain type (indexed by tile type) and per crop
+TERRAIN_TILES = tuple(SharedTile(tile_type) for tile_type in range(5))
+CROP_TILES = tuple(SharedCropTile(crop_type) for crop_type in range(3))
+
+
+def shared_tile(tile_type, crop_type=None):
+    """
+    Looks up the interned tile for the given tile type and crop type.
+    Grid reads return these instead of allocating a new tile object for every access.
+
+    Args:
+        tile_type: An integer representing the type of tile.
+        crop_type: An integer representing the type of crop, for crop tiles (default is None).
+
+    Returns:
+        FarmTile: The shared, read-only tile for that combination.
+
+    Raises:
+        ValueError: If a crop tile is looked up without a crop type.
+    """
+    if tile_type == 3:
+        if crop_type is None:
+            raise ValueError("a crop tile needs a crop type")
+        return CROP_TILES[crop_type]
+    return TERRAIN_TILES[tile_type]
@@ -0,0 +1,202 @@
+# gridchecks.py
+import re
+from functools import cache
+from runindex import CROP_KEY_OFFSET, crop_key, tile_keys
+
+# tile type -> 1 for crop tiles, 2 for water and 0 for anything else, so
+# that the product of two neighbours is 2 only for a crop next to water
+CROP_OR_WATER = bytes([0, 0, 2, 1]) + bytes(252)
+
+# tile keys that are not crop tiles; the alternating pattern skips them
+NOT_CROP_KEYS = bytes(key for key in range(CROP_KEY_OFFSET) if key != 3)
+
+
+@cache
+def alternating(first, second):
+    """
+    Creates the RunIndex measure for a pattern of two crops alternating along a row, one measure per pair of crops so that the index keeps its result for the pair.
+    The measure follows the crop tiles of a line with a counter, the way the level check has always counted: tiles other than crops are skipped, the expected crop adds one to the counter and any other crop resets it to zero without being counted itself. The counter passes through every value up to the highest one it reaches, which the measure returns.
+
+    Args:
+        first: The crop type the pattern starts with.
+        second: The crop type that alternates with it.
+
+    Returns:
+        function: A function taking the keys of a line and returning the highest count the pattern reaches in it.
+    """
+    start, then = (re.escape(bytes([crop_key(crop)])) for crop in (first, second))
+    # a run of the pattern, followed by the tile that ended it, if any
+    pattern = re.compile(b"(%s(?:%s%s)*%s?).?" % (start, then, start, then), re.S)
+
+    def measure(keys):
+        crops = keys.translate(None, NOT_CROP_KEYS)
+        return max((len(run) for run in pattern.findall(crops)), default=0)
+
+    return measure
+
+
+class GridChecks:
+    """
+    Evaluates the level checks that look at the whole layout of a farm, for any farm size, without scanning the farm for each check.
+    The number of crop tiles next to water is kept up to date from each tile change, diagonals are read from the farm's packed arrays as a single slice, and the alternating pattern is measured per row by the farm's RunIndex, so a farmer moving about or a single tile changing never causes the whole farm to be looked at again.
+    """
+
+    def __init__(self, farm, runs):
+        """
+        Initializes GridChecks for the given farm.
+
+        Args:
+            farm: The FarmGrid to check.
+            runs: The RunIndex of the farm, used for the patterns along rows.
+        """
+        self.farm = farm
+        self.runs = runs
+        # pairs of a crop tile and a water tile next to each other, or None
+        # until they are counted
+        self.water_pairs = None
+
+    def copy(self, farm, runs):
+        """
+        Args:
+            farm: The farm the copy belongs to, such as a fork, with the same layout as this farm.
+            runs: The RunIndex of that farm.
+
+        Returns:
+            GridChecks: Checks for the other farm, starting from what is known about this one.
+        """
+        checks = GridChecks(farm, runs)
+        checks.water_pairs = self.water_pairs
+        return checks
+
+    def on_tile_changed(self, x, y, old_tile, old_crop, new_tile, new_crop):
+        """
+        Updates the number of crop tiles next to water from the tiles around a changed tile.
+        The farm calls this for every tile write.
+
+        Args:
+            x: The x-coordinate of the tile.
+            y: The y-coordinate of the tile.
+            old_tile: The tile type before the change.
+            old_crop: The crop type before the change, or a negative number for no crop.
+            new_tile: The tile type after the change.
+            new_crop: The crop type after the change, or a negative number for no crop.
+        """
+        old = CROP_OR_WATER[old_tile]
+        new = CROP_OR_WATER[new_tile]
+        if self.water_pairs is None or old == new:
+            return
+        width = self.farm.width
+        height = self.farm.height
+        tile_types = self.farm.tile_types
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < width and 0 <= ny < height:
+                near = CROP_OR_WATER[tile_types[nx * height + ny]]
+                self.water_pairs += (new * near == 2) - (old * near == 2)
+
+    def on_grid_reset(self):
+        """
+        Forgets the number of crop tiles next to water, to be counted again when it is next needed.
+        The farm calls this whenever its whole layout is replaced.
+        """
+        self.water_pairs = None
+
+    def count_water_pairs(self):
+        """
+        Counts the pairs of a crop tile and a water tile next to each other, a column at a time.
+        Each column is mapped to crop or water with one bytes.translate call; pairs within the column are found by substring counts, and pairs with the previous column by combining both columns into one big integer, so the tiles are not looped over in Python.
+
+        Returns:
+            int: The number of pairs.
+        """
+        height = self.farm.height
+        pairs = 0
+        previous = None
+        for start in range(0, self.farm.width * height, height):
+            column = (
+                self.farm.tile_types[start : start + height]
+                .tobytes()
+                .translate(CROP_OR_WATER)
+            )
+            pairs += column.count(b"\x01\x02") + column.count(b"\x02\x01")
+            if previous is not None:
+                # previous * 4 + column, per tile: 6 or 9 for crop and water
+                side = (
+                    int.from_bytes(previous, "little") << 2
+                    | int.from_bytes(column, "little")
+                ).to_bytes(height, "little")
+                pairs += side.count(6) + side.count(9)
+            previous = column
+        return pairs
+
+    def diagonal(self, x_start, y_start, x_move, y_move):
+        """
+        Args:
+            x_start: The x-coordinate to start from.
+            y_start: The y-coordinate to start from.
+            x_move: The step taken along x each move (-1, 0 or 1).
+            y_move: The step taken along y each move (-1, 0 or 1).
+
+        Returns:
+            bytes: The keys of the tiles from the start up to the edge of the farm, in order, or no keys if the start is off the farm.
+        """
+        width = self.farm.width
+        height = self.farm.height
+        if not (0 <= x_start < width and 0 <= y_start < height):
+            return b""
+        steps = []
+        for start, move, size in (
+            (x_start, x_move, width),
+            (y_start, y_move, height),
+        ):
+            if move > 0:
+                steps.append((size - 1 - start) // move + 1)
+            elif move < 0:
+                steps.append(start // -move + 1)
+        length = min(steps, default=1)
+        start = x_start * height + y_start
+        step = x_move * height + y_move
+        if step == 0:
+            line = slice(start, start + 1)
+        else:
+            stop = start + length * step
+            line = slice(start, stop if stop >= 0 else None, step)
+        return tile_keys(self.farm.tile_types[line], self.farm.crop_types[line])
+
+    def has_dirt_on_diagonal(self, x_start, y_start, x_move, y_move):
+        """
+        Args:
+            x_start: The x-coordinate to start from.
+            y_start: The y-coordinate to start from.
+            x_move: The step taken along x each move.
+            y_move: The step taken along y each move.
+
+        Returns:
+            bool: True if any tile from the start up to the edge of the farm is dirt, otherwise False.
+        """
+        return b"\x00" in self.diagonal(x_start, y_start, x_move, y_move)
+
+    def has_alternating_crops(self, first, second, count):
+        """
+        Checks whether the crops of any row alternate between two crops a number of times, counted as described in alternating().
+        A count of zero is always found, as the counter starts at zero.
+
+        Args:
+            first: The crop type the pattern starts with.
+            second: The crop type that alternates with it.
+            count: The number of consecutive crops in the pattern.
+
+        Returns:
+            bool: True if the pattern appears in a row, otherwise False.
+        """
+        if count <= 0:
+            return count == 0
+        return self.runs.longest_in_rows(alternating(first, second)) >= count
+
+    def has_crop_next_to_water(self):
+        """
+        Returns:
+            bool: True if any crop tile is directly above, below, left or right of a water tile, otherwise False.
+        """
+        if self.water_pairs is None:
+            self.water_pairs = self.count_water_pairs()
+        return self.water_pairs > 0
@@ -0,0 +1,238 @@
+# gridview.py
+from farmtile import shared_tile
+
+
+def _normalise_index(index, length):
+    """
+    Converts a possibly negative index into a position within a sequence of the given length.
+    This mirrors the indexing rules of Python lists so that code written against the old list-of-lists grid keeps behaving the same way.
+
+    Args:
+        index: The integer index to normalise.
+        length: The length of the sequence being indexed.
+
+    Returns:
+        int: The normalised index.
+
+    Raises:
+        IndexError: If the index falls outside of the sequence.
+    """
+    if index < 0:
+        index += length
+    if not 0 <= index < length:
+        raise IndexError("grid index out of range")
+    return index
+
+
+class GridView:
+    """
+    A list-like view over the packed tile arrays of a FarmGrid.
+    Indexing the view with an x-coordinate returns a GridColumn, so that farm.grid[x][y] keeps working like the list-of-lists grid it replaces.
+    The tiles read that way are shared by every cell of the same type and do not know their position; use cell() for a tile that does.
+    """
+
+    __slots__ = ("farm", "columns")
+
+    def __init__(self, farm):
+        """
+        Initializes a GridView over the given farm, creating one reusable column view per x-coordinate.
+
+        Args:
+            farm: The FarmGrid whose packed tile arrays are exposed by this view.
+        """
+        self.farm = farm
+        self.columns = [GridColumn(farm, x) for x in range(farm.width)]
+
+    def __len__(self):
+        """
+        Returns:
+            int: The number of columns in the farm (its width).
+        """
+        return self.farm.width
+
+    def __getitem__(self, x):
+        """
+        Retrieves a column view of the farm at the given x-coordinate.
+
+        Args:
+            x: The x-coordinate of the column.
+
+        Returns:
+            GridColumn: A view of the tiles in that column.
+
+        Raises:
+            IndexError: If the x-coordinate is outside of the farm.
+        """
+        return self.columns[_normalise_index(x, self.farm.width)]
+
+    def __iter__(self):
+        """
+        Iterates over the columns of the farm from left to right.
+
+        Returns:
+            iterator: An iterator over the GridColumn views of the farm.
+        """
+        return iter(self.columns)
+
+    def cell(self, x, y):
+        """
+        Retrieves the tile at the given position together with that position, for code that needs the tile's get_pos().
+
+        Args:
+            x: The x-coordinate of the tile.
+            y: The y-coordinate of the tile.
+
+        Returns:
+            TileView: The shared tile for that position, placed at it.
+
+        Raises:
+            IndexError: If the position is outside of the farm.
+        """
+        x = _normalise_index(x, self.farm.width)
+        y = _normalise_index(y, self.farm.height)
+        return TileView(self.columns[x][y], x, y)
+
+
+class GridColumn:
+    """
+    A view of a single column of a FarmGrid.
+    Reading a tile returns the interned, read-only tile for its type without allocating anything, and assigning a tile packs it back, so the grid never keeps a tile object alive per cell.
+    """
+
+    __slots__ = ("farm", "x")
+
+    def __init__(self, farm, x):
+        """
+        Initializes a GridColumn for the given farm and x-coordinate.
+
+        Args:
+            farm: The FarmGrid the column belongs to.
+            x: The x-coordinate of the column.
+        """
+        self.farm = farm
+        self.x = x
+
+    def __len__(self):
+        """
+        Returns:
+            int: The number of tiles in the column (the farm's height).
+        """
+        return self.farm.height
+
+    def __getitem__(self, y):
+        """
+        Retrieves the tile at the given y-coordinate of this column.
+
+        Args:
+            y: The y-coordinate of the tile, or a slice of y-coordinates.
+
+        Returns:
+            FarmTile: The shared tile for that position, or a list of them for a slice.
+
+        Raises:
+            IndexError: If the y-coordinate is outside of the farm.
+        """
+        if isinstance(y, slice):
+            return [self[i] for i in range(*y.indices(self.farm.height))]
+        y = _normalise_index(y, self.farm.height)
+        return shared_tile(
+            self.farm.get_tile_type(self.x, y),
+            self.farm.get_crop_type(self.x, y),
+        )
+
+    def __setitem__(self, y, tile):
+        """
+        Stores a tile at the given y-coordinate of this column.
+        Only the tile and crop types are kept; the tile object itself is discarded once it has been packed into the farm's arrays.
+
+        Args:
+            y: The y-coordinate of the tile.
+            tile: The FarmTile or CropTile to store.
+
+        Raises:
+            IndexError: If the y-coordinate is outside of the farm.
+        """
+        y = _normalise_index(y, self.farm.height)
+        crop_type = None
+        if tile.is_crop():
+            crop_type = getattr(tile, "crop_type", None)
+        self.farm.set_tile(self.x, y, tile.tile_type, crop_type)
+
+    def __iter__(self):
+        """
+        Iterates over the tiles of the column from top to bottom.
+
+        Yields:
+            FarmTile: Each tile in the column in turn.
+        """
+        for y in range(self.farm.height):
+            yield self[y]
+
+
+class TileView:
+    """
+    A read-only view of one cell of a FarmGrid, pairing the interned tile for the cell's type with the position it was read from.
+    The view answers like the tile it wraps, so farm.grid.cell(x, y).get_pos() gives the cell's own coordinates even though the tile behind it is shared by every cell of the same type.
+    """
+
+    __slots__ = ("tile", "x", "y")
+
+    def __init__(self, tile, x, y):
+        """
+        Initializes a TileView.
+
+        Args:
+            tile: The shared tile for the cell's type.
+            x: The x-coordinate of the cell.
+            y: The y-coordinate of the cell.
+        """
+        self.tile = tile
+        self.x = x
+        self.y = y
+
+    def __str__(self):
+        """
+        Returns:
+            str: A string representing the tile type description.
+        """
+        return str(self.tile)
+
+    @property
+    def tile_type(self):
+        """
+        Returns:
+            int: The type of the tile.
+        """
+        return self.tile.tile_type
+
+    @property
+    def crop_type(self):
+        """
+        Returns:
+            int: The type of crop on the tile.
+
+        Raises:
+            AttributeError: If the tile is not a crop tile.
+        """
+        return self.tile.crop_type
+
+    def get_pos(self):
+        """
+        Returns:
+            tuple: A tuple containing the x and y coordinates of the cell.
+        """
+        return (self.x, self.y)
+
+    def is_crop(self):
+        """
+        Returns:
+            bool: True if the tile is a crop, otherwise False.
+        """
+        return self.tile.is_crop()
+
+    def get_crop_type(self):
+        """
+        Returns:
+            The type of crop if the tile is a crop, otherwise None.
+        """
+        return self.tile.get_crop_type()
@@ -0,0 +1,122 @@
+# inventory.py
+CROP_COUNT = 3  # potato, carrot, pumpkin
+
+
+class Inventory:
+    """
+    Holds the crops carried by a farmer as one counter per crop type.
+    It supports the list operations the farmer's inventory has always offered (count, append, remove, in, len and iteration), but each of them takes the same time no matter how many crops the farmer has collected.
+    """
+
+    __slots__ = ("counts",)
+
+    def __init__(self, counts=(0,) * CROP_COUNT):
+        """
+        Initializes an Inventory holding the given number of each crop.
+
+        Args:
+            counts: The number of potatoes, carrots and pumpkins held, in that order (default is none of each).
+
+        Raises:
+            ValueError: If counts does not give a non-negative number for every crop type.
+        """
+        counts = list(counts)
+        if len(counts) != CROP_COUNT or min(counts) < 0:
+            raise ValueError(
+                f"An inventory needs {CROP_COUNT} non-negative crop counts"
+            )
+        self.counts = counts
+
+    def __repr__(self):
+        """
+        Returns:
+            str: A representation of the inventory showing the count of each crop type.
+        """
+        return f"Inventory({self.counts!r})"
+
+    def __eq__(self, other):
+        """
+        Args:
+            other: The object to compare with.
+
+        Returns:
+            bool: True if other is an Inventory holding the same crops, otherwise False.
+        """
+        if not isinstance(other, Inventory):
+            return NotImplemented
+        return self.counts == other.counts
+
+    def __len__(self):
+        """
+        Returns:
+            int: The total number of crops held.
+        """
+        return sum(self.counts)
+
+    def __contains__(self, crop):
+        """
+        Args:
+            crop: The type of crop to look for.
+
+        Returns:
+            bool: True if at least one crop of that type is held, otherwise False.
+        """
+        return self.count(crop) > 0
+
+    def __iter__(self):
+        """
+        Iterates over every crop held, grouped by crop type.
+
+        Yields:
+            int: The type of each crop held.
+        """
+        for crop, count in enumerate(self.counts):
+            for _ in range(count):
+                yield crop
+
+    def count(self, crop):
+        """
+        Args:
+            crop: The type of crop to count.
+
+        Returns:
+            int: The number of crops of that type held, or 0 for anything that is not a crop type.
+        """
+        if type(crop) is int and 0 <= crop < CROP_COUNT:
+            return self.counts[crop]
+        return 0
+
+    def append(self, crop):
+        """
+        Adds one crop of the given type.
+
+        Args:
+            crop: The type of crop to add.
+
+        Raises:
+            ValueError: If crop is not a crop type.
+        """
+        if not (type(crop) is int and 0 <= crop < CROP_COUNT):
+            raise ValueError(f"{crop!r} is not a crop type")
+        self.counts[crop] += 1
+
+    def remove(self, crop):
+        """
+        Removes one crop of the given type.
+
+        Args:
+            crop: The type of crop to remove.
+
+        Raises:
+            ValueError: If no crop of that type is held.
+        """
+        if self.count(crop) == 0:
+            raise ValueError(f"No crop of type {crop!r} in the inventory")
+        self.counts[crop] -= 1
+
+    def copy(self):
+        """
+        Returns:
+            Inventory: A new inventory holding the same crops.
+        """
+        return Inventory(self.counts)
@@ -0,0 +1,91 @@
+# layoutpipeline.py
+import queue
+import threading
+from farmgrid import FarmGrid
+
+
+class LayoutPipeline:
+    """
+    Generates farms for a configuration in a background thread, ahead of when they are needed.
+    Up to depth farms are kept ready at a time; as soon as one is taken with next() the worker starts generating its replacement, so levels with several test cases can move from one case to the next without waiting for a farm to be generated.
+    """
+
+    def __init__(self, width, height, config, depth=3, **farm_options):
+        """
+        Initializes a LayoutPipeline and starts its background worker.
+
+        Args:
+            width: The width of the farms to generate.
+            height: The height of the farms to generate.
+            config: The farm configuration to generate (e.g. "river", "crops").
+            depth: The number of farms to keep ready ahead of time (default is 3).
+            **farm_options: Any further keyword arguments to pass to FarmGrid, such as layout_cache or vectorized.
+        """
+        self.width = width
+        self.height = height
+        self.config = config
+        self.farm_options = farm_options
+        self.farms = queue.Queue(maxsize=depth)
+        self.stopped = threading.Event()
+        self.worker = threading.Thread(target=self.generate_farms)
+        self.worker.daemon = True
+        self.worker.start()
+
+    def generate_farms(self):
+        """
+        Runs in the background worker, generating farms until the pipeline is closed.
+        The worker blocks while depth farms are already waiting to be taken. An error raised while generating a farm is handed over in place of the farm and re-raised by next().
+        """
+        while not self.stopped.is_set():
+            try:
+                farm = FarmGrid(
+                    self.width, self.height, self.config, **self.farm_options
+                )
+            except Exception as error:
+                farm = error
+            while not self.stopped.is_set():
+                try:
+                    self.farms.put(farm, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if isinstance(farm, Exception):
+                return
+
+    def next(self, timeout=None):
+        """
+        Takes the next generated farm, waiting for the worker if none is ready yet.
+
+        Args:
+            timeout: The longest time in seconds to wait for a farm, or None to wait as long as it takes (default is None).
+
+        Returns:
+            FarmGrid: A newly generated farm.
+
+        Raises:
+            queue.Empty: If no farm was generated within the timeout.
+            ValueError: If the pipeline has been closed.
+            Exception: Any error raised by the worker while generating the farm.
+        """
+        if self.stopped.is_set():
+            raise ValueError("Cannot take a farm from a closed LayoutPipeline")
+        farm = self.farms.get(timeout=timeout)
+        if isinstance(farm, Exception):
+            raise farm
+        return farm
+
+    def ready(self):
+        """
+        Returns:
+            int: The number of farms that are generated and waiting to be taken.
+        """
+        return self.farms.qsize()
+
+    def close(self):
+        """
+        Stops the background worker and discards any farms that have not been taken.
+        """
+        self.stopped.set()
+        self.worker.join()
+        while not self.farms.empty():
+            self.farms.get_nowait()
@@ -3,14 +3,24 @@ from farmgrid import FarmGrid
 from farmer import Farmer
 from farmtile import FarmTile, CropTile
 import json
+import struct
+import zlib
+from eventlog import log
+from layoutcache import LayoutCache
 
 
 class Levels:
     """
     Levels manages the game's levels, including their tasks, unlock status, and progress tracking.
     This class initializes the levels with specific tasks and configurations, provides methods to save and load progress, and checks for level completion based on player actions.
+    It also keeps the LayoutCache that every farm the game generates for its levels is stored in.
     """
 
+    LAYOUT_CACHE_FILE = "layout_cache.bin"
+    # 10x10 layouts compress to a few dozen bytes each, so the file stays
+    # small even when full
+    LAYOUT_CACHE_CAPACITY = 1000
+
     def __init__(self):
         """
         Initializes the Levels class, setting up the levels dictionary with tasks, completion checks, and unlock statuses.
@@ -24,6 +34,7 @@ class Levels:
                 "check_completion": self.check_level_1_completion,
                 "config": "plain",
                 "requires_multiple_test_cases": False,  #  false if code is to be run on only one farm instance
+                "instruction_budget": 20000,  # lines of code a run may execute
                 "unlocked": True,
             },
             2: {  # a pattern.. must be in row
@@ -31,6 +42,7 @@ class Levels:
                 "check_completion": self.check_level_2_completion,
                 "config": "plain",  # dirt only
                 "requires_multiple_test_cases": False,
+                "instruction_budget": 20000,
                 "unlocked": False,
             },
             3: {
@@ -38,6 +50,7 @@ class Levels:
                 "check_completion": self.check_level_3_completion,
                 "config": "grass",
                 "requires_multiple_test_cases": False,  # true if level requires multiple test cases to pass
+                "instruction_budget": 20000,
                 "unlocked": False,
             },
             4: {
@@ -45,6 +58,7 @@ class Levels:
                 "check_completion": self.check_level_4_completion,
                 "config": "river_horizontal",
                 "requires_multiple_test_cases": True,
+                "instruction_budget": 20000,
                 "unlocked": False,
             },
             5: {
@@ -52,6 +66,7 @@ class Levels:
                 "check_completion": self.check_level_5_completion,
                 "config": "crop_row",
                 "requires_multiple_test_cases": True,
+                "instruction_budget": 20000,
                 "unlocked": False,
             },
             6: {
@@ -59,6 +74,7 @@ class Levels:
                 "check_completion": self.check_level_6_completion,
                 "config": "crops",
                 "requires_multiple_test_cases": False,
+                "instruction_budget": 20000,
                 "unlocked": False,
             },
             7: {
@@ -66,18 +82,21 @@ class Levels:
                 "check_completion": self.check_level_7_completion,
                 "config": "grass",
                 "requires_multiple_test_cases": False,
+                "instruction_budget": 20000,
                 "unlocked": False,
             },
             8: {
-                "task": "find the longest consecutive row of dirt and fill it with carrots (no hardcoding; several random test cases apply).\n\n HINT: consider defining functions in your solution perhaps to find the longest dirt row's position and length \n\n NOTE: for this level, slow mode is automatically turned off in order to execute your code without waiting for too long ",
+                "task": "find the longest consecutive row of dirt and fill it with carrots (no hardcoding; several random test cases apply).\n\n HINT: consider defining functions in your solution perhaps to find the longest dirt row's position and length",
                 "check_completion": self.check_level_8_completion,
                 "config": "grass",
                 "requires_multiple_test_cases": True,
+                "instruction_budget": 200000,
                 "unlocked": False,
             },
         }
         self.current_level = 1
         self.load_progress()
+        self.layout_cache = self.load_layout_cache()
 
     def save_progress(self):
         """
@@ -95,7 +114,7 @@ class Levels:
         }
         with open("level_progress.json", "w") as file:
             json.dump(progress, file)
-            print("Progress saved")
+            log.info("progress_saved", level=self.current_level)
 
     def load_progress(self):
         """
@@ -112,7 +131,7 @@ class Levels:
         # Load saved progress from json file
         try:
             with open("level_progress.json", "r") as file:
-                print("loading progress...")
+                log.info("loading_progress")
                 progress = json.load(file)
                 self.current_level = progress.get("current_level", 1)
                 unlocked_levels = progress.get("levels", {})
@@ -122,7 +141,39 @@ class Levels:
                         self.levels[level]["unlocked"] = unlocked
         except FileNotFoundError:
             # if file does not exist, initialize to default
-            print("no saved game found. creating new save")
+            log.info("no_saved_progress")
+
+    def save_layout_cache(self):
+        """
+        Saves the layouts of the farms generated so far to 'layout_cache.bin',
+        so the same farms load instantly in the next session and a logged
+        test case seed reproduces its farm without generating it again.
+        """
+
+        self.layout_cache.save(self.LAYOUT_CACHE_FILE)
+        log.info("layout_cache_saved", layouts=len(self.layout_cache))
+
+    def load_layout_cache(self):
+        """
+        Loads the layouts saved by save_layout_cache() in an earlier session.
+        A missing or unreadable file gives an empty cache, since every layout
+        can be generated again from its seed.
+
+        Returns:
+            LayoutCache: The cache for every farm the game generates.
+        """
+
+        try:
+            cache = LayoutCache.load(
+                self.LAYOUT_CACHE_FILE, self.LAYOUT_CACHE_CAPACITY
+            )
+            log.info("layout_cache_loaded", layouts=len(cache))
+            return cache
+        except FileNotFoundError:
+            log.info("no_layout_cache")
+        except (ValueError, struct.error, zlib.error) as error:
+            log.warning("layout_cache_unreadable", error=str(error))
+        return LayoutCache(self.LAYOUT_CACHE_CAPACITY)
 
     def get_current_task(self):
         """
@@ -161,6 +212,17 @@ class Levels:
 
         return self.levels[self.current_level]["requires_multiple_test_cases"]
 
+    def get_instruction_budget(self):
+        """
+        Retrieves how many lines of code a run of the player's code may execute on the current level before it is stopped.
+        Levels that call for larger solutions allow more, so runaway code is stopped quickly without penalising legitimate solutions.
+
+        Returns:
+            int: The instruction budget for the current level.
+        """
+
+        return self.levels[self.current_level]["instruction_budget"]
+
     def is_level_unlocked(self, level_number):
         """
         Checks whether a specified level is unlocked for the player.
@@ -235,11 +297,14 @@ class Levels:
 
     def check_level_3_completion(self, farm_stats):
         # check for 2 diagonal lines of crops across the farm
-        return farm_stats.check_diagonal(0,0,1,1) and farm_stats.check_diagonal(0,9,-1,1)
+        width = farm_stats.farm.width
+        return farm_stats.check_diagonal(0, 0, 1, 1) and farm_stats.check_diagonal(
+            width - 1, 0, -1, 1
+        )
 
     def check_level_4_completion(self, farm_stats):
         return (
-            farm_stats.check_crops_in_row(10, 2)
+            farm_stats.check_crops_in_row(farm_stats.farm.width, 2)
             and farm_stats.check_crops_adjacent_to_river()
         )
 
@@ -255,10 +320,10 @@ class Levels:
 
     def check_level_7_completion(self, farm_stats):
         longest = farm_stats.longest_dirt_row()
-        print("longest dirt row = ", longest)
+        log.debug("longest_dirt_row", length=longest)
         return farm_stats.check_crops_in_row(longest, 1)
 
     def check_level_8_completion(self, farm_stats):
         longest = farm_stats.longest_dirt_row()
-        print("longest dirt row = ", longest)
+        log.debug("longest_dirt_row", length=longest)
         return farm_stats.check_crops_in_row(longest, 1)
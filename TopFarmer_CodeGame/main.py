@@ -1,16 +1,62 @@
 # main.py
+import argparse
+import os
 import farmgamegui
+from eventlog import LEVELS, log
+from executor import Executor
+
+
+def parse_args(argv=None):
+    """
+    Reads the game's command line options.
+    Each option falls back to an environment variable, so the options can also be set for launchers that do not pass any arguments.
+
+    Args:
+        argv: The arguments to parse, or None for the program's own (default is None).
+
+    Returns:
+        argparse.Namespace: The options, with log_level and log_file attributes.
+    """
+
+    parser = argparse.ArgumentParser(description="TopFarmer code game")
+    parser.add_argument(
+        "--log-level",
+        default=os.environ.get("TOPFARMER_LOG_LEVEL", "INFO"),
+        type=str.upper,
+        choices=list(LEVELS),
+        help="lowest level of diagnostic event to keep "
+        "(default: $TOPFARMER_LOG_LEVEL or INFO)",
+    )
+    parser.add_argument(
+        "--log-file",
+        default=os.environ.get("TOPFARMER_LOG_FILE"),
+        help="file to append diagnostic events to as JSON lines "
+        "(default: $TOPFARMER_LOG_FILE, or none)",
+    )
+    return parser.parse_args(argv)
 
 
 def main():
     """
     The main entry point for the Farm Game application.
-    This function initializes the FarmGameGUI and starts the main event loop,
+    This function sets up the diagnostic event log from the command line,
+    starts the worker processes that run the player's code,
+    initializes the FarmGameGUI and starts the main event loop,
     allowing the application to run and respond to user interactions.
     """
 
-    fg = farmgamegui.FarmGameGUI()
-    fg.mainloop()
+    args = parse_args()
+    log.configure(args.log_level, args.log_file)
+
+    # workers import this module again, so they must only be started from
+    # under the __main__ guard below
+    executor = Executor()
+    try:
+        fg = farmgamegui.FarmGameGUI(executor=executor)
+        fg.mainloop()
+    finally:
+        executor.close()
+        log.close_file()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+# pathfinder.py
+from array import array
+from collections import deque
+from actions import DIRECTIONS
+from tileindex import CHUNK_SIZE
+
+# WALKABLE[tile_type] is 1 for tiles the farmer can walk on (dirt, grass and
+# crops) and 0 for water and trees
+WALKABLE = bytes([1, 1, 0, 1, 0])
+
+# the same for every possible tile byte, for use with bytes.translate
+WALKABLE_TABLE = WALKABLE + bytes(256 - len(WALKABLE))
+
+UNREACHABLE = -1
+
+
+class PathFinder:
+    """
+    Finds shortest routes across a farm for FarmGrid.distance and Farmer.goto.
+    For every target asked about, a breadth-first search from the target records how many moves away it is from each tile of the farm (a distance field). Fields are cached, so every later query for the same target, from anywhere on the farm, is a lookup.
+    The cache is only thrown away when a tile changes between walkable and not walkable; planting, harvesting and moving the farmer leave it intact.
+    """
+
+    def __init__(self, farm, max_fields=16):
+        """
+        Initializes a PathFinder for the given farm with an empty cache.
+
+        Args:
+            farm: The FarmGrid to find routes on.
+            max_fields: The largest number of distance fields to keep cached; the oldest field is dropped when the cache is full (default is 16).
+        """
+        self.farm = farm
+        self.max_fields = max_fields
+        self.fields = {}  # target flat index -> distance field
+
+    def copy(self, farm):
+        """
+        Creates a PathFinder for another farm with the same layout, such as a fork, sharing the distance fields already computed.
+        Fields are never modified once computed, so they can safely be shared.
+
+        Args:
+            farm: The farm the copied PathFinder belongs to.
+
+        Returns:
+            PathFinder: The copied PathFinder.
+        """
+        paths = PathFinder(farm, self.max_fields)
+        paths.fields = dict(self.fields)
+        return paths
+
+    def on_tile_changed(self, x, y, old_tile, old_crop, new_tile, new_crop):
+        """
+        Drops every cached distance field if a tile has changed between walkable and not walkable.
+        The farm calls this for every tile write.
+
+        Args:
+            x: The x-coordinate of the tile.
+            y: The y-coordinate of the tile.
+            old_tile: The tile type before the change.
+            old_crop: The crop type before the change, or a negative number for no crop.
+            new_tile: The tile type after the change.
+            new_crop: The crop type after the change, or a negative number for no crop.
+        """
+        if WALKABLE[old_tile] != WALKABLE[new_tile]:
+            self.fields.clear()
+
+    def on_grid_reset(self):
+        """
+        Drops every cached distance field.
+        The farm calls this whenever its whole layout is replaced.
+        """
+        self.fields.clear()
+
+    def field(self, target):
+        """
+        Retrieves the distance field for a target tile, computing and caching it if needed.
+
+        Args:
+            target: A tuple containing the x and y coordinates of the target.
+
+        Returns:
+            array: The number of moves from each tile (indexed x * height + y) to the target, or UNREACHABLE for tiles the target cannot be reached from.
+        """
+        x, y = target
+        key = x * self.farm.height + y
+        field = self.fields.get(key)
+        if field is None:
+            if len(self.fields) >= self.max_fields:
+                del self.fields[next(iter(self.fields))]
+            field = self.fields[key] = self.search(x, y)
+        return field
+
+    def search(self, x, y):
+        """
+        Runs a breadth-first search outwards from a target tile over the walkable tiles of the farm.
+
+        Args:
+            x: The x-coordinate of the target.
+            y: The y-coordinate of the target.
+
+        Returns:
+            array: The distance field of the target.
+        """
+        width = self.farm.width
+        height = self.farm.height
+        tile_types = self.farm.tile_types
+        walkable = bytearray()
+        for start in range(0, len(tile_types), CHUNK_SIZE):
+            chunk = tile_types[start : start + CHUNK_SIZE].tobytes()
+            walkable += chunk.translate(WALKABLE_TABLE)
+        field = array("i", [UNREACHABLE]) * (width * height)
+        start = x * height + y
+        if not walkable[start]:
+            return field
+
+        field[start] = 0
+        queue = deque([start])
+        while queue:
+            index = queue.popleft()
+            distance = field[index] + 1
+            column, row = divmod(index, height)
+            if row > 0:
+                neighbour = index - 1
+                if walkable[neighbour] and field[neighbour] == UNREACHABLE:
+                    field[neighbour] = distance
+                    queue.append(neighbour)
+            if row < height - 1:
+                neighbour = index + 1
+                if walkable[neighbour] and field[neighbour] == UNREACHABLE:
+                    field[neighbour] = distance
+                    queue.append(neighbour)
+            if column > 0:
+                neighbour = index - height
+                if walkable[neighbour] and field[neighbour] == UNREACHABLE:
+                    field[neighbour] = distance
+                    queue.append(neighbour)
+            if column < width - 1:
+                neighbour = index + height
+                if walkable[neighbour] and field[neighbour] == UNREACHABLE:
+                    field[neighbour] = distance
+                    queue.append(neighbour)
+        return field
+
+    def distance(self, start, target):
+        """
+        Args:
+            start: A tuple containing the x and y coordinates to start from.
+            target: A tuple containing the x and y coordinates to reach.
+
+        Returns:
+            int: The smallest number of moves needed to walk from start to target, or None if target cannot be reached from start.
+        """
+        if self.farm.out_of_bounds(start) or self.farm.out_of_bounds(target):
+            return None
+        distance = self.field(target)[start[0] * self.farm.height + start[1]]
+        return None if distance == UNREACHABLE else distance
+
+    def route(self, start, target):
+        """
+        Finds a shortest route between two tiles.
+        When several routes are equally short, moves are preferred in the order up, down, left, right, so the same route is always chosen.
+
+        Args:
+            start: A tuple containing the x and y coordinates to start from.
+            target: A tuple containing the x and y coordinates to reach.
+
+        Returns:
+            list: The directions to move in ('up', 'down', 'left' or 'right'), or None if target cannot be reached from start.
+        """
+        remaining = self.distance(start, target)
+        if remaining is None:
+            return None
+
+        field = self.field(target)
+        height = self.farm.height
+        x, y = start
+        route = []
+        while remaining:
+            for direction, (dx, dy) in DIRECTIONS.items():
+                nx, ny = x + dx, y + dy
+                if (
+                    not self.farm.out_of_bounds((nx, ny))
+                    and field[nx * height + ny] == remaining - 1
+                ):
+                    break
+            route.append(direction)
+            x, y = nx, ny
+            remaining -= 1
+        return route
+
@@ -0,0 +1,333 @@
+# runindex.py
+from tileindex import CHUNK_SIZE
+
+# tiles are grouped into runs by tile type, except that crop tiles are
+# grouped by crop type, using these keys
+CROP_KEY_OFFSET = 5
+
+
+# crop_types bytes (with no crop stored as 0xFF) -> crop type + 1, so that
+# no crop becomes 0 and every value fits in two bits
+CROP_PLUS_ONE = bytes([1, 2, 3]) + bytes(253)
+
+# (crop type + 1) * 8 + tile type -> the key of the tile
+KEY_TABLE = bytes(
+    CROP_KEY_OFFSET + (b >> 3) - 1 if b & 7 == 3 and b >> 3 else b & 7
+    for b in range(256)
+)
+
+
+def crop_key(crop_type):
+    """
+    Args:
+        crop_type: An integer representing a type of crop.
+
+    Returns:
+        int: The key the RunIndex uses for runs of that crop.
+    """
+    return CROP_KEY_OFFSET + crop_type
+
+
+def tile_keys(tile_types, crop_types):
+    """
+    Combines packed tile and crop types into one key per tile without looping over the tiles in Python.
+    The arrays are read a chunk at a time, each chunk as a single big integer: the crop types are shifted into the bits above the tile types, and the combined bytes are mapped to keys with one bytes.translate call, so the work is done by C routines in a few passes over the data and a very long row or column is never copied whole.
+
+    Args:
+        tile_types: The packed tile types, one signed byte per tile (an array or memoryview).
+        crop_types: The packed crop types, one signed byte per tile.
+
+    Returns:
+        bytes: The key of every tile, in the same order as the arrays.
+    """
+    keys = []
+    for start in range(0, len(tile_types), CHUNK_SIZE):
+        tiles = tile_types[start : start + CHUNK_SIZE].tobytes()
+        crops = crop_types[start : start + CHUNK_SIZE].tobytes()
+        combined = int.from_bytes(
+            crops.translate(CROP_PLUS_ONE), "little"
+        ) << 3 | int.from_bytes(tiles, "little")
+        keys.append(combined.to_bytes(len(tiles), "little").translate(KEY_TABLE))
+    return b"".join(keys)
+
+
+def longest_run(keys, key):
+    """
+    Finds the longest run of a key in a string of tile keys.
+    Rather than walking the keys, this searches for ever longer runs of the key (doubling, then bisecting), so it takes a couple of dozen substring searches even for very long strings.
+
+    Args:
+        keys: The tile keys, as bytes.
+        key: The key to look for.
+
+    Returns:
+        int: The length of the longest run of the key, or 0 if it does not appear.
+    """
+    unit = bytes([key])
+    found, missing = 0, 1
+    while unit * missing in keys:
+        found, missing = missing, missing * 2
+    while missing - found > 1:
+        middle = (found + missing) // 2
+        if unit * middle in keys:
+            found = middle
+        else:
+            missing = middle
+    return found
+
+
+def measure(keys, key):
+    """
+    Args:
+        keys: The tile keys of a line, as bytes.
+        key: The key to look for, or a function taking the keys and returning a length of its own, such as the length of a pattern.
+
+    Returns:
+        int: The length of the longest run of the key, or what the function returns.
+    """
+    if callable(key):
+        return key(keys)
+    return longest_run(keys, key)
+
+
+class LineRuns:
+    """
+    Keeps the longest run of each key, line by line, for one direction of a farm: its rows or its columns.
+    For every key asked about it holds the length of the longest run in each line together with the number of lines of each length, so the longest run over all the lines is known without looking at them. A changed line is only marked as dirty; the next query re-measures the dirty lines and adjusts the numbers, so it costs as much as the lines that changed rather than as many lines as the farm has.
+    """
+
+    def __init__(self, count, size, read):
+        """
+        Initializes LineRuns for a number of lines of the same size, with nothing measured yet.
+
+        Args:
+            count: The number of lines.
+            size: The number of tiles in each line.
+            read: A function taking the index of a line and returning the keys of its tiles as bytes.
+        """
+        self.size = size
+        self.read = read
+        # the keys of each line, or None until they are needed
+        self.keys = [None] * count
+        # lines changed since the last query
+        self.dirty = set()
+        # key -> [longest run in each line, number of lines with each
+        # length, longest run in any line]
+        self.measured = {}
+
+    def copy(self, read):
+        """
+        Args:
+            read: The function reading the lines of the other farm.
+
+        Returns:
+            LineRuns: Runs for another farm with the same layout, such as a fork, starting from these measurements. The lengths are copied rather than shared, since each farm changes its own.
+        """
+        runs = LineRuns(len(self.keys), self.size, read)
+        runs.keys = list(self.keys)
+        runs.dirty = set(self.dirty)
+        runs.measured = {
+            key: [list(lengths), list(counts), longest]
+            for key, (lengths, counts, longest) in self.measured.items()
+        }
+        return runs
+
+    def changed(self, line):
+        """
+        Marks a line as changed, forgetting its keys.
+
+        Args:
+            line: The index of the line.
+        """
+        self.keys[line] = None
+        if self.measured:
+            self.dirty.add(line)
+
+    def reset(self):
+        """
+        Forgets every measurement.
+        """
+        self.keys = [None] * len(self.keys)
+        self.dirty.clear()
+        self.measured.clear()
+
+    def line(self, line):
+        """
+        Args:
+            line: The index of the line.
+
+        Returns:
+            bytes: The keys of the tiles in the line.
+        """
+        keys = self.keys[line]
+        if keys is None:
+            keys = self.keys[line] = self.read(line)
+        return keys
+
+    def longest(self, key):
+        """
+        Args:
+            key: The key to look for, or a measure function (see measure()).
+
+        Returns:
+            int: The length of the longest run of the key in any line.
+        """
+        if self.dirty:
+            self.update()
+        entry = self.measured.get(key)
+        if entry is None:
+            lengths = [
+                measure(self.line(line), key) for line in range(len(self.keys))
+            ]
+            counts = [0] * (self.size + 1)
+            for length in lengths:
+                counts[length] += 1
+            entry = [lengths, counts, max(lengths, default=0)]
+            self.measured[key] = entry
+        return entry[2]
+
+    def update(self):
+        """
+        Re-measures the lines changed since the last query, for every key measured so far.
+        """
+        for line in self.dirty:
+            keys = self.line(line)
+            for key, entry in self.measured.items():
+                lengths, counts, longest = entry
+                old = lengths[line]
+                new = lengths[line] = measure(keys, key)
+                counts[old] -= 1
+                counts[new] += 1
+                # the longest run only has to be looked for when the last
+                # line of that length got shorter
+                if new > longest:
+                    longest = new
+                while longest and not counts[longest]:
+                    longest -= 1
+                entry[2] = longest
+        self.dirty.clear()
+
+
+class RunIndex:
+    """
+    Keeps track of the longest run of each kind of tile in the rows and columns of a farm.
+    A tile change only marks its row and column as changed. Runs are measured only for the kinds of tile actually asked about, and after the first query for a kind only the rows and columns that changed since the previous query are measured again (see LineRuns), so neither changes nor queries loop over the whole farm.
+    """
+
+    def __init__(self, farm):
+        """
+        Initializes a RunIndex for the given farm, with nothing measured yet.
+
+        Args:
+            farm: The FarmGrid to index.
+        """
+        self.farm = farm
+        self.rows = LineRuns(farm.height, farm.width, self.read_row)
+        self.columns = LineRuns(farm.width, farm.height, self.read_column)
+
+    def copy(self, farm):
+        """
+        Creates a RunIndex for another farm with the same layout, such as a fork, starting from the measurements made so far.
+
+        Args:
+            farm: The farm the copied RunIndex belongs to.
+
+        Returns:
+            RunIndex: The copied RunIndex.
+        """
+        runs = RunIndex.__new__(RunIndex)
+        runs.farm = farm
+        runs.rows = self.rows.copy(runs.read_row)
+        runs.columns = self.columns.copy(runs.read_column)
+        return runs
+
+    def on_tile_changed(self, x, y, old_tile, old_crop, new_tile, new_crop):
+        """
+        Marks the row and column of a changed tile as changed.
+        The farm calls this for every tile write.
+
+        Args:
+            x: The x-coordinate of the tile.
+            y: The y-coordinate of the tile.
+            old_tile: The tile type before the change.
+            old_crop: The crop type before the change, or a negative number for no crop.
+            new_tile: The tile type after the change.
+            new_crop: The crop type after the change, or a negative number for no crop.
+        """
+        self.rows.changed(y)
+        self.columns.changed(x)
+
+    def on_grid_reset(self):
+        """
+        Forgets every measurement.
+        The farm calls this whenever its whole layout is replaced.
+        """
+        self.rows.reset()
+        self.columns.reset()
+
+    def read_row(self, y):
+        """
+        Args:
+            y: The y-coordinate of the row.
+
+        Returns:
+            bytes: The keys of the tiles in the row, read from the farm's packed arrays as a single slice with a stride of the farm's height.
+        """
+        height = self.farm.height
+        return tile_keys(
+            self.farm.tile_types[y::height], self.farm.crop_types[y::height]
+        )
+
+    def read_column(self, x):
+        """
+        Args:
+            x: The x-coordinate of the column.
+
+        Returns:
+            bytes: The keys of the tiles in the column, read from the farm's packed arrays as a single slice.
+        """
+        start = x * self.farm.height
+        stop = start + self.farm.height
+        return tile_keys(
+            self.farm.tile_types[start:stop], self.farm.crop_types[start:stop]
+        )
+
+    def row(self, y):
+        """
+        Args:
+            y: The y-coordinate of the row.
+
+        Returns:
+            bytes: The keys of the tiles in the row.
+        """
+        return self.rows.line(y)
+
+    def column(self, x):
+        """
+        Args:
+            x: The x-coordinate of the column.
+
+        Returns:
+            bytes: The keys of the tiles in the column.
+        """
+        return self.columns.line(x)
+
+    def longest_in_rows(self, key):
+        """
+        Args:
+            key: The tile type, crop_key(crop type) for crops, or a measure function (see measure()).
+
+        Returns:
+            int: The length of the longest run of that key in any row.
+        """
+        return self.rows.longest(key)
+
+    def longest_in_columns(self, key):
+        """
+        Args:
+            key: The tile type, crop_key(crop type) for crops, or a measure function (see measure()).
+
+        Returns:
+            int: The length of the longest run of that key in any column.
+        """
+        return self.columns.longest(key)
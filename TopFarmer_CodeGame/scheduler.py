@@ -0,0 +1,129 @@
+# scheduler.py
+from collections import deque
+from actions import DIRECTIONS, check_action
+
+
+class Scheduler:
+    """
+    Lets several farmers act on one farm in a fixed, repeatable order.
+    Each farmer has a queue of actions. Every tick, each farmer with actions left performs its next one; the farmer that goes first rotates from tick to tick so no farmer is always favoured, and the order within a tick only depends on the tick number and the order farmers were added to the farm.
+    Two farmers planting on or harvesting from the same tile in one tick conflict: the first one to act in that tick gets the tile and the other's action is rejected.
+    """
+
+    def __init__(self, farm):
+        """
+        Initializes a Scheduler for the given farm with no queued actions.
+
+        Args:
+            farm: The FarmGrid whose farmers are scheduled.
+        """
+        self.farm = farm
+        self.queues = {}  # farmer -> deque of actions
+        self.ticks = 0
+        # advances once per tick, and once for every action taken outside a
+        # tick, so actions can be told apart in time in single-farmer play too
+        self.clock = 0
+        self.ticking = False  # True while a tick is running
+        self.actions_performed = 0
+        self.actions_rejected = 0
+
+    def submit(self, farmer, actions):
+        """
+        Queues actions for a farmer, to be performed one per tick after any actions already queued for it.
+
+        Args:
+            farmer: The Farmer to perform the actions, which must be on the scheduler's farm.
+            actions: An iterable of action tuples, as accepted by Farmer.run.
+
+        Raises:
+            ValueError: If the farmer is not on the farm, or an action is malformed.
+        """
+        if farmer not in self.farm.farmers:
+            raise ValueError("The farmer is not on this farm")
+        actions = list(actions)
+        for i, action in enumerate(actions):
+            try:
+                check_action(action)
+            except ValueError as e:
+                raise ValueError(f"Action {i}: {e}") from None
+        self.queues.setdefault(farmer, deque()).extend(actions)
+
+    def pending(self):
+        """
+        Returns:
+            int: The number of actions still queued for farmers on the farm.
+        """
+        return sum(
+            len(self.queues.get(farmer, ())) for farmer in self.farm.farmers
+        )
+
+    def order(self):
+        """
+        Returns:
+            list: The farmers in the order they act in during the next tick.
+        """
+        farmers = self.farm.farmers
+        if not farmers:
+            return []
+        start = self.ticks % len(farmers)
+        return farmers[start:] + farmers[:start]
+
+    def tick(self):
+        """
+        Runs one tick, giving every farmer with queued actions the chance to perform its next one.
+
+        Returns:
+            list: The (farmer, action, accepted) outcome of every action attempted during the tick, in the order they were attempted.
+        """
+        claimed = set()  # tiles planted on or harvested from this tick
+        outcomes = []
+        self.ticking = True
+        try:
+            for farmer in self.order():
+                queue = self.queues.get(farmer)
+                if not queue:
+                    continue
+                action = queue.popleft()
+                if action[0] == "move":
+                    accepted = farmer.perform(action)
+                else:
+                    dx, dy = DIRECTIONS[action[-1]]
+                    target = (farmer.x + dx, farmer.y + dy)
+                    accepted = target not in claimed and farmer.perform(action)
+                    if accepted:
+                        claimed.add(target)
+                if accepted:
+                    self.actions_performed += 1
+                else:
+                    self.actions_rejected += 1
+                outcomes.append((farmer, action, accepted))
+        finally:
+            self.ticking = False
+        self.ticks += 1
+        self.clock += 1
+        return outcomes
+
+    def run(self, max_ticks=None):
+        """
+        Runs ticks until every queued action has been attempted.
+
+        Args:
+            max_ticks: The largest number of ticks to run, or None for no limit (default is None).
+
+        Returns:
+            int: The number of ticks run.
+        """
+        ticks = 0
+        while self.pending() and (max_ticks is None or ticks < max_ticks):
+            self.tick()
+            ticks += 1
+        return ticks
+
+    def throughput(self):
+        """
+        Returns:
+            float: The average number of actions performed per tick so far, or 0.0 if no tick has run.
+        """
+        if self.ticks == 0:
+            return 0.0
+        return self.actions_performed / self.ticks
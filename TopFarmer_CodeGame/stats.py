@@ -1,4 +1,7 @@
-import itertools
+import copy
+from gridchecks import GridChecks
+from runindex import RunIndex, crop_key
+from timeseries import TimeSeries
 
 
 class FarmStats:
@@ -16,6 +19,16 @@ class FarmStats:
         """
         self.farm = farm
 
+        # longest runs of each tile and crop type, kept up to date as the
+        # farm changes
+        self.runs = RunIndex(farm)
+        farm.subscribe(self.runs)
+        # checks over the whole layout, such as diagonals and patterns
+        self.checks = GridChecks(farm, self.runs)
+        farm.subscribe(self.checks)
+        # TimeSeries recording when actions happen, if enabled
+        self.timeseries = None
+
         self.left_moves = 0
         self.right_moves = 0
         self.up_moves = 0
@@ -29,6 +42,50 @@ class FarmStats:
         self.carrots_harvested = 0
         self.pumpkins_harvested = 0
 
+    def copy(self, farm):
+        """
+        Creates a copy of these statistics attached to another farm.
+        This is used when a farm is forked, so the fork starts from the same counters without sharing them. A time series is not carried over; the fork records into one only once enable_timeseries() is called on it.
+
+        Args:
+            farm: The farm the copied statistics belong to.
+
+        Returns:
+            FarmStats: The copied statistics.
+        """
+        stats = copy.copy(self)
+        stats.farm = farm
+        stats.runs = self.runs.copy(farm)
+        farm.subscribe(stats.runs)
+        stats.checks = self.checks.copy(farm, stats.runs)
+        farm.subscribe(stats.checks)
+        stats.timeseries = None  # the series belongs to whoever enabled it
+        return stats
+
+    def enable_timeseries(self, series=None):
+        """
+        Starts recording when each action on the farm happens, for the pacing shown on the statistics page.
+        Recording is off by default; while it is off the only cost to each action is checking whether a time series is set.
+
+        Args:
+            series: The TimeSeries to record into, for example one kept across several farms, or None for a new one (default is None).
+
+        Returns:
+            TimeSeries: The time series the actions are recorded in.
+        """
+        self.timeseries = TimeSeries() if series is None else series
+        return self.timeseries
+
+    def disable_timeseries(self):
+        """
+        Stops recording when actions happen.
+
+        Returns:
+            TimeSeries: The time series that was being recorded, or None if recording was not enabled.
+        """
+        series, self.timeseries = self.timeseries, None
+        return series
+
     # Moving Statistics
     # Setters
     def add_moves(self, direction):
@@ -188,7 +245,7 @@ class FarmStats:
     def count_crops(self, crop_type):
         """
         Counts the total number of specific crop types present on the farm.
-        This function iterates through the farm's grid, checking each tile to determine if it matches the specified crop type, and returns the total count of matching tiles.
+        The count is read from the farm's tile index, which is kept up to date as crops are planted and harvested, so this does not scan the farm.
 
         Args:
             crop_type: An integer representing the type of crop to count.
@@ -197,38 +254,23 @@ class FarmStats:
             int: The total number of tiles containing the specified crop type.
 
         """
-        count = 0
-        for x in range(self.farm.width):
-            for y in range(self.farm.height):
-                tile = self.farm.grid[x][y]
-                if (
-                    tile.tile_type == 3 and tile.crop_type == crop_type
-                ):  # Check tiles with specific crop
-                    count += 1
-        return count
+        return self.farm.index.crop_count(crop_type)
 
     def count_total_crops(self):
         """
         Counts the total number of crop tiles present on the farm.
-        This function iterates through the farm's grid, checking each tile to determine if it is a crop tile, and returns the total count of all crop tiles.
+        The count is read from the farm's tile index instead of scanning the farm.
 
         Returns:
             int: The total number of crop tiles on the farm.
         """
-        count = 0
-        for x, y in itertools.product(
-            range(self.farm.width), range(self.farm.height)
-        ):
-            tile = self.farm.grid[x][y]
-            if tile.tile_type == 3:
-                count += 1
-        return count
+        return self.farm.index.count(3)
 
     # level specific checks
     def check_crops_in_row(self, count, crop):
         """
         Checks if there are a specified number of consecutive crops in either a row or a column.
-        This function iterates through the farm's grid to determine if the given crop type appears consecutively for the specified count, returning a boolean indicating the presence of such a sequence.
+        The longest run of the crop in every row and column is kept up to date as the farm changes, so this only re-measures the rows and columns that changed since the last check.
 
         Args:
             count: An integer representing the number of consecutive crops to check for.
@@ -237,62 +279,46 @@ class FarmStats:
         Returns:
             bool: True if the specified number of consecutive crops is found, otherwise False.
         """
-        ver = False
-        hor = False
-        for y in range(self.farm.height):
-            consecutive = 0
-            for x in range(self.farm.width):
-                tile = self.farm.grid[x][y]
-                if (
-                    tile.tile_type == 3 and tile.crop_type == crop
-                ):  # 0=potato, 1=carrot, 2=pumpkin
-                    consecutive += 1
-                    if consecutive == count:
-                        hor = True
-                else:
-                    consecutive = 0
-
-        for x in range(self.farm.height):
-            consecutive = 0
-            for y in range(self.farm.width):
-                tile = self.farm.grid[x][y]
-                if tile.tile_type == 3 and tile.crop_type == crop:
-                    consecutive += 1
-                    if consecutive == count:
-                        ver = True
-                else:
-                    consecutive = 0
-
-        return ver or hor
+        if count <= 0:
+            return False
+        key = crop_key(crop)
+        return (
+            self.runs.longest_in_rows(key) >= count
+            or self.runs.longest_in_columns(key) >= count
+        )
+
     def check_diagonal(self, x_start, y_start, x_move, y_move):
-        x, y = x_start, y_start
-        while 0<= x<10 and 0<= y<10:
-            if (self.farm.grid[x][y].tile_type == 0):
-                return False
-            x += x_move
-            y += y_move
-        return True
+        """
+        Checks that no tile along a diagonal line is dirt, so that every plantable tile on it holds a crop.
+        The line is read from the farm as a single slice, so this works for a farm of any size.
+
+        Args:
+            x_start: The x-coordinate the line starts at.
+            y_start: The y-coordinate the line starts at.
+            x_move: The step taken along x each move (-1, 0 or 1).
+            y_move: The step taken along y each move (-1, 0 or 1).
+
+        Returns:
+            bool: True if no tile from the start up to the edge of the farm is dirt, otherwise False.
+        """
+        return not self.checks.has_dirt_on_diagonal(
+            x_start, y_start, x_move, y_move
+        )
 
     def check_crops_adjacent_to_river(self):
         """
-        Checks if there are crops planted adjacent to the river.
-        This function iterates through the farm's grid to determine if any crop tiles are located next to river tiles, returning a boolean indicating the presence of such crops.
+        Checks if there are crops planted adjacent to the river, that is directly above, below, left or right of a river tile.
+        The number of crop tiles next to the river is kept up to date as the farm changes, so this does not scan the farm.
 
         Returns:
             bool: True if there are crops adjacent to the river, otherwise False.
         """
-        for x,y in itertools.product(
-            range(self.farm.width), range(self.farm.height)
-        ):
-            tile = self.farm.grid[x][y]
-            adjacent = self.farm.grid[x][y-1]
-            if tile.tile_type == 2 and adjacent.tile_type == 3:
-                return True
+        return self.checks.has_crop_next_to_water()
 
     def check_alternating_pattern(self, count):
         """
-        Checks for an alternating pattern of carrots and pumpkins in a row or column.
-        This function iterates through the farm's grid to determine if a specified number of consecutive tiles alternate between carrots and pumpkins, returning a boolean indicating the presence of such a pattern.
+        Checks for an alternating pattern of carrots and pumpkins in a row.
+        The crops of each row are counted from the left, starting with a carrot: tiles without crops are skipped, and a crop out of turn resets the count to zero. How high the count gets in each row is kept up to date as the farm changes, so this only re-measures the rows that changed since the last check.
 
         Args:
             count: An integer representing the number of consecutive alternating crops to check for.
@@ -300,63 +326,24 @@ class FarmStats:
         Returns:
             bool: True if the specified alternating pattern is found, otherwise False.
         """
-        for y in range(self.farm.height):
-            consecutive = 0
-            for x in range(self.farm.width):
-                tile = self.farm.grid[x][y]
-                if tile.tile_type == 3:
-                    if (consecutive % 2 == 0 and tile.crop_type == 1) or (
-                        consecutive % 2 == 1 and tile.crop_type == 2
-                    ):  # Carrot then Pumpkin
-                        consecutive += 1
-                    else:
-                        consecutive = 0
-                if consecutive == count:
-                    return True
-        return False
+        return self.checks.has_alternating_crops(1, 2, count)  # Carrot then Pumpkin
 
     def check_no_dirt_tiles(self):
         """
         Checks if there are any dirt tiles present in the farm grid.
-        This function iterates through all tiles in the grid and returns False if any dirt tiles are found; otherwise, it returns True, indicating that the grid is free of dirt tiles.
+        The number of dirt tiles is read from the farm's tile index, so this does not scan the farm.
 
         Returns:
             bool: True if no dirt tiles are present, otherwise False.
         """
-        # Iterate through all tiles in the grid
-        for x, y in itertools.product(
-            range(self.farm.width), range(self.farm.height)
-        ):
-            tile = self.farm.grid[x][y]
-            if tile.tile_type == 0:
-                return False  # Found a dirt tile, return False
-
-        return True
+        return self.farm.index.count(0) == 0
 
     def longest_dirt_row(self):
         """
         Finds the longest consecutive row of dirt tiles in the farm grid.
-        This function iterates through the specified rows of the farm's grid to count and track the longest sequence of consecutive dirt tiles, returning the length of that sequence.
+        The longest run in every row is kept up to date as the farm changes, so this only re-measures the rows that changed since the last check.
 
         Returns:
             int: The length of the longest consecutive row of dirt tiles.
         """
-        longest = 0  # keeep track of the longest sequence of dirt tiles
-
-        for y in range(10):
-            current_dirt_count = (
-                0  # count consecutive dirt tiles in the current row
-            )
-
-            for x in range(10):
-                tile = self.farm.grid[x][y]
-
-                if tile.tile_type == 0:  # If dirt
-                    current_dirt_count += 1
-                    longest = max(longest, current_dirt_count)
-                else:
-                    current_dirt_count = (
-                        0  # reset count when encountering grass or otherr tile
-                    )
-
-        return longest
+        return self.runs.longest_in_rows(0)
@@ -0,0 +1,157 @@
+# stepper.py
+import threading
+import time
+
+
+class Stepper:
+    """
+    Plays a run, such as the replay of the player's recorded actions, one farmer action at a time, at a speed that can be changed or paused while it runs.
+    A run is an iterator that performs one farmer action each time it is advanced. The render loop calls pump() once per frame, which advances the run by the steps due at the chosen rate, so the farm only ever changes on the render thread, between two frames, and never while it is being drawn. The thread that started the run, usually the UI thread, never waits or sleeps.
+    With no rate set, or once the run is skipped, each frame plays as many steps as fit in a short time slice, so even a long run finishes quickly without holding up the frames.
+    """
+
+    def __init__(self, steps_per_second=2.5):
+        """
+        Initializes an idle Stepper.
+
+        Args:
+            steps_per_second: How many farmer actions to play per second, or None for full speed (default is 2.5).
+        """
+        self.steps_per_second = steps_per_second
+        self.paused = False
+        self.lock = threading.Lock()  # guards the state below
+        self.stepping = threading.RLock()  # held while pump() takes steps
+        self.steps_left = None  # the iterator of the current run, if any
+        self.done = None
+        self.running = False
+        self.credit = 0.0  # steps earned by the time passed since the last pump
+        self.last_pump = None
+        self.steps = 0  # steps taken in the current run
+        self.skipping = False  # True once the run is told to finish at once
+
+    def start(self, steps, done=None):
+        """
+        Starts a run, to be played by pump().
+
+        Args:
+            steps: An iterable performing one farmer action each time it is advanced.
+            done: A function to call, on the render thread, once the run has finished without being cancelled (default is None).
+
+        Raises:
+            RuntimeError: If a run is already in progress.
+        """
+        with self.lock:
+            if self.running:
+                raise RuntimeError("A run is already in progress")
+            self.steps_left = iter(steps)
+            self.done = done
+            self.running = True
+            self.credit = 0.0
+            self.last_pump = None
+            self.steps = 0
+            self.skipping = False
+
+    def pump(self, timeout=0.05):
+        """
+        Plays the steps of the run that are due since the last call.
+        Called by the render loop once per frame, before drawing; steps are only due while the run is not paused, at the chosen rate.
+
+        Args:
+            timeout: The longest time to spend on steps, in seconds, so a long run at full speed never holds up a frame for long (default is 0.05).
+        """
+        with self.stepping:
+            with self.lock:
+                now = time.perf_counter()
+                rate = self.steps_per_second
+                if self.running and self.last_pump is not None and not self.paused:
+                    if rate is not None:
+                        # never save up more than a tenth of a second of
+                        # steps, so the run does not jump ahead after stalling
+                        self.credit = min(
+                            self.credit + (now - self.last_pump) * rate,
+                            max(1.0, rate / 10),
+                        )
+                self.last_pump = now
+                if not self.running:
+                    return
+                if rate is None or self.skipping:
+                    steps = None  # as many as fit in the time slice
+                elif self.paused:
+                    steps = 0
+                else:
+                    steps = int(self.credit)
+                    self.credit -= steps
+                steps_left = self.steps_left
+            deadline = now + timeout
+            finished = False
+            taken = 0
+            while steps is None or taken < steps:
+                if self.steps_left is not steps_left:
+                    return  # cancelled
+                try:
+                    next(steps_left)
+                except StopIteration:
+                    finished = True
+                    break
+                taken += 1
+                if steps is None and time.perf_counter() >= deadline:
+                    break
+            with self.lock:
+                if self.steps_left is not steps_left:
+                    return
+                self.steps += taken
+                if not finished:
+                    return
+                self.running = False
+                self.steps_left = None
+                done = self.done
+        if done is not None:
+            done()
+
+    def set_speed(self, steps_per_second):
+        """
+        Changes how fast the run is played, taking effect from the next frame.
+
+        Args:
+            steps_per_second: How many farmer actions to play per second, or None for full speed.
+        """
+        with self.lock:
+            self.steps_per_second = steps_per_second
+
+    def pause(self):
+        """
+        Stops playing steps until resume() is called; the run stays at its current step.
+        """
+        with self.lock:
+            self.paused = True
+
+    def resume(self):
+        """
+        Continues a paused run from where it stopped.
+        """
+        with self.lock:
+            self.paused = False
+            self.last_pump = None  # the pause does not earn any steps
+
+    def skip(self):
+        """
+        Lets the current run finish at full speed, ignoring the chosen rate and any pause, and still calls its done function.
+        """
+        with self.lock:
+            self.skipping = True
+
+    def cancel(self, wait=True):
+        """
+        Stops the current run before its next step, without calling its done function.
+
+        Args:
+            wait: True to wait until a step being played by pump() on another thread has finished, so the run no longer changes the farm once this returns, otherwise return straight away (default is True).
+        """
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+            self.steps_left = None
+        if wait:
+            with self.stepping:
+                pass
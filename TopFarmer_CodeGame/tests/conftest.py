@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# the game's modules import each other by name from the game directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
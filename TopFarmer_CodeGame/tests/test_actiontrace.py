@@ -0,0 +1,112 @@
+# test_actiontrace.py
+import pytest
+from actiontrace import ActionTrace, merge_traces
+from farmgrid import FarmGrid
+
+PROGRAM = [
+    ("move", "right"),
+    ("plant", "pumpkin", "down"),
+    ("move", "up"),  # off the edge of the farm
+    ("harvest", "down"),
+    ("plant", "carrot", "down"),
+    ("move", "down"),
+    ("harvest", "left"),  # nothing to harvest
+]
+
+
+def traced_run(farm, program=PROGRAM):
+    trace = farm.farmer.enable_trace()
+    for action in program:
+        farm.farmer.perform(action)
+    farm.farmer.disable_trace()
+    return trace
+
+
+def test_records_every_attempted_action():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    trace = traced_run(farm)
+    assert len(trace) == len(PROGRAM)
+    assert [action for _, action, _ in trace] == PROGRAM
+    assert [accepted for _, _, accepted in trace] == [
+        True,
+        True,
+        False,
+        True,
+        True,
+        True,  # crops can be walked on
+        False,
+    ]
+
+
+def test_replay_reproduces_the_run():
+    original = FarmGrid(10, 10, "crops", seed=3)
+    start = original.snapshot()
+    trace = traced_run(original)
+    replayed = start.fork()
+    assert trace.replay(replayed.farmer) is None
+    assert replayed.tile_types == original.tile_types
+    assert replayed.crop_types == original.crop_types
+    assert replayed.farmer.get_pos() == original.farmer.get_pos()
+    assert replayed.farmer.inventory == original.farmer.inventory
+
+
+def test_replay_reports_the_first_different_outcome():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    trace = traced_run(farm)
+    other = FarmGrid(10, 10, "plain", seed=1)
+    other.set_tile(1, 1, 2)  # water where the pumpkin was planted
+    assert trace.replay(other.farmer) == 1
+
+
+def test_bytes_round_trip_and_diff():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    trace = traced_run(farm)
+    copy = ActionTrace.from_bytes(trace.to_bytes())
+    assert list(copy) == list(trace)
+    assert copy.diff(trace) is None
+    shorter = ActionTrace.from_bytes(trace.to_bytes()[: 3 * trace.RECORD.size])
+    assert trace.diff(shorter) == 3
+    with pytest.raises(ValueError):
+        ActionTrace.from_bytes(trace.to_bytes()[:-1])
+
+
+def test_buffer_grows_as_needed():
+    trace = ActionTrace(capacity=2)
+    for tick in range(100):
+        trace.record(tick, "move", "left", None, tick % 2 == 0)
+    assert len(trace) == 100
+    assert [tick for tick, _, _ in trace] == list(range(100))
+    trace.clear()
+    assert len(trace) == 0 and list(trace) == []
+
+
+def test_ticks_of_several_farmers():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    other = farm.spawn_farmer(5, 5)
+    trace = other.enable_trace()
+    farm.scheduler.submit(farm.farmer, [("move", "right")] * 2)
+    farm.scheduler.submit(other, [("move", "left")] * 2)
+    farm.scheduler.run()
+    ticks = [tick for tick, _, _ in trace]
+    assert ticks[1] == ticks[0] + 1
+
+
+def test_merged_traces_replay_several_farmers():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    farm.spawn_farmer(5, 5)
+    start = farm.snapshot()
+    traces = [farmer.enable_trace() for farmer in farm.farmers]
+    farm.farmer.move("right")
+    farm.scheduler.submit(farm.farmer, [("plant", "carrot", "down")] * 2)
+    farm.scheduler.submit(farm.farmers[1], [("move", "left"), ("harvest", "up")])
+    farm.scheduler.run()
+    farm.farmers[1].plant("pumpkin", "up")
+    replayed = start.fork()
+    ticks = []
+    for tick, index, action in merge_traces(traces):
+        ticks.append(tick)
+        replayed.farmers[index].perform(action)
+    assert ticks == sorted(ticks) and len(ticks) == 6
+    assert replayed.tile_types == farm.tile_types
+    assert replayed.crop_types == farm.crop_types
+    assert [f.get_pos() for f in replayed.farmers] == [(1, 0), (4, 5)]
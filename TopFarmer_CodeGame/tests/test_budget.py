@@ -0,0 +1,125 @@
+# test_budget.py
+import sys
+import pytest
+from budget import BudgetExceeded, ExecutionBudget, has_single_line_loop
+from farmgrid import FarmGrid
+from codecache import PLAYER_FILENAME
+
+# run() picks sys.monitoring where it can, so the settrace fallback is also
+# run directly to cover it on every version
+MODES = ["run", "traced"]
+
+
+def compiled(source):
+    return compile(source, PLAYER_FILENAME, "exec")
+
+
+def run_player(source, limit, mode, farm=None):
+    farm = farm or FarmGrid(10, 10, "plain", seed=1)
+    budget = ExecutionBudget(limit)
+    namespace = {"farm": farm, "farmer": farm.farmer}
+    if mode == "run":
+        budget.run(exec, compiled(source), namespace)
+    else:
+        budget.used = 0
+        budget.run_traced(exec, (compiled(source), namespace), {})
+    return budget
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize(
+    "source",
+    [
+        "while True: pass",
+        "while True:\n    x = 1\n",
+        "def f():\n    while True: pass\nf()\n",
+        "[x for x in iter(int, 1)]",
+        "def f(n):\n    return f(n + 1)\nf(0)\n",
+    ],
+)
+def test_endless_code_is_stopped(source, mode):
+    # well below the recursion limit, so recursion hits the budget first
+    with pytest.raises(BudgetExceeded):
+        run_player(source, 300, mode)
+    assert sys.gettrace() is None
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_code_under_the_budget_finishes(mode):
+    source = "total = 0\nfor i in range(10):\n    total += i\n"
+    budget = run_player(source, 1000, mode)
+    assert 0 < budget.used <= 30
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_game_code_is_not_counted(mode):
+    calls = "for i in range(20):\n    farmer.{}\n"
+    game = run_player(calls.format("move('right')"), 1000, mode)
+    builtin = run_player(calls.format("get_pos()"), 1000, mode)
+    assert game.used == builtin.used
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_player_cannot_catch_the_budget(mode):
+    source = "while True:\n    try:\n        x = 1\n    except Exception:\n        pass\n"
+    with pytest.raises(BudgetExceeded):
+        run_player(source, 500, mode)
+
+
+def test_settrace_is_restored():
+    def tracer(frame, event, arg):
+        return None
+
+    sys.settrace(tracer)
+    try:
+        with pytest.raises(BudgetExceeded):
+            run_player("while True: pass", 100, "traced")
+        assert sys.gettrace() is tracer
+    finally:
+        sys.settrace(None)
+
+
+def test_single_line_loops_are_detected():
+    code = compiled("while True: pass\n")
+    assert has_single_line_loop(code)
+    code = compiled("while True:\n    x = 1\n")
+    assert not has_single_line_loop(code)
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3, 12), reason="sys.monitoring is new in Python 3.12"
+)
+def test_monitoring_leaves_other_tools_alone():
+    monitoring = sys.monitoring
+    assert monitoring.get_tool(monitoring.PROFILER_ID) is None
+    other = next(
+        tool
+        for tool in range(6)
+        if tool != monitoring.PROFILER_ID and monitoring.get_tool(tool) is None
+    )
+    reports = []
+
+    def watched():
+        return 1
+
+    def on_line(code, line_number):
+        reports.append(line_number)
+        return monitoring.DISABLE
+
+    monitoring.use_tool_id(other, "test tool")
+    try:
+        monitoring.register_callback(other, monitoring.events.LINE, on_line)
+        monitoring.set_local_events(other, watched.__code__, monitoring.events.LINE)
+        watched()
+        assert len(reports) == 1
+        budget = run_player("for i in range(10):\n    x = i\n", 1000, "run")
+        assert 0 < budget.used <= 30
+        # the budget's tool is gone, and the line the other tool disabled
+        # stays disabled
+        assert monitoring.get_tool(monitoring.PROFILER_ID) is None
+        watched()
+        assert len(reports) == 1
+    finally:
+        monitoring.set_local_events(other, watched.__code__, 0)
+        monitoring.register_callback(other, monitoring.events.LINE, None)
+        monitoring.free_tool_id(other)
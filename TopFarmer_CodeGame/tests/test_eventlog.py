@@ -0,0 +1,84 @@
+# test_eventlog.py
+import io
+import json
+import pytest
+from eventlog import DEBUG, INFO, WARNING, EventLog, log
+from farmgrid import FarmGrid
+
+
+@pytest.fixture
+def debug_log():
+    level = log.level
+    log.level = DEBUG
+    log.events.clear()
+    yield log
+    log.level = level
+    log.events.clear()
+
+
+def test_events_below_the_level_are_dropped():
+    events = EventLog(level=INFO)
+    events.debug("ignored", value=1)
+    events.info("kept", value=2)
+    events.error("also_kept")
+    assert [name for _, _, name, _ in events] == ["kept", "also_kept"]
+    assert events.enabled(WARNING) and not events.enabled(DEBUG)
+
+
+def test_only_the_most_recent_events_are_kept():
+    events = EventLog(capacity=3)
+    for i in range(10):
+        events.info("tick", i=i)
+    assert len(events) == 3
+    assert [fields["i"] for _, _, _, fields in events] == [7, 8, 9]
+
+
+def test_events_are_written_as_json_lines():
+    sink = io.StringIO()
+    events = EventLog(sink=sink)
+    events.warning("odd", pos=(1, 2), what=object())
+    record = json.loads(sink.getvalue())
+    assert record["level"] == "WARNING" and record["event"] == "odd"
+    assert record["pos"] == [1, 2] and isinstance(record["what"], str)
+
+
+def test_open_file_appends(tmp_path):
+    path = tmp_path / "events.jsonl"
+    events = EventLog()
+    events.open_file(path)
+    events.info("first")
+    events.close_file()
+    events.open_file(path)
+    events.info("second")
+    events.close_file()
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["event"] for line in lines] == ["first", "second"]
+
+
+def test_configure_takes_level_names_and_a_file(tmp_path):
+    events = EventLog()
+    events.configure("debug", tmp_path / "events.jsonl")
+    assert events.level == DEBUG
+    events.debug("harvest", crop="carrot")
+    events.configure(WARNING)
+    events.info("ignored")
+    events.close_file()
+    lines = (tmp_path / "events.jsonl").read_text().splitlines()
+    assert [json.loads(line)["event"] for line in lines] == ["harvest"]
+    with pytest.raises(ValueError):
+        events.configure("loud")
+
+
+def test_harvesting_prints_nothing(capsys):
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    farm.farmer.plant("potato", "down")
+    farm.farmer.harvest("down")
+    assert capsys.readouterr().out == ""
+
+
+def test_harvests_are_logged_at_debug_level(debug_log):
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    farm.farmer.plant("potato", "down")
+    farm.farmer.harvest("down")
+    harvests = [fields for _, _, name, fields in debug_log if name == "harvest"]
+    assert len(harvests) == 1 and harvests[0]["crop"] == "potato"
@@ -0,0 +1,144 @@
+# test_executor.py
+import threading
+import time
+import pytest
+from actiontrace import merge_traces
+from executor import Executor, resource
+from farmgrid import FarmGrid
+from timeseries import TimeSeries
+
+SOLUTION = """
+for i in range(3):
+    farmer.move("right")
+    farmer.plant("potato", "down")
+"""
+
+
+@pytest.fixture(scope="module")
+def executor():
+    executor = Executor(
+        workers=1,
+        cpu_seconds=1,
+        wall_seconds=3,
+        memory_bytes=512 * 1024 * 1024,
+    )
+    yield executor
+    executor.close()
+
+
+def new_farm():
+    return FarmGrid(10, 10, "plain", seed=3)
+
+
+def test_run_returns_the_farm_and_trace(executor):
+    farm = new_farm()
+    before = farm.to_bytes()
+    result, (trace,), error = executor.run(SOLUTION, farm)
+    assert error is None
+    assert farm.to_bytes() == before
+    assert result.stats.get_potatoes_planted() == 3
+    assert len(trace) == 6
+    replayed = farm.fork()
+    trace.replay(replayed.farmer)
+    assert replayed.to_bytes() == result.to_bytes()
+
+
+def test_run_records_the_pacing(executor):
+    series = TimeSeries()
+    executor.run(SOLUTION, new_farm(), timeseries=series)
+    assert series.actions == 6
+    assert sum(series.run_lengths) == 1
+
+
+def test_budget_is_enforced_in_the_worker(executor):
+    farm = new_farm()
+    _, _, error = executor.run("while True: pass", farm, 1000)
+    assert "1000 steps" in error
+
+
+def test_errors_in_the_code_are_reported(executor):
+    _, _, error = executor.run("farmer.fly()", new_farm())
+    assert "fly" in error
+
+
+def test_sleeping_code_is_stopped(executor):
+    farm = new_farm()
+    result, (trace,), error = executor.run("time.sleep(30)", farm)
+    assert "3 seconds" in error
+    assert result.to_bytes() == farm.to_bytes() and len(trace) == 0
+    # the killed worker was replaced
+    assert executor.run(SOLUTION, farm)[2] is None
+
+
+def test_worker_exiting_is_reported(executor):
+    _, _, error = executor.run("import os\nos._exit(3)", new_farm())
+    assert "exit code 3" in error
+    assert executor.run(SOLUTION, new_farm())[2] is None
+
+
+@pytest.mark.skipif(resource is None, reason="needs the resource module")
+def test_cpu_time_is_limited(executor):
+    source = "sum(range(10 ** 12))"
+    _, _, error = executor.run(source, new_farm(), 10**6)
+    assert "CPU time" in error
+    assert executor.run(SOLUTION, new_farm())[2] is None
+
+
+@pytest.mark.skipif(resource is None, reason="needs the resource module")
+def test_memory_is_limited(executor):
+    _, _, error = executor.run("x = bytearray(2 ** 31)", new_farm())
+    assert error == "MemoryError"
+
+
+def test_closed_executor_refuses_to_run():
+    executor = Executor(workers=1)
+    executor.close()
+    with pytest.raises(ValueError):
+        executor.run(SOLUTION, new_farm())
+
+
+def test_every_farmer_is_run_and_recorded(executor):
+    farm = new_farm()
+    other = farm.spawn_farmer(5, 5)
+    other.inventory.append(0)
+    source = (
+        "helper = farm.farmers[1]\n"
+        "actions = [('move', 'left'), ('plant', 'pumpkin', 'down')]\n"
+        "farm.scheduler.submit(helper, actions)\n"
+        "farm.scheduler.run()\n"
+        "farmer.move('right')\n"
+    )
+    result, traces, error = executor.run(source, farm)
+    assert error is None
+    assert [farmer.get_pos() for farmer in result.farmers] == [(1, 0), (4, 5)]
+    assert result.farmer is result.farmers[0]
+    assert result.get_crop_type(4, 6) == 2
+    assert result.farmers[1].inventory.counts == [11, 10, 9]
+    assert [len(trace) for trace in traces] == [1, 2]
+    replayed = farm.fork()
+    for _, index, action in merge_traces(traces):
+        replayed.farmers[index].perform(action)
+    assert replayed.to_bytes() == result.to_bytes()
+    assert [farmer.get_pos() for farmer in replayed.farmers] == [(1, 0), (4, 5)]
+
+
+def test_close_stops_busy_workers_and_waiting_runs():
+    executor = Executor(workers=1, wall_seconds=30)
+    errors = []
+
+    def run():
+        try:
+            executor.run("time.sleep(30)", new_farm())
+        except ValueError as e:
+            errors.append(e)
+
+    runs = [threading.Thread(target=run) for _ in range(2)]
+    for thread in runs:
+        thread.start()
+    time.sleep(1)  # one run is busy, the other waits for the worker
+    started = time.perf_counter()
+    executor.close()
+    for thread in runs:
+        thread.join(5)
+    assert time.perf_counter() - started < 5
+    assert len(errors) == 2
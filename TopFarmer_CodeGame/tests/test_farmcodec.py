@@ -0,0 +1,64 @@
+# test_farmcodec.py
+import pytest
+from array import array
+from farmgrid import NO_CROP, FarmGrid
+
+
+def played_farm():
+    farm = FarmGrid(12, 9, "crops", seed=5)
+    farm.farmer.move("right")
+    farm.farmer.move("down")
+    farm.farmer.plant("potato", "down")
+    farm.farmer.plant("carrot", "right")
+    return farm
+
+
+def test_round_trip_keeps_tiles_farmer_and_stats():
+    farm = played_farm()
+    copy = FarmGrid.from_bytes(farm.to_bytes())
+    assert (copy.width, copy.height) == (farm.width, farm.height)
+    assert copy.tile_types == farm.tile_types
+    assert copy.crop_types == farm.crop_types
+    assert copy.farmer.get_pos() == farm.farmer.get_pos()
+    assert sorted(copy.farmer.inventory) == sorted(farm.farmer.inventory)
+    assert copy.stats.get_moves("right") == 1
+    assert copy.stats.get_total_planted() == farm.stats.get_total_planted()
+    assert copy.to_bytes() == farm.to_bytes()
+
+
+def test_decoded_farm_does_not_share_the_buffer():
+    farm = played_farm()
+    data = bytearray(farm.to_bytes())
+    copy = FarmGrid.from_bytes(data)
+    data[-1] ^= 1
+    assert copy.to_bytes() == farm.to_bytes()
+
+
+def test_rejects_data_that_is_not_a_farm():
+    data = bytearray(played_farm().to_bytes())
+    data[:4] = b"XXXX"
+    with pytest.raises(ValueError, match="Not an encoded farm"):
+        FarmGrid.from_bytes(bytes(data))
+
+
+def test_rejects_truncated_data():
+    with pytest.raises(ValueError, match="truncated"):
+        FarmGrid.from_bytes(played_farm().to_bytes()[:5])
+
+
+def test_rejects_data_of_the_wrong_size():
+    data = played_farm().to_bytes()
+    with pytest.raises(ValueError, match="wrong size"):
+        FarmGrid.from_bytes(data[:-1])
+    with pytest.raises(ValueError, match="wrong size"):
+        FarmGrid.from_bytes(data + b"\0")
+
+
+
+def test_farm_without_a_seed_round_trips():
+    farm = FarmGrid(6, 5, "plain", generate=False)
+    farm.use_storage(array("b", bytes(30)), array("b", [NO_CROP]) * 30)
+    assert farm.seed is None
+    copy = FarmGrid.from_bytes(farm.to_bytes())
+    assert copy.seed is None
+    assert copy.tile_types == farm.tile_types
@@ -0,0 +1,82 @@
+# test_farmer.py
+import pytest
+from farmgrid import FarmGrid
+
+PROGRAM = [
+    ("move", "right"),
+    ("plant", "potato", "down"),
+    ("plant", "carrot", "right"),
+    ("harvest", "down"),
+    ("move", "down"),
+    ("move", "left"),
+    ("move", "left"),  # off the edge of the farm
+    ("harvest", "up"),
+    ("plant", "pumpkin", "right"),
+] * 3
+
+
+def perform(farmer, action):
+    name, *args = action
+    return getattr(farmer, name)(*args)
+
+
+def counters(stats):
+    return {
+        name: value
+        for name, value in vars(stats).items()
+        if isinstance(value, int)
+    }
+
+
+def state(farm):
+    return (
+        list(farm.tile_types),
+        list(farm.crop_types),
+        farm.farmer.get_pos(),
+        sorted(farm.farmer.inventory),
+        counters(farm.stats),
+        farm.version,
+    )
+
+
+def test_run_matches_single_calls():
+    one_by_one = FarmGrid(10, 10, "crops", seed=4)
+    batched = FarmGrid(10, 10, "crops", seed=4)
+    expected = [perform(one_by_one.farmer, action) for action in PROGRAM]
+    first_rejected = batched.farmer.run(PROGRAM)
+    assert first_rejected == expected.index(False)
+    assert state(batched) == state(one_by_one)
+
+
+def test_run_marks_the_same_cells_and_ticks():
+    one_by_one = FarmGrid(10, 10, "crops", seed=4)
+    batched = FarmGrid(10, 10, "crops", seed=4)
+    one_by_one.drain_dirty()
+    batched.drain_dirty()
+    for action in PROGRAM:
+        perform(one_by_one.farmer, action)
+    batched.farmer.run(PROGRAM)
+    assert batched.drain_dirty() == one_by_one.drain_dirty()
+    assert batched.scheduler.clock == one_by_one.scheduler.clock
+    assert batched.stats.count_total_crops() == one_by_one.stats.count_total_crops()
+
+
+def test_run_returns_none_when_every_action_succeeds():
+    farm = FarmGrid(10, 10, "plain", seed=4)
+    program = [("move", "down"), ("plant", "potato", "down")] * 3
+    assert farm.farmer.run(program) is None
+    assert farm.stats.get_potatoes_planted() == 3
+
+
+def test_run_rejects_a_malformed_program_before_acting():
+    farm = FarmGrid(10, 10, "plain", seed=4)
+    before = state(farm)
+    for program in [
+        [("move", "right"), ("jump", "up")],
+        [("move", "right"), ("move", "sideways")],
+        [("move", "right"), ("plant", "turnip", "down")],
+        [("move", "right"), "move"],
+    ]:
+        with pytest.raises(ValueError, match="(?i)action 1"):
+            farm.farmer.run(program)
+    assert state(farm) == before
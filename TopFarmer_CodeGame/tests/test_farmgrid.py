@@ -0,0 +1,197 @@
+# test_farmgrid.py
+import pytest
+from farmgrid import NO_CROP, FarmGrid
+from farmtile import CropTile, FarmTile, shared_tile
+
+
+def test_tiles_are_packed_column_by_column():
+    farm = FarmGrid(4, 3, "plain")
+    assert len(farm.tile_types) == len(farm.crop_types) == 12
+    farm.set_tile(2, 1, 3, 1)
+    assert farm.tile_types[2 * 3 + 1] == 3
+    assert farm.crop_types[2 * 3 + 1] == 1
+    assert farm.get_tile_type(2, 1) == 3
+    assert farm.get_crop_type(2, 1) == 1
+
+
+def test_non_crop_tiles_clear_the_crop():
+    farm = FarmGrid(4, 3, "plain")
+    farm.set_tile(0, 0, 3, 2)
+    farm.set_tile(0, 0, 1, 2)
+    assert farm.crop_types[0] == NO_CROP
+    assert farm.get_crop_type(0, 0) is None
+
+
+def test_fill_resets_every_tile():
+    farm = FarmGrid(4, 3, "crops")
+    farm.fill(1)
+    assert list(farm.tile_types) == [1] * 12
+    assert list(farm.crop_types) == [NO_CROP] * 12
+
+
+def test_grid_reads_the_packed_arrays():
+    farm = FarmGrid(5, 4, "crops")
+    for x in range(farm.width):
+        for y in range(farm.height):
+            tile = farm.grid[x][y]
+            assert tile.tile_type == farm.get_tile_type(x, y)
+            assert tile.get_crop_type() == farm.get_crop_type(x, y)
+
+
+def test_grid_supports_negative_indices_and_bounds():
+    farm = FarmGrid(5, 4, "plain")
+    farm.set_tile(4, 3, 2)
+    assert farm.grid[-1][-1].tile_type == 2
+    assert len(farm.grid) == 5 and len(farm.grid[0]) == 4
+    with pytest.raises(IndexError):
+        farm.grid[5]
+    with pytest.raises(IndexError):
+        farm.grid[0][4]
+
+
+def test_grid_writes_pack_tiles():
+    farm = FarmGrid(5, 4, "plain")
+    farm.grid[1][2] = CropTile(1, 2, 2)
+    farm.grid[3][0] = FarmTile(3, 0, 2)
+    assert farm.get_tile_type(1, 2) == 3 and farm.get_crop_type(1, 2) == 2
+    assert farm.get_tile_type(3, 0) == 2 and farm.get_crop_type(3, 0) is None
+
+
+def test_grid_reads_return_interned_tiles():
+    farm = FarmGrid(5, 4, "plain")
+    farm.set_tile(1, 1, 3, 2)
+    farm.set_tile(2, 2, 3, 2)
+    assert farm.grid[0][0] is farm.grid[4][3] is shared_tile(0)
+    assert farm.grid[1][1] is farm.grid[2][2] is shared_tile(3, 2)
+    assert farm.grid[1] is farm.grid[1]
+    with pytest.raises(AttributeError):
+        farm.grid[0][0].tile_type = 1
+
+
+def test_cells_know_their_position():
+    farm = FarmGrid(5, 4, "crops", seed=3)
+    for x in range(5):
+        for y in range(4):
+            cell = farm.grid.cell(x, y)
+            assert cell.get_pos() == (x, y)
+            assert cell.tile is farm.grid[x][y]
+    assert farm.grid.cell(-1, -1).get_pos() == (4, 3)
+    with pytest.raises(IndexError):
+        farm.grid.cell(0, 4)
+
+
+def test_crop_tiles_need_a_crop():
+    farm = FarmGrid(5, 4, "plain")
+    with pytest.raises(ValueError):
+        shared_tile(3)
+    with pytest.raises(ValueError):
+        farm.set_tile(1, 1, 3)
+    with pytest.raises(ValueError):
+        farm.grid[1][1] = FarmTile(1, 1, 3)
+    assert farm.get_tile_type(1, 1) == 0
+
+
+def test_tiles_have_no_instance_dict():
+    assert not hasattr(FarmTile(0, 0), "__dict__")
+    assert not hasattr(CropTile(0, 0, 1), "__dict__")
+
+
+def test_new_farm_is_entirely_dirty():
+    farm = FarmGrid(4, 3, "plain")
+    assert len(farm.drain_dirty()) == 12
+    assert farm.drain_dirty() == set()
+
+
+def test_writes_and_moves_mark_cells_dirty():
+    farm = FarmGrid(4, 3, "plain")
+    farm.drain_dirty()
+    version = farm.version
+    farm.set_tile(2, 2, 1)
+    farm.farmer.move("right")
+    assert farm.version > version
+    assert farm.drain_dirty() == {(2, 2), (0, 0), (1, 0)}
+    assert farm.drain_dirty() == set()
+
+
+def test_refused_moves_leave_the_farm_clean():
+    farm = FarmGrid(4, 3, "plain")
+    farm.drain_dirty()
+    version = farm.version
+    farm.farmer.move("up")  # off the edge of the farm
+    assert farm.version == version
+    assert farm.drain_dirty() == set()
+
+
+def test_regenerating_marks_the_whole_farm_dirty():
+    farm = FarmGrid(4, 3, "plain")
+    farm.drain_dirty()
+    farm.fill(1)
+    assert len(farm.drain_dirty()) == 12
+
+
+def test_same_seed_gives_the_same_layout():
+    first = FarmGrid(10, 10, "tree_river", seed=42)
+    second = FarmGrid(10, 10, "tree_river", seed=42)
+    assert first.tile_types == second.tile_types
+    assert first.crop_types == second.crop_types
+
+
+def test_restart_with_the_seed_gives_the_layout_back():
+    farm = FarmGrid(10, 10, "crops", seed=7)
+    tiles, crops = list(farm.tile_types), list(farm.crop_types)
+    farm.farmer.move("down")
+    farm.farmer.harvest("down")
+    farm.restart(farm.seed)
+    assert list(farm.tile_types) == tiles
+    assert list(farm.crop_types) == crops
+    assert farm.farmer.get_pos() == (0, 0)
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        "plain",
+        "river",
+        "river_horizontal",
+        "tree_river",
+        "grass",
+        "crops",
+        "tree_dirt",
+        "crop_row",
+    ],
+)
+def test_vectorized_generators_match_the_scalar_ones(config):
+    for seed in range(5):
+        scalar = FarmGrid(12, 9, config, seed=seed)
+        vectorized = FarmGrid(12, 9, config, seed=seed, vectorized=True)
+        assert scalar.tile_types == vectorized.tile_types
+        assert scalar.crop_types == vectorized.crop_types
+
+
+def test_tree_dirt_places_three_trees_inside_the_edge():
+    for seed in range(10):
+        farm = FarmGrid(10, 10, "tree_dirt", seed=seed)
+        trees = [i for i, tile in enumerate(farm.tile_types) if tile == 4]
+        assert len(trees) == 3
+        for index in trees:
+            x, y = divmod(index, farm.height)
+            assert 0 < x < 9 and 0 < y < 9
+
+
+def test_tree_count_and_density_override_the_config():
+    farm = FarmGrid(10, 10, "tree_dirt", seed=1, tree_count=20)
+    assert farm.tile_types.count(4) == 20
+    farm = FarmGrid(10, 10, "tree_dirt", seed=1, tree_density=0.5)
+    assert farm.tile_types.count(4) == 32  # half of the 8x8 interior
+    farm = FarmGrid(10, 10, "tree_dirt", seed=1, tree_count=1000)
+    assert farm.tile_types.count(4) == 64  # every eligible tile
+
+
+def test_eligible_positions_only_lists_matching_tiles():
+    farm = FarmGrid(6, 5, "plain", seed=1)
+    farm.set_tile(2, 1, 1)
+    farm.set_tile(3, 3, 1)
+    farm.set_tile(4, 4, 1)
+    assert farm.eligible_positions(1) == [2 * 5 + 1, 3 * 5 + 3, 4 * 5 + 4]
+    assert farm.eligible_positions(1, range(3, 5), range(0, 4)) == [3 * 5 + 3]
+    assert farm.eligible_positions(1, rows=range(0)) == []
@@ -0,0 +1,52 @@
+# test_fork.py
+import pytest
+from farmgrid import FarmGrid
+
+
+def test_fork_shares_tiles_until_written():
+    farm = FarmGrid(10, 10, "crops")
+    original = farm.get_tile_type(5, 5)
+    fork = farm.fork()
+    assert fork.tile_types is farm.tile_types
+    fork.set_tile(5, 5, 4)
+    assert fork.tile_types is not farm.tile_types
+    assert fork.get_tile_type(5, 5) == 4
+    assert farm.get_tile_type(5, 5) == original
+
+
+def test_writes_to_the_original_do_not_reach_the_fork():
+    farm = FarmGrid(10, 10, "plain")
+    fork = farm.fork()
+    tiles, crops = list(fork.tile_types), list(fork.crop_types)
+    farm.set_tile(3, 3, 4)
+    farm.farmer.move("right")
+    farm.farmer.plant("potato", "down")
+    assert list(fork.tile_types) == tiles
+    assert list(fork.crop_types) == crops
+    assert fork.farmer.get_pos() == (0, 0)
+    assert fork.farmer.inventory.count(0) == 10
+
+
+def test_fork_has_its_own_farmer_inventory_and_stats():
+    farm = FarmGrid(10, 10, "plain")
+    fork = farm.fork()
+    fork.farmer.move("right")
+    fork.farmer.plant("carrot", "down")
+    assert fork.farmer is not farm.farmer
+    assert farm.farmer.get_pos() == (0, 0)
+    assert farm.farmer.inventory.count(1) == 10
+    assert farm.stats.get_moves("right") == 0
+    assert farm.stats.get_carrots_planted() == 0
+    assert fork.stats.get_carrots_planted() == 1
+    assert fork.stats.count_crops(1) == 1 and farm.stats.count_crops(1) == 0
+
+
+def test_snapshot_is_read_only_but_can_be_forked():
+    farm = FarmGrid(10, 10, "plain")
+    snapshot = farm.snapshot()
+    with pytest.raises(ValueError):
+        snapshot.set_tile(1, 1, 2)
+    fork = snapshot.fork()
+    fork.set_tile(1, 1, 2)
+    assert fork.get_tile_type(1, 1) == 2
+    assert snapshot.get_tile_type(1, 1) == farm.get_tile_type(1, 1)
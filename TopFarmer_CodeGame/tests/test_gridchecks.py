@@ -0,0 +1,177 @@
+# test_gridchecks.py
+import random
+import pytest
+from farmgrid import FarmGrid
+
+
+def scanned_diagonal(farm, x, y, dx, dy):
+    while 0 <= x < farm.width and 0 <= y < farm.height:
+        if farm.get_tile_type(x, y) == 0:
+            return False
+        x, y = x + dx, y + dy
+    return True
+
+
+def scanned_next_to_water(farm):
+    for x in range(farm.width):
+        for y in range(farm.height):
+            if farm.get_tile_type(x, y) != 3:
+                continue
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if not farm.out_of_bounds((nx, ny)):
+                    if farm.get_tile_type(nx, ny) == 2:
+                        return True
+    return False
+
+
+@pytest.mark.parametrize("size", [(10, 10), (13, 7), (5, 16)])
+def test_diagonals_match_a_scan(size):
+    rng = random.Random(sum(size))
+    farm = FarmGrid(*size, "grass", seed=3)
+    for _ in range(4):
+        for _ in range(20):
+            x, y = rng.randrange(farm.width), rng.randrange(farm.height)
+            farm.set_tile(x, y, rng.choice([1, 1, 3]), 0)
+        for x in range(farm.width):
+            for y in range(farm.height):
+                for dx, dy in ((1, 1), (1, -1), (-1, 1), (-1, -1), (1, 0)):
+                    assert farm.stats.check_diagonal(x, y, dx, dy) == (
+                        scanned_diagonal(farm, x, y, dx, dy)
+                    )
+
+
+def test_a_planted_diagonal_passes():
+    farm = FarmGrid(12, 8, "plain", seed=1)
+    assert not farm.stats.check_diagonal(0, 0, 1, 1)
+    for i in range(8):
+        farm.set_tile(i, i, 3, 0)
+    assert farm.stats.check_diagonal(0, 0, 1, 1)
+    assert not farm.stats.check_diagonal(11, 0, -1, 1)
+    assert farm.stats.check_diagonal(12, 0, 1, 1)  # off the farm
+
+
+@pytest.mark.parametrize("config", ["river", "river_horizontal", "tree_river"])
+def test_crops_next_to_water_match_a_scan(config):
+    rng = random.Random(5)
+    for seed in range(5):
+        farm = FarmGrid(10, 10, config, seed=seed)
+        for _ in range(6):
+            x, y = rng.randrange(10), rng.randrange(10)
+            if farm.get_tile_type(x, y) != 2:
+                farm.set_tile(x, y, 3, 1)
+            assert farm.stats.check_crops_adjacent_to_river() == (
+                scanned_next_to_water(farm)
+            )
+
+
+def test_alternating_pattern_in_a_row():
+    farm = FarmGrid(12, 6, "plain", seed=1)
+    for x, crop in zip(range(3, 9), [1, 2, 1, 2, 1, 2]):
+        farm.set_tile(x, 2, 3, crop)
+    stats = farm.stats
+    assert stats.check_alternating_pattern(6)
+    assert not stats.check_alternating_pattern(7)
+    farm.set_tile(5, 2, 3, 0)  # a potato breaks the pattern
+    assert not stats.check_alternating_pattern(4)
+    assert stats.check_alternating_pattern(2)
+    assert not stats.check_alternating_pattern(3)
+
+
+def scanned_alternating(farm, count):
+    # the level check as it has always been written
+    for y in range(farm.height):
+        consecutive = 0
+        for x in range(farm.width):
+            if farm.get_tile_type(x, y) == 3:
+                crop = farm.get_crop_type(x, y)
+                if (consecutive % 2 == 0 and crop == 1) or (
+                    consecutive % 2 == 1 and crop == 2
+                ):
+                    consecutive += 1
+                else:
+                    consecutive = 0
+            if consecutive == count:
+                return True
+    return False
+
+
+def test_alternating_pattern_counts_like_the_level_check():
+    farm = FarmGrid(12, 6, "plain", seed=1)
+    stats = farm.stats
+    for x, crop in zip(range(3), [1, 1, 2]):  # carrot, carrot, pumpkin
+        farm.set_tile(x, 0, 3, crop)
+    # the second carrot resets the count instead of starting a new pattern
+    assert stats.check_alternating_pattern(1)
+    assert not stats.check_alternating_pattern(2)
+    farm.set_tile(4, 1, 3, 1)
+    farm.set_tile(5, 1, 1)  # tiles without crops do not break the pattern
+    farm.set_tile(7, 1, 3, 2)
+    assert stats.check_alternating_pattern(2)
+    assert stats.check_alternating_pattern(0)
+    assert not stats.check_alternating_pattern(-1)
+
+
+@pytest.mark.parametrize("size", [(10, 10), (13, 7), (5, 16)])
+def test_alternating_pattern_matches_the_level_check(size):
+    rng = random.Random(sum(size))
+    farm = FarmGrid(*size, "plain", seed=1)
+    for _ in range(30):
+        for _ in range(15):
+            x, y = rng.randrange(farm.width), rng.randrange(farm.height)
+            tile = rng.choice([0, 1, 3, 3, 3, 3])
+            farm.set_tile(x, y, tile, rng.choice([0, 1, 2, 2]) if tile == 3 else None)
+        for count in range(-1, 6):
+            assert farm.stats.check_alternating_pattern(count) == (
+                scanned_alternating(farm, count)
+            )
+
+
+def test_changes_keep_the_water_check_up_to_date(monkeypatch):
+    import gridchecks
+
+    rng = random.Random(3)
+    farm = FarmGrid(12, 9, "tree_river", seed=2)
+    assert farm.stats.check_crops_adjacent_to_river() == scanned_next_to_water(farm)
+    fork = farm.fork()
+    counts = []
+    count = gridchecks.GridChecks.count_water_pairs
+    monkeypatch.setattr(
+        gridchecks.GridChecks,
+        "count_water_pairs",
+        lambda self: counts.append(self) or count(self),
+    )
+    for _ in range(200):
+        x, y = rng.randrange(farm.width), rng.randrange(farm.height)
+        tile = rng.choice([0, 1, 2, 3])
+        farm.set_tile(x, y, tile, 1 if tile == 3 else None)
+        assert farm.stats.check_crops_adjacent_to_river() == (
+            scanned_next_to_water(farm)
+        )
+    assert fork.stats.check_crops_adjacent_to_river() == scanned_next_to_water(fork)
+    assert counts == []
+
+
+def test_moves_do_not_rebuild_anything(monkeypatch):
+    import gridchecks
+    import runindex
+
+    farm = FarmGrid(20, 20, "river", seed=1)
+    stats = farm.stats
+    checks = (
+        lambda: stats.check_crops_adjacent_to_river(),
+        lambda: stats.check_alternating_pattern(3),
+        lambda: stats.check_crops_in_row(3, 1),
+        lambda: stats.longest_dirt_row(),
+    )
+    for check in checks:
+        check()
+    rebuilt = []
+    monkeypatch.setattr(
+        gridchecks.GridChecks, "count_water_pairs", lambda self: rebuilt.append(1)
+    )
+    monkeypatch.setattr(runindex, "tile_keys", lambda *arrays: rebuilt.append(1))
+    for direction in ["down", "right"] * 5:
+        farm.farmer.move(direction)
+        for check in checks:
+            check()
+    assert rebuilt == []
@@ -0,0 +1,50 @@
+# test_inventory.py
+import pytest
+from farmgrid import FarmGrid
+from inventory import Inventory
+
+
+def test_behaves_like_the_crop_list():
+    inventory = Inventory((2, 0, 1))
+    assert len(inventory) == 3
+    assert list(inventory) == [0, 0, 2]
+    assert 0 in inventory and 1 not in inventory
+    assert inventory.count(0) == 2 and inventory.count("potato") == 0
+    inventory.append(1)
+    inventory.remove(0)
+    assert inventory.counts == [1, 1, 1]
+    assert inventory == Inventory((1, 1, 1))
+
+
+def test_rejects_what_is_not_a_crop():
+    inventory = Inventory()
+    with pytest.raises(ValueError):
+        inventory.remove(0)
+    with pytest.raises(ValueError):
+        inventory.append(3)
+    with pytest.raises(ValueError):
+        Inventory((1, -1, 0))
+    with pytest.raises(ValueError):
+        Inventory((1, 1))
+
+
+def test_copies_are_independent():
+    inventory = Inventory((1, 2, 3))
+    copy = inventory.copy()
+    copy.append(0)
+    assert inventory.counts == [1, 2, 3]
+
+
+def test_planting_and_harvesting_use_the_counters():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    farmer = farm.farmer
+    for _ in range(10):
+        assert farmer.plant("carrot", "down")
+        farmer.harvest("down")
+    assert farmer.inventory.count(1) == 10
+    for _ in range(10):
+        farmer.plant("pumpkin", "down")
+        farmer.move("right")
+    assert farmer.inventory.count(2) == 0
+    assert not farmer.plant("pumpkin", "down")
+    assert farmer.get_inventory() == {"potato": 10, "carrot": 10}
@@ -0,0 +1,69 @@
+# test_layoutcache.py
+import pytest
+from farmgrid import FarmGrid
+from layoutcache import LayoutCache
+from level import Levels
+
+
+def test_farms_store_and_reuse_their_layouts():
+    cache = LayoutCache()
+    first = FarmGrid(8, 6, "crops", seed=11, layout_cache=cache)
+    assert ("crops", 8, 6, 11) in cache
+    cache.put(("crops", 8, 6, 11), b"\x01" * 48, b"\xff" * 48)
+    second = FarmGrid(8, 6, "crops", seed=11, layout_cache=cache)
+    assert list(second.tile_types) == [1] * 48  # taken from the cache
+    assert first.tile_types != second.tile_types
+
+
+def test_save_and_load_round_trip(tmp_path):
+    cache = LayoutCache()
+    for config, seed in [("river", 1), ("crops", 2), ("tree_dirt", 3)]:
+        FarmGrid(9, 7, config, seed=seed, layout_cache=cache)
+    path = tmp_path / "layouts.bin"
+    cache.save(path)
+    loaded = LayoutCache.load(path)
+    assert len(loaded) == 3
+    assert loaded.layouts == cache.layouts
+    farm = FarmGrid(9, 7, "crops", seed=2, layout_cache=loaded)
+    fresh = FarmGrid(9, 7, "crops", seed=2)
+    assert farm.tile_types == fresh.tile_types
+    assert farm.crop_types == fresh.crop_types
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"NOPE" + bytes(16))
+    with pytest.raises(ValueError):
+        LayoutCache.load(path)
+
+
+def test_full_cache_drops_the_oldest_layout():
+    cache = LayoutCache(capacity=2)
+    for seed in range(3):
+        cache.put(("plain", 1, 1, seed), b"\x00", b"\xff")
+    cache.put(("plain", 1, 1, 1), b"\x01", b"\xff")  # refreshed, now newest
+    cache.put(("plain", 1, 1, 3), b"\x00", b"\xff")
+    assert list(cache.layouts) == [("plain", 1, 1, 1), ("plain", 1, 1, 3)]
+
+
+def test_levels_keep_the_layouts_across_sessions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    levels = Levels()
+    assert len(levels.layout_cache) == 0
+    farm = FarmGrid(config="crops", seed=5, layout_cache=levels.layout_cache)
+    levels.save_layout_cache()
+
+    def generate_crops(self):
+        raise AssertionError("the layout should come from the cache")
+
+    monkeypatch.setattr(FarmGrid, "generate_crops", generate_crops)
+    levels = Levels()
+    again = FarmGrid(config="crops", seed=5, layout_cache=levels.layout_cache)
+    assert again.tile_types == farm.tile_types
+    assert again.crop_types == farm.crop_types
+
+
+def test_unreadable_cache_file_starts_empty(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / Levels.LAYOUT_CACHE_FILE).write_bytes(b"TFLC\x01")
+    assert len(Levels().layout_cache) == 0
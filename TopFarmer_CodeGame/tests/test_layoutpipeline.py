@@ -0,0 +1,47 @@
+# test_layoutpipeline.py
+import queue
+import pytest
+from layoutcache import LayoutCache
+from layoutpipeline import LayoutPipeline
+
+
+def test_farms_are_generated_ahead_of_time():
+    pipeline = LayoutPipeline(10, 10, "river", depth=2)
+    try:
+        farms = [pipeline.next(timeout=5) for _ in range(4)]
+        assert all(farm.config == "river" for farm in farms)
+        assert all((farm.width, farm.height) == (10, 10) for farm in farms)
+        assert len({farm.seed for farm in farms}) > 1
+    finally:
+        pipeline.close()
+
+
+def test_options_are_passed_to_the_farms():
+    cache = LayoutCache()
+    pipeline = LayoutPipeline(8, 6, "crops", depth=1, layout_cache=cache)
+    try:
+        farm = pipeline.next(timeout=5)
+        assert farm.layout_cache is cache
+        assert farm.layout_key() in cache
+    finally:
+        pipeline.close()
+
+
+def test_generation_errors_are_raised_by_next():
+    pipeline = LayoutPipeline(8, 6, "no such config")
+    try:
+        with pytest.raises(ValueError):
+            pipeline.next(timeout=5)
+        with pytest.raises(queue.Empty):
+            pipeline.next(timeout=0.1)
+    finally:
+        pipeline.close()
+
+
+def test_closed_pipeline_refuses_to_give_farms():
+    pipeline = LayoutPipeline(8, 6, "plain", depth=1)
+    pipeline.close()
+    assert not pipeline.worker.is_alive()
+    assert pipeline.ready() == 0
+    with pytest.raises(ValueError):
+        pipeline.next()
@@ -0,0 +1,67 @@
+# test_mapped.py
+import pytest
+from farmgrid import FarmGrid
+
+
+def test_new_mapped_farm_matches_a_generated_one(tmp_path):
+    farm = FarmGrid.open_mapped(tmp_path / "farm.bin", 12, 9, "crops", 5)
+    try:
+        fresh = FarmGrid(12, 9, "crops", seed=5)
+        assert farm.tile_types.tobytes() == fresh.tile_types.tobytes()
+        assert farm.crop_types.tobytes() == fresh.crop_types.tobytes()
+    finally:
+        farm.close()
+
+
+def test_changes_are_kept_in_the_file(tmp_path):
+    path = tmp_path / "farm.bin"
+    farm = FarmGrid.open_mapped(path, 10, 10, "plain", 1)
+    farm.farmer.move("right")
+    farm.farmer.plant("pumpkin", "down")
+    farm.close()
+
+    reopened = FarmGrid.open_mapped(path)
+    try:
+        assert reopened.get_tile_type(1, 1) == 3
+        assert reopened.get_crop_type(1, 1) == 2
+        assert reopened.farmer.get_pos() == (1, 0)
+        assert reopened.stats.get_pumpkins_planted() == 1
+        assert reopened.to_bytes() == path.read_bytes()
+    finally:
+        reopened.close()
+
+
+def test_forks_of_a_mapped_farm_do_not_write_to_the_file(tmp_path):
+    path = tmp_path / "farm.bin"
+    farm = FarmGrid.open_mapped(path, 10, 10, "plain", 1)
+    try:
+        before = path.read_bytes()
+        fork = farm.fork()
+        fork.set_tile(4, 4, 2)
+        farm.flush()
+        assert path.read_bytes() == before
+        assert farm.get_tile_type(4, 4) == 0
+    finally:
+        farm.close()
+
+
+def test_open_mapped_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a farm at all")
+    with pytest.raises(ValueError):
+        FarmGrid.open_mapped(path)
+
+
+@pytest.mark.parametrize("config", ["river", "grass", "crops", "crop_row"])
+def test_vectorized_generators_write_into_the_mapping(tmp_path, config):
+    path = tmp_path / "farm.bin"
+    farm = FarmGrid.open_mapped(path, 12, 9, config, 3, vectorized=True)
+    try:
+        fresh = FarmGrid(12, 9, config, seed=3)
+        assert farm.tile_types.tobytes() == fresh.tile_types.tobytes()
+        assert farm.crop_types.tobytes() == fresh.crop_types.tobytes()
+        farm.fill(2)
+        farm.flush()
+        assert FarmGrid.from_bytes(path.read_bytes()).tile_types.count(2) == 108
+    finally:
+        farm.close()
@@ -0,0 +1,65 @@
+# test_pathfinder.py
+from farmgrid import FarmGrid
+
+
+def walled_farm():
+    # a wall of water down column 3, with a gap at the bottom
+    farm = FarmGrid(7, 5, "plain", seed=1)
+    for y in range(4):
+        farm.set_tile(3, y, 2)
+    return farm
+
+
+def walk(start, route):
+    moves = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0)}
+    x, y = start
+    for direction in route:
+        dx, dy = moves[direction]
+        x, y = x + dx, y + dy
+    return x, y
+
+
+def test_distance_goes_around_obstacles():
+    farm = walled_farm()
+    assert farm.distance((0, 0), (0, 0)) == 0
+    assert farm.distance((0, 0), (2, 0)) == 2
+    assert farm.distance((0, 0), (6, 0)) == 6 + 2 * 4
+    assert farm.distance((6, 0), (0, 0)) == 6 + 2 * 4
+
+
+def test_route_is_a_shortest_walkable_path():
+    farm = walled_farm()
+    route = farm.paths.route((0, 0), (6, 0))
+    assert len(route) == farm.distance((0, 0), (6, 0))
+    assert walk((0, 0), route) == (6, 0)
+    assert farm.paths.route((0, 0), (0, 0)) == []
+
+
+def test_unreachable_targets():
+    farm = walled_farm()
+    farm.set_tile(3, 4, 4)  # close the gap with a tree
+    assert farm.distance((0, 0), (6, 0)) is None
+    assert farm.paths.route((0, 0), (6, 0)) is None
+    assert farm.distance((0, 0), (3, 0)) is None  # water itself
+    assert farm.distance((0, 0), (7, 0)) is None  # off the farm
+    assert not farm.farmer.goto(6, 0)
+    assert farm.farmer.get_pos() == (0, 0)
+
+
+def test_fields_are_dropped_only_when_walkability_changes():
+    farm = walled_farm()
+    assert farm.distance((0, 0), (6, 0)) == 14
+    assert farm.paths.fields
+    farm.set_tile(5, 2, 3, 0)  # planting keeps the tile walkable
+    farm.set_tile(5, 3, 1)
+    assert farm.paths.fields
+    farm.set_tile(3, 0, 0)  # open the wall at the top
+    assert not farm.paths.fields
+    assert farm.distance((0, 0), (6, 0)) == 6
+
+
+def test_goto_walks_the_route():
+    farm = walled_farm()
+    assert farm.farmer.goto(6, 0)
+    assert farm.farmer.get_pos() == (6, 0)
+    assert farm.stats.get_total_moves() == 14
@@ -0,0 +1,116 @@
+# test_runindex.py
+import random
+import pytest
+from farmgrid import FarmGrid
+from runindex import crop_key
+
+
+def longest(cells, match):
+    best = run = 0
+    for cell in cells:
+        run = run + 1 if match(cell) else 0
+        best = max(best, run)
+    return best
+
+
+def scanned(farm, key):
+    def match(pos):
+        tile = farm.get_tile_type(*pos)
+        crop = farm.get_crop_type(*pos)
+        if tile == 3 and crop is not None:
+            return crop_key(crop) == key
+        return tile == key
+
+    rows = max(
+        longest([(x, y) for x in range(farm.width)], match)
+        for y in range(farm.height)
+    )
+    columns = max(
+        longest([(x, y) for y in range(farm.height)], match)
+        for x in range(farm.width)
+    )
+    return rows, columns
+
+
+def scramble(farm, rng, writes):
+    for _ in range(writes):
+        x, y = rng.randrange(farm.width), rng.randrange(farm.height)
+        tile = rng.choice([0, 0, 1, 3, 3, 3])
+        farm.set_tile(x, y, tile, rng.randrange(3) if tile == 3 else None)
+
+
+@pytest.mark.parametrize("size", [(10, 10), (13, 7), (5, 16)])
+def test_runs_match_a_scan_as_the_farm_changes(size):
+    rng = random.Random(sum(size))
+    farm = FarmGrid(*size, "crops", seed=2)
+    runs = farm.stats.runs
+    for _ in range(5):
+        scramble(farm, rng, 25)
+        for key in [0, 1, crop_key(0), crop_key(1), crop_key(2)]:
+            expected = scanned(farm, key)
+            assert (runs.longest_in_rows(key), runs.longest_in_columns(key)) == (
+                expected
+            )
+
+
+def test_check_crops_in_row_uses_rows_and_columns():
+    farm = FarmGrid(12, 6, "plain", seed=1)
+    for x in range(2, 7):
+        farm.set_tile(x, 4, 3, 1)  # five carrots in a row
+    for y in range(0, 6):
+        farm.set_tile(10, y, 3, 2)  # six pumpkins in a column
+    stats = farm.stats
+    assert stats.check_crops_in_row(5, 1) and not stats.check_crops_in_row(6, 1)
+    assert stats.check_crops_in_row(6, 2) and not stats.check_crops_in_row(7, 2)
+    assert not stats.check_crops_in_row(1, 0)
+    farm.set_tile(4, 4, 0)
+    assert not stats.check_crops_in_row(5, 1)
+
+
+def test_longest_dirt_row():
+    farm = FarmGrid(12, 6, "plain", seed=1)
+    assert farm.stats.longest_dirt_row() == 12
+    for y in range(6):
+        farm.set_tile(5, y, 1)
+    assert farm.stats.longest_dirt_row() == 6
+    farm.fill(1)
+    assert farm.stats.longest_dirt_row() == 0
+
+
+def test_forks_measure_their_own_runs():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    assert farm.stats.longest_dirt_row() == 10
+    fork = farm.fork()
+    fork.set_tile(4, 0, 1)
+    assert farm.stats.longest_dirt_row() == 10
+    farm.set_tile(3, 0, 1)
+    farm.set_tile(3, 1, 1)
+    for y in range(2, 10):
+        farm.set_tile(5, y, 1)
+    assert farm.stats.longest_dirt_row() == 6
+    assert fork.stats.longest_dirt_row() == 10
+
+
+def test_queries_only_measure_the_lines_that_changed(monkeypatch):
+    import runindex
+
+    farm = FarmGrid(40, 30, "plain", seed=1)
+    runs = farm.stats.runs
+    assert runs.longest_in_rows(0) == 40 and runs.longest_in_columns(0) == 30
+    measured = []
+
+    def counted(keys, key):
+        measured.append(len(keys))
+        return longest_run(keys, key)
+
+    longest_run = runindex.longest_run
+    monkeypatch.setattr(runindex, "longest_run", counted)
+    for _ in range(10):
+        farm.farmer.move("right")
+    assert runs.longest_in_rows(0) == 40 and measured == []
+    farm.set_tile(7, 3, 1)
+    assert runs.longest_in_rows(0) == 40 and runs.longest_in_columns(0) == 30
+    assert measured == [40, 30]  # only row 3 and column 7
+    for y in range(30):
+        farm.set_tile(20, y, 1)
+    assert runs.longest_in_rows(0) == 20  # x 0 to 19
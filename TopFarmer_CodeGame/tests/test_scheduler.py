@@ -0,0 +1,77 @@
+# test_scheduler.py
+import pytest
+from farmgrid import FarmGrid
+
+
+def farm_with_two_farmers():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    farm.add_farmer(1, 0)
+    other = farm.spawn_farmer(1, 2)
+    return farm, farm.farmer, other
+
+
+def test_first_farmer_in_a_tick_wins_a_contested_tile():
+    farm, first, second = farm_with_two_farmers()
+    farm.set_tile(1, 1, 3, 0)
+    farm.scheduler.submit(first, [("harvest", "down")])
+    farm.scheduler.submit(second, [("plant", "carrot", "up")])
+    outcomes = farm.tick()
+    assert [(farmer, accepted) for farmer, _, accepted in outcomes] == [
+        (first, True),
+        (second, False),  # the tile was harvested earlier in the tick
+    ]
+    assert farm.get_tile_type(1, 1) == 0
+    # the tile is free again in the next tick
+    farm.scheduler.submit(second, [("plant", "carrot", "up")])
+    assert farm.tick() == [(second, ("plant", "carrot", "up"), True)]
+
+
+def test_the_farmer_going_first_rotates():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    second = farm.spawn_farmer(5, 5)
+    third = farm.spawn_farmer(7, 7)
+    first = farm.farmer
+    orders = []
+    for _ in range(4):
+        orders.append(farm.scheduler.order())
+        farm.tick()
+    assert orders == [
+        [first, second, third],
+        [second, third, first],
+        [third, first, second],
+        [first, second, third],
+    ]
+
+
+def test_run_and_throughput():
+    farm, first, second = farm_with_two_farmers()
+    farm.scheduler.submit(first, [("move", "right")] * 3)
+    farm.scheduler.submit(second, [("move", "down")] * 2 + [("move", "up")])
+    assert farm.scheduler.pending() == 6
+    assert farm.scheduler.run() == 3
+    assert farm.scheduler.pending() == 0
+    assert farm.scheduler.throughput() == 2.0
+    assert first.get_pos() == (4, 0) and second.get_pos() == (1, 3)
+    farm.scheduler.submit(first, [("move", "up")])  # off the farm
+    farm.scheduler.run()
+    assert farm.scheduler.actions_rejected == 1
+    assert farm.scheduler.throughput() == 6 / 4
+
+
+def test_submit_checks_the_farmer_and_actions():
+    farm, first, _ = farm_with_two_farmers()
+    other_farm = FarmGrid(10, 10, "plain", seed=1)
+    with pytest.raises(ValueError):
+        farm.scheduler.submit(other_farm.farmer, [("move", "up")])
+    with pytest.raises(ValueError):
+        farm.scheduler.submit(first, [("move", "up"), ("dig", "down")])
+    assert farm.scheduler.pending() == 0
+
+
+def test_farmers_cannot_be_spawned_on_water():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    farm.set_tile(4, 4, 2)
+    with pytest.raises(ValueError):
+        farm.spawn_farmer(4, 4)
+    with pytest.raises(ValueError):
+        farm.spawn_farmer(10, 0)
@@ -0,0 +1,99 @@
+# test_stepper.py
+import threading
+import pytest
+import stepper
+from farmgrid import FarmGrid
+from stepper import Stepper
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(stepper.time, "perf_counter", clock)
+    return clock
+
+
+def counting(taken, count):
+    for i in range(count):
+        taken.append(threading.get_ident())
+        yield
+
+
+def test_steps_are_played_by_pump_at_the_chosen_rate(clock):
+    taken, finished = [], []
+    runner = Stepper(steps_per_second=10)
+    runner.start(counting(taken, 5), lambda: finished.append(True))
+    assert taken == []  # starting a run plays nothing
+    for _ in range(2):
+        runner.pump()
+        clock.now += 0.1
+    runner.pump()
+    assert len(taken) == 2 and runner.running
+    runner.pause()
+    clock.now += 1
+    runner.pump()
+    assert len(taken) == 2
+    runner.resume()
+    for _ in range(4):
+        runner.pump()
+        clock.now += 0.1
+    runner.pump()
+    assert len(taken) == 5 and finished == [True] and not runner.running
+    assert set(taken) == {threading.get_ident()}
+
+
+def test_skip_and_full_speed_finish_in_one_frame(clock):
+    taken, finished = [], []
+    runner = Stepper(steps_per_second=1)
+    runner.start(counting(taken, 50), lambda: finished.append(True))
+    runner.pause()
+    runner.skip()
+    runner.pump()
+    assert len(taken) == 50 and finished == [True]
+    runner.set_speed(None)
+    runner.start(counting(taken, 50))
+    runner.pump()
+    assert len(taken) == 100 and not runner.running
+
+
+def test_cancel_stops_the_run_without_calling_done(clock):
+    taken, finished = [], []
+    runner = Stepper(steps_per_second=None)
+    runner.start(counting(taken, 5), lambda: finished.append(True))
+    runner.cancel()
+    runner.pump()
+    assert taken == [] and finished == [] and not runner.running
+    runner.start(counting(taken, 3))  # a new run can start straight away
+    runner.pump()
+    assert len(taken) == 3
+
+
+def test_the_farm_only_changes_inside_pump(clock):
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    moves = ("right", "down") * 4
+
+    def replay():
+        for direction in moves:
+            farm.farmer.move(direction)
+            yield
+
+    runner = Stepper(steps_per_second=4)
+    runner.start(replay())
+    version = farm.version
+    positions = []
+    while runner.running:
+        assert farm.version == version  # nothing changes between frames
+        runner.pump()
+        version = farm.version
+        positions.append(farm.farmer.get_pos())
+        clock.now += 0.25
+    assert farm.farmer.get_pos() == (4, 4)
+    assert positions[1:3] == [(1, 0), (1, 1)]
@@ -0,0 +1,65 @@
+# test_tileindex.py
+import random
+from farmgrid import FarmGrid
+
+
+def scanned_counts(farm):
+    tiles = [farm.tile_types.count(t) for t in range(5)]
+    crops = [farm.crop_types.count(c) for c in range(3)]
+    return tiles, crops
+
+
+def indexed_counts(farm):
+    tiles = [farm.index.count(t) for t in range(5)]
+    crops = [farm.index.crop_count(c) for c in range(3)]
+    return tiles, crops
+
+
+def test_counts_match_a_scan_of_the_farm():
+    for config in ["plain", "river", "crops", "tree_dirt", "crop_row"]:
+        farm = FarmGrid(12, 9, config, seed=4)
+        assert indexed_counts(farm) == scanned_counts(farm)
+
+
+def test_counts_follow_tile_writes():
+    farm = FarmGrid(12, 9, "crops", seed=4)
+    farm.index.count(0)  # build the index before the writes
+    rng = random.Random(1)
+    for _ in range(300):
+        x, y = rng.randrange(12), rng.randrange(9)
+        tile = rng.randrange(5)
+        farm.set_tile(x, y, tile, rng.randrange(3) if tile == 3 else None)
+    assert indexed_counts(farm) == scanned_counts(farm)
+
+
+def test_planting_and_harvesting_update_the_stats_counts():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    assert farm.stats.count_total_crops() == 0
+    assert not farm.stats.check_no_dirt_tiles()
+    farm.farmer.plant("carrot", "down")
+    farm.farmer.plant("carrot", "right")
+    assert farm.stats.count_crops(1) == 2
+    farm.farmer.harvest("down")
+    assert farm.stats.count_crops(1) == 1
+    assert farm.stats.count_total_crops() == 1
+
+
+def test_positions_stay_up_to_date():
+    farm = FarmGrid(6, 5, "plain", seed=1)
+    assert farm.index.positions(2) == set()
+    farm.set_tile(1, 1, 2)
+    farm.set_tile(3, 2, 3, 0)
+    assert farm.index.positions(2) == {(1, 1)}
+    assert farm.index.crop_positions_of(0) == {(3, 2)}
+    farm.set_tile(1, 1, 0)
+    farm.set_tile(3, 2, 0)
+    assert farm.index.positions(2) == set()
+    assert farm.index.crop_positions_of(0) == set()
+
+
+def test_forks_keep_their_own_counts():
+    farm = FarmGrid(6, 5, "plain", seed=1)
+    fork = farm.fork()
+    fork.set_tile(2, 2, 3, 1)
+    assert fork.index.crop_count(1) == 1
+    assert farm.index.crop_count(1) == 0
@@ -0,0 +1,126 @@
+# test_timeseries.py
+import pytest
+import timeseries
+from farmgrid import FarmGrid
+from timeseries import TimeSeries
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0]
+    monkeypatch.setattr(timeseries.time, "perf_counter_ns", lambda: now[0])
+    return now
+
+
+def test_actions_are_binned_per_tick():
+    series = TimeSeries(ticks=4)
+    for tick in [0, 0, 1, 3, 3, 3]:
+        series.record(tick)
+    assert series.per_tick() == [2, 1, 0, 3]
+    assert series.per_tick(2) == [0, 3]
+
+
+def test_old_ticks_roll_out_of_the_window():
+    series = TimeSeries(ticks=4)
+    for tick in range(10):
+        series.record(tick)
+        series.record(tick)
+    series.record(9)
+    assert series.per_tick() == [2, 2, 2, 3]
+    assert series.actions == 21
+
+
+def test_actions_are_binned_per_second(clock):
+    series = TimeSeries(seconds=3)
+    for now in [0, 0.2, 1.5, 3.1, 3.2, 3.3]:
+        clock[0] = int(now * 1e9)
+        series.record(0)
+    assert series.per_second() == [1, 0, 3]  # seconds 1 to 3
+
+
+def test_gaps_fall_in_power_of_two_buckets(clock):
+    series = TimeSeries()
+    for microseconds in [0, 1, 3, 10, 1010]:
+        clock[0] = microseconds * 1000
+        series.record(0)
+    # gaps of 1, 2, 7 and 1000 microseconds
+    assert series.latencies[1] == 1
+    assert series.latencies[2] == 1
+    assert series.latencies[3] == 1
+    assert series.latencies[10] == 1
+    assert sum(series.latencies) == 4
+    assert series.latency_percentile(0.5) == 4
+    assert series.latency_percentile(1.0) == 1024
+
+
+def test_runs_are_counted_by_length():
+    series = TimeSeries()
+    for length in [0, 1, 5, 5, 100]:
+        series.start_run()
+        for _ in range(length):
+            series.record(0)
+        series.end_run()
+    assert series.run_lengths[0] == 1
+    assert series.run_lengths[1] == 1
+    assert series.run_lengths[3] == 2
+    assert series.run_lengths[7] == 1
+    assert series.run_length_percentile(0.5) == 8
+    assert TimeSeries().run_length_percentile(0.5) is None
+
+
+def test_the_gap_between_runs_is_not_counted(clock):
+    series = TimeSeries()
+    series.start_run()
+    series.record(0)
+    series.end_run()
+    clock[0] = 10**9
+    series.start_run()
+    series.record(0)
+    assert sum(series.latencies) == 0
+
+
+def test_farm_records_actions_only_while_enabled():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    farm.farmer.move("right")
+    series = farm.stats.enable_timeseries()
+    farm.farmer.move("right")
+    farm.farmer.plant("potato", "down")
+    farm.farmer.move("up")  # refused actions are counted too
+    assert farm.stats.disable_timeseries() is series
+    farm.farmer.move("left")
+    assert series.actions == 3
+    assert "3 actions" in series.summary()
+
+
+def test_single_farmer_actions_fall_in_ticks_of_their_own():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    series = farm.stats.enable_timeseries(TimeSeries(ticks=4))
+    farm.farmer.move("right")
+    farm.farmer.plant("potato", "down")
+    farm.farmer.run([("move", "right"), ("move", "up")])
+    assert series.per_tick() == [1, 1, 1, 1]
+
+
+def test_forks_do_not_record_into_the_series():
+    farm = FarmGrid(10, 10, "plain", seed=1)
+    series = farm.stats.enable_timeseries()
+    fork = farm.fork()
+    assert fork.stats.timeseries is None
+    fork.farmer.move("right")
+    assert series.actions == 0
+
+
+def test_merge_adds_the_other_series():
+    series, other = TimeSeries(ticks=4), TimeSeries(ticks=4)
+    for tick in [0, 1, 1]:
+        series.record(tick)
+    other.start_run()
+    for tick in [1, 2, 3]:
+        other.record(tick)
+    other.end_run()
+    series.merge(other)
+    assert series.per_tick() == [1, 3, 1, 1]
+    assert series.actions == 6
+    assert sum(series.run_lengths) == 1
+    with pytest.raises(ValueError):
+        series.merge(TimeSeries(ticks=8))
@@ -64,6 +64,18 @@ class TileGraphics:
                 self.crop_images[key], (self.scale_factor, self.scale_factor)
             )
 
+    def farmer_frame_due(self):
+        """
+        Checks whether enough time has passed for the farmer animation to move on to its next frame.
+        The renderer uses this to decide whether an otherwise unchanged frame needs to be redrawn.
+
+        Returns:
+            bool: True if the next call to get_farmer_frame will return a new frame, otherwise False.
+        """
+
+        current_time = pygame.time.get_ticks()
+        return current_time - self.last_update_time > self.frame_delay
+
     def get_farmer_frame(self):
         """
         Retrieves the current frame of the farmer sprite for animation.
@@ -0,0 +1,176 @@
+# tileindex.py
+import itertools
+
+TILE_TYPES = range(5)  # dirt, grass, water, crop, tree
+CROP_TYPES = range(3)  # potato, carrot, pumpkin
+
+# number of tiles counted at a time when rebuilding the index, which keeps
+# the memory used by a rebuild small for memory-mapped farms
+CHUNK_SIZE = 1 << 20
+
+
+def count_values(values, targets):
+    """
+    Counts how often each of the target values appears in a packed array.
+    The array is copied to bytes one chunk at a time and each chunk is counted with bytes.count, which works the same for arrays and for memoryviews over a memory-mapped file.
+
+    Args:
+        values: The packed array to count in (tile_types or crop_types).
+        targets: The non-negative values to count.
+
+    Returns:
+        list: The number of times each target appears, in the same order as targets.
+    """
+    counts = [0] * len(targets)
+    for start in range(0, len(values), CHUNK_SIZE):
+        chunk = values[start : start + CHUNK_SIZE].tobytes()
+        for i, target in enumerate(targets):
+            counts[i] += chunk.count(target)
+    return counts
+
+
+class TileIndex:
+    """
+    Keeps per-type tile counts and position sets for a FarmGrid up to date as the farm changes.
+    Counts are rebuilt with a single pass over the packed arrays whenever the whole farm is replaced and are then maintained on every tile write, so queries such as "how many carrots are planted" no longer scan the farm.
+    Position sets are only built the first time they are asked for, since most checks only need the counts.
+    """
+
+    def __init__(self, farm):
+        """
+        Initializes an empty TileIndex for the given farm; the index is built the first time it is queried.
+
+        Args:
+            farm: The FarmGrid to index.
+        """
+        self.farm = farm
+        self.valid = False
+        self.tile_counts = [0] * len(TILE_TYPES)
+        self.crop_counts = [0] * len(CROP_TYPES)
+        self.tile_positions = {}  # tile type -> set of (x, y), built lazily
+        self.crop_positions = {}  # crop type -> set of (x, y), built lazily
+
+    def on_grid_reset(self):
+        """
+        Marks the index as out of date.
+        The farm calls this whenever its whole layout is replaced; the index is rebuilt the next time it is queried.
+        """
+        self.valid = False
+        self.tile_positions.clear()
+        self.crop_positions.clear()
+
+    def rebuild(self):
+        """
+        Recounts every tile and crop type from the farm's packed arrays in a single pass over each.
+        """
+        self.tile_counts = count_values(self.farm.tile_types, TILE_TYPES)
+        self.crop_counts = count_values(self.farm.crop_types, CROP_TYPES)
+        self.tile_positions.clear()
+        self.crop_positions.clear()
+        self.valid = True
+
+    def on_tile_changed(self, x, y, old_tile, old_crop, new_tile, new_crop):
+        """
+        Records that the tile at the given position has changed.
+        The farm calls this for every tile write; it does nothing while the index is out of date.
+
+        Args:
+            x: The x-coordinate of the tile.
+            y: The y-coordinate of the tile.
+            old_tile: The tile type before the change.
+            old_crop: The crop type before the change, or a negative number for no crop.
+            new_tile: The tile type after the change.
+            new_crop: The crop type after the change, or a negative number for no crop.
+        """
+        if not self.valid:
+            return
+
+        pos = (x, y)
+        self.tile_counts[old_tile] -= 1
+        self.tile_counts[new_tile] += 1
+        if old_tile in self.tile_positions:
+            self.tile_positions[old_tile].discard(pos)
+        if new_tile in self.tile_positions:
+            self.tile_positions[new_tile].add(pos)
+
+        if old_crop >= 0:
+            self.crop_counts[old_crop] -= 1
+            if old_crop in self.crop_positions:
+                self.crop_positions[old_crop].discard(pos)
+        if new_crop >= 0:
+            self.crop_counts[new_crop] += 1
+            if new_crop in self.crop_positions:
+                self.crop_positions[new_crop].add(pos)
+
+    def count(self, tile_type):
+        """
+        Args:
+            tile_type: An integer representing the type of tile to count.
+
+        Returns:
+            int: The number of tiles of that type on the farm.
+        """
+        if not self.valid:
+            self.rebuild()
+        return self.tile_counts[tile_type]
+
+    def crop_count(self, crop_type):
+        """
+        Args:
+            crop_type: An integer representing the type of crop to count.
+
+        Returns:
+            int: The number of tiles holding that crop.
+        """
+        if not self.valid:
+            self.rebuild()
+        return self.crop_counts[crop_type]
+
+    def positions(self, tile_type):
+        """
+        Args:
+            tile_type: An integer representing the type of tile to look up.
+
+        Returns:
+            set: The (x, y) positions of every tile of that type. The set is kept up to date by the index and must not be modified.
+        """
+        if not self.valid:
+            self.rebuild()
+        if tile_type not in self.tile_positions:
+            self.tile_positions[tile_type] = self.scan(
+                self.farm.tile_types, tile_type
+            )
+        return self.tile_positions[tile_type]
+
+    def crop_positions_of(self, crop_type):
+        """
+        Args:
+            crop_type: An integer representing the type of crop to look up.
+
+        Returns:
+            set: The (x, y) positions of every tile holding that crop. The set is kept up to date by the index and must not be modified.
+        """
+        if not self.valid:
+            self.rebuild()
+        if crop_type not in self.crop_positions:
+            self.crop_positions[crop_type] = self.scan(
+                self.farm.crop_types, crop_type
+            )
+        return self.crop_positions[crop_type]
+
+    def scan(self, values, value):
+        """
+        Finds every position in one of the farm's packed arrays that holds the given value.
+
+        Args:
+            values: The packed array to search (tile_types or crop_types).
+            value: The value to look for.
+
+        Returns:
+            set: The (x, y) positions holding the value.
+        """
+        height = self.farm.height
+        matches = itertools.compress(
+            range(len(values)), map(value.__eq__, values)
+        )
+        return {(index // height, index % height) for index in matches}
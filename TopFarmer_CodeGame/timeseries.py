@@ -0,0 +1,258 @@
+# timeseries.py
+import time
+from array import array
+
+LATENCY_BUCKETS = 32  # bucket i holds gaps of less than 2 ** i microseconds
+RUN_BUCKETS = 32  # bucket i holds runs of less than 2 ** i actions
+
+
+def bucket_bound(bucket):
+    """
+    Args:
+        bucket: The index of a histogram bucket.
+
+    Returns:
+        int: The smallest value too large for the bucket; bucket 0 only holds 0.
+    """
+    return 1 << bucket
+
+
+class TimeSeries:
+    """
+    Records when farmers act, to show the pacing of a submission rather than just its totals.
+    Actions are counted into two rolling windows of fixed-size bins, one bin per tick of the scheduler's clock (every action outside a multi-farmer tick is a tick of its own) and one per second of wall-clock time, and two histograms with power-of-two buckets keep the gap between consecutive actions and the number of actions in each run.
+    Recording an action is a clock read and a few array updates, and nothing grows as more actions are recorded, so it is cheap enough to leave on all the time.
+    """
+
+    def __init__(self, seconds=60, ticks=256):
+        """
+        Initializes an empty TimeSeries.
+
+        Args:
+            seconds: The number of most recent seconds to keep per-second counts for (default is 60).
+            ticks: The number of most recent ticks to keep per-tick counts for (default is 256).
+        """
+        # counts per bin, and the second or tick each bin currently counts
+        self.second_counts = array("I", [0]) * seconds
+        self.second_ids = array("q", [-1]) * seconds
+        self.tick_counts = array("I", [0]) * ticks
+        self.tick_ids = array("q", [-1]) * ticks
+
+        self.latencies = array("Q", [0]) * LATENCY_BUCKETS
+        self.run_lengths = array("Q", [0]) * RUN_BUCKETS
+
+        self.actions = 0
+        self.last_action = None  # perf_counter_ns() of the previous action
+        self.run_start = None  # number of actions when the run started
+
+    def copy(self):
+        """
+        Returns:
+            TimeSeries: An independent copy of the recorded data.
+        """
+        series = TimeSeries(len(self.second_counts), len(self.tick_counts))
+        for name in (
+            "second_counts",
+            "second_ids",
+            "tick_counts",
+            "tick_ids",
+            "latencies",
+            "run_lengths",
+        ):
+            getattr(series, name)[:] = getattr(self, name)
+        series.actions = self.actions
+        series.last_action = self.last_action
+        series.run_start = self.run_start
+        return series
+
+    def merge(self, other):
+        """
+        Adds the actions recorded in another TimeSeries, such as one recorded in a worker process, to this one.
+        Bins for the same second or tick are added together; a bin of the other series newer than what this one holds in that slot replaces it, and an older one is dropped, as it would have been had the actions been recorded here.
+
+        Args:
+            other: The TimeSeries to add, which must have windows of the same sizes.
+
+        Raises:
+            ValueError: If the windows of the two series have different sizes.
+        """
+        windows = (("second_counts", "second_ids"), ("tick_counts", "tick_ids"))
+        for counts_name, ids_name in windows:
+            if len(getattr(other, ids_name)) != len(getattr(self, ids_name)):
+                raise ValueError("Cannot merge time series of different sizes")
+        for counts_name, ids_name in windows:
+            counts, ids = getattr(self, counts_name), getattr(self, ids_name)
+            other_counts = getattr(other, counts_name)
+            for slot, key in enumerate(getattr(other, ids_name)):
+                if key == ids[slot]:
+                    counts[slot] += other_counts[slot]
+                elif key > ids[slot]:
+                    ids[slot] = key
+                    counts[slot] = other_counts[slot]
+        for bucket, count in enumerate(other.latencies):
+            self.latencies[bucket] += count
+        for bucket, count in enumerate(other.run_lengths):
+            self.run_lengths[bucket] += count
+        self.actions += other.actions
+
+    def record(self, tick):
+        """
+        Records one action.
+        The farmer calls this for every action it attempts while the farm's statistics have a TimeSeries.
+
+        Args:
+            tick: The tick of the scheduler's clock the action happened in.
+        """
+        now = time.perf_counter_ns()
+        last = self.last_action
+        if last is not None:
+            bucket = ((now - last) // 1000).bit_length()
+            self.latencies[bucket if bucket < LATENCY_BUCKETS else -1] += 1
+        self.last_action = now
+        self.actions += 1
+
+        ids = self.second_ids
+        second = now // 1_000_000_000
+        slot = second % len(ids)
+        if ids[slot] == second:
+            self.second_counts[slot] += 1
+        else:
+            ids[slot] = second
+            self.second_counts[slot] = 1
+
+        ids = self.tick_ids
+        slot = tick % len(ids)
+        if ids[slot] == tick:
+            self.tick_counts[slot] += 1
+        else:
+            ids[slot] = tick
+            self.tick_counts[slot] = 1
+
+    def start_run(self):
+        """
+        Marks the start of a run of a submission, such as one test case.
+        The gap before the run's first action is not counted, since it is time spent between runs rather than within one.
+        """
+        self.run_start = self.actions
+        self.last_action = None
+
+    def end_run(self):
+        """
+        Marks the end of the current run, adding the number of actions it took to the actions-per-run histogram.
+        """
+        if self.run_start is None:
+            return
+        length = self.actions - self.run_start
+        self.run_lengths[min(length.bit_length(), RUN_BUCKETS - 1)] += 1
+        self.run_start = None
+
+    def window(self, counts, ids, last, length):
+        """
+        Reads the most recent bins of one of the rolling windows.
+
+        Args:
+            counts: The counts of the window's bins.
+            ids: The second or tick each bin counts.
+            last: The most recent second or tick to read.
+            length: The number of seconds or ticks to read, at most the size of the window.
+
+        Returns:
+            list: The count for each second or tick up to last, oldest first, with 0 for any nothing was recorded in.
+        """
+        size = len(ids)
+        window = []
+        for key in range(last - min(length, size) + 1, last + 1):
+            slot = key % size
+            window.append(counts[slot] if ids[slot] == key else 0)
+        return window
+
+    def per_second(self, seconds=None):
+        """
+        Args:
+            seconds: The number of seconds to read, or None for the whole window (default is None).
+
+        Returns:
+            list: The number of actions in each of the most recent seconds, oldest first, ending with the current second.
+        """
+        size = len(self.second_ids)
+        return self.window(
+            self.second_counts,
+            self.second_ids,
+            time.perf_counter_ns() // 1_000_000_000,
+            size if seconds is None else seconds,
+        )
+
+    def per_tick(self, ticks=None):
+        """
+        Args:
+            ticks: The number of ticks to read, or None for the whole window (default is None).
+
+        Returns:
+            list: The number of actions in each of the most recent ticks, oldest first, ending with the latest tick an action was recorded in.
+        """
+        size = len(self.tick_ids)
+        return self.window(
+            self.tick_counts,
+            self.tick_ids,
+            max(self.tick_ids),
+            size if ticks is None else ticks,
+        )
+
+    def percentile(self, histogram, fraction):
+        """
+        Estimates a percentile from one of the histograms.
+
+        Args:
+            histogram: The bucket counts of the histogram.
+            fraction: The fraction of values that should lie below the result, between 0 and 1.
+
+        Returns:
+            int: The upper bound of the bucket holding the percentile, or None if the histogram is empty.
+        """
+        total = sum(histogram)
+        if total == 0:
+            return None
+        seen = 0
+        for bucket, count in enumerate(histogram):
+            seen += count
+            if seen >= fraction * total:
+                return bucket_bound(bucket)
+        return bucket_bound(len(histogram) - 1)
+
+    def latency_percentile(self, fraction):
+        """
+        Args:
+            fraction: The fraction of gaps that should be shorter than the result, between 0 and 1.
+
+        Returns:
+            int: An upper bound, in microseconds, on that fraction of the gaps between consecutive actions, or None if fewer than two actions were recorded.
+        """
+        return self.percentile(self.latencies, fraction)
+
+    def run_length_percentile(self, fraction):
+        """
+        Args:
+            fraction: The fraction of runs that should be shorter than the result, between 0 and 1.
+
+        Returns:
+            int: An upper bound on the number of actions in that fraction of runs, or None if no run has ended.
+        """
+        return self.percentile(self.run_lengths, fraction)
+
+    def summary(self):
+        """
+        Returns:
+            str: A one-line description of the pacing, for display to the player.
+        """
+        if self.actions == 0:
+            return "No actions recorded yet"
+        busiest = max(self.per_second())
+        median = self.latency_percentile(0.5)
+        slowest = self.latency_percentile(0.99)
+        if median is None:
+            return f"{self.actions} actions, {busiest} in the busiest second"
+        return (
+            f"{self.actions} actions, {busiest} in the busiest second, "
+            f"gap between actions under {median} µs (median) "
+            f"and {slowest} µs (99%)"
+        )